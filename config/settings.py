@@ -10,11 +10,88 @@ class Config:
     # Timeouts
     rest_timeout: int = 30
     websocket_timeout: int = 10
+    ws_request_timeout: float = 10.0
+    ws_max_channels_per_request: int = 100
+    ws_max_request_bytes: int = 8192
+    
+    # WebSocket reconnect (exponential backoff with full jitter; 0 attempts retries forever)
+    ws_reconnect_enabled: bool = True
+    ws_reconnect_initial_delay: float = 0.1
+    ws_reconnect_max_delay: float = 30.0
+    ws_reconnect_max_attempts: int = 10
+    
+    # REST connection pool
+    rest_pool_connections: int = 10
+    rest_pool_maxsize: int = 32
+    rest_pool_block: bool = False
+    rest_max_concurrency: int = 16
+    
+    # WebSocket message buffers (messages retained, oldest dropped first)
+    ws_buffer_size: int = 10000
+    ws_channel_buffer_size: int = 1000
+
+    # Feed monitoring (pushed data older than this when received counts as stale)
+    ws_stale_after_ms: int = 5000
+
+    # Local order books: compare the exchange's book checksum (cs) after every message
+    ws_book_verify_checksum: bool = True
+
+    # WebSocket connection pool (channels sharded across connections)
+    ws_pool_max_connections: int = 10
+    ws_pool_max_channels_per_connection: int = 200
+    ws_pool_queue_size: int = 100000
+    
+    # Candlestick backfill (candles per request and concurrent windows)
+    candlestick_page_size: int = 300
+    backfill_max_concurrency: int = 8
+    
+    # History cache of closed candles and expired settlement prices (empty path disables it)
+    history_cache_path: str = ""
+    history_cache_max_bytes: int = 512 * 1024 * 1024
+    
+    # Reference data cache (seconds before get-instruments / get-risk-parameters are revalidated)
+    reference_cache_enabled: bool = True
+    instruments_cache_ttl: float = 300.0
+    risk_parameters_cache_ttl: float = 300.0
+    
+    # Soak runs (a non-zero duration overrides the one in the scenario)
+    soak_duration_seconds: float = 0.0
+    soak_window_seconds: float = 60.0
+    soak_max_windows: int = 1440
+    soak_report_path: str = "reports/soak.jsonl"
+    
+    # Client lifecycle in behave runs: run, feature or scenario
+    rest_client_scope: str = "run"
+    ws_client_scope: str = "feature"
+    
+    # Retries
+    max_retries: int = 3
+    retry_delay: float = 1.0
+    
+    # Rate limiting (token buckets: requests per second and burst size)
+    rate_limit_enabled: bool = True
+    rate_limit_shared: bool = True
+    rate_limit_state_file: str = ""
+    rest_market_rate_limit: float = 100.0
+    rest_market_rate_burst: float = 100.0
+    rest_public_rate_limit: float = 50.0
+    rest_public_rate_burst: float = 50.0
+    ws_rate_limit: float = 100.0
+    ws_rate_burst: float = 100.0
     
     # Test Configuration
     max_response_time: int = 5
     default_test_count: int = 10
     
+    # JSON decoding backend: auto (fastest installed), orjson, msgspec or json
+    json_backend: str = "auto"
+    
+    # Parallel runs (scenario durations kept between runs; empty path uses a temp file)
+    timing_history_path: str = ""
+    
+    # Reporting
+    latency_report_path: str = "reports/latency.json"
+    
     # Logging
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -26,4 +103,44 @@ config = Config()
 config.rest_base_url = os.getenv('CRYPTO_REST_URL', config.rest_base_url)
 config.websocket_url = os.getenv('CRYPTO_WS_URL', config.websocket_url)
 config.rest_timeout = int(os.getenv('REST_TIMEOUT', config.rest_timeout))
+config.rest_pool_connections = int(os.getenv('REST_POOL_CONNECTIONS', config.rest_pool_connections))
+config.rest_pool_maxsize = int(os.getenv('REST_POOL_MAXSIZE', config.rest_pool_maxsize))
+config.rest_pool_block = os.getenv('REST_POOL_BLOCK', str(config.rest_pool_block)).lower() == 'true'
+config.rest_max_concurrency = int(os.getenv('REST_MAX_CONCURRENCY', config.rest_max_concurrency))
+config.ws_reconnect_enabled = os.getenv('WS_RECONNECT_ENABLED', str(config.ws_reconnect_enabled)).lower() == 'true'
+config.ws_reconnect_max_attempts = int(os.getenv('WS_RECONNECT_MAX_ATTEMPTS', config.ws_reconnect_max_attempts))
+config.ws_reconnect_initial_delay = float(os.getenv('WS_RECONNECT_INITIAL_DELAY', config.ws_reconnect_initial_delay))
+config.ws_reconnect_max_delay = float(os.getenv('WS_RECONNECT_MAX_DELAY', config.ws_reconnect_max_delay))
+config.ws_buffer_size = int(os.getenv('WS_BUFFER_SIZE', config.ws_buffer_size))
+config.ws_channel_buffer_size = int(os.getenv('WS_CHANNEL_BUFFER_SIZE', config.ws_channel_buffer_size))
+config.ws_stale_after_ms = int(os.getenv('WS_STALE_AFTER_MS', config.ws_stale_after_ms))
+config.ws_book_verify_checksum = os.getenv('WS_BOOK_VERIFY_CHECKSUM', str(config.ws_book_verify_checksum)).lower() == 'true'
+config.ws_pool_max_connections = int(os.getenv('WS_POOL_MAX_CONNECTIONS', config.ws_pool_max_connections))
+config.ws_pool_max_channels_per_connection = int(os.getenv('WS_POOL_MAX_CHANNELS_PER_CONNECTION', config.ws_pool_max_channels_per_connection))
+config.candlestick_page_size = int(os.getenv('CANDLESTICK_PAGE_SIZE', config.candlestick_page_size))
+config.backfill_max_concurrency = int(os.getenv('BACKFILL_MAX_CONCURRENCY', config.backfill_max_concurrency))
+config.history_cache_path = os.getenv('HISTORY_CACHE_PATH', config.history_cache_path)
+config.history_cache_max_bytes = int(os.getenv('HISTORY_CACHE_MAX_BYTES', config.history_cache_max_bytes))
+config.reference_cache_enabled = os.getenv('REFERENCE_CACHE_ENABLED', str(config.reference_cache_enabled)).lower() == 'true'
+config.instruments_cache_ttl = float(os.getenv('INSTRUMENTS_CACHE_TTL', config.instruments_cache_ttl))
+config.risk_parameters_cache_ttl = float(os.getenv('RISK_PARAMETERS_CACHE_TTL', config.risk_parameters_cache_ttl))
+config.soak_duration_seconds = float(os.getenv('SOAK_DURATION_SECONDS', config.soak_duration_seconds))
+config.soak_window_seconds = float(os.getenv('SOAK_WINDOW_SECONDS', config.soak_window_seconds))
+config.soak_report_path = os.getenv('SOAK_REPORT_PATH', config.soak_report_path)
+config.rest_client_scope = os.getenv('REST_CLIENT_SCOPE', config.rest_client_scope)
+config.ws_client_scope = os.getenv('WS_CLIENT_SCOPE', config.ws_client_scope)
+config.max_retries = int(os.getenv('MAX_RETRIES', config.max_retries))
+config.retry_delay = float(os.getenv('RETRY_DELAY', config.retry_delay))
+config.rate_limit_enabled = os.getenv('RATE_LIMIT_ENABLED', str(config.rate_limit_enabled)).lower() == 'true'
+config.rate_limit_shared = os.getenv('RATE_LIMIT_SHARED', str(config.rate_limit_shared)).lower() == 'true'
+config.rate_limit_state_file = os.getenv('RATE_LIMIT_STATE_FILE', config.rate_limit_state_file)
+config.rest_market_rate_limit = float(os.getenv('REST_MARKET_RATE_LIMIT', config.rest_market_rate_limit))
+config.rest_public_rate_limit = float(os.getenv('REST_PUBLIC_RATE_LIMIT', config.rest_public_rate_limit))
+config.ws_rate_limit = float(os.getenv('WS_RATE_LIMIT', config.ws_rate_limit))
+config.rest_market_rate_burst = float(os.getenv('REST_MARKET_RATE_BURST', config.rest_market_rate_burst))
+config.rest_public_rate_burst = float(os.getenv('REST_PUBLIC_RATE_BURST', config.rest_public_rate_burst))
+config.ws_rate_burst = float(os.getenv('WS_RATE_BURST', config.ws_rate_burst))
+config.json_backend = os.getenv('JSON_BACKEND', config.json_backend)
+config.timing_history_path = os.getenv('TIMING_HISTORY_PATH', config.timing_history_path)
+config.latency_report_path = os.getenv('LATENCY_REPORT_PATH', config.latency_report_path)
 
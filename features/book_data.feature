@@ -21,6 +21,13 @@ Feature: Crypto.com Exchange WebSocket API - Order Book Data
     When I subscribe to order book.update with valid "channels" and "book_subscription_type" and "book_update_frequency"
     Then I should receive subscription confirmation
   
+  @positive
+  Scenario: Maintain a local order book from snapshot and delta updates
+    When I connect to the WebSocket server
+    Then the connection should be established successfully
+    When I maintain a local order book from order book.update
+    Then the local order book should stay consistent for 10 seconds
+
   @negative
   Scenario: Handle invalid subscription instrument and valid depth
     When I connect to the WebSocket server
@@ -37,6 +44,13 @@ Feature: Crypto.com Exchange WebSocket API - Order Book Data
     Then I should receive an error message
     And the error should indicate Unknown symbol
 
+  @bulk
+  Scenario: Subscribe to the order book of every tradable instrument
+    When I connect to the WebSocket server
+    Then the connection should be established successfully
+    When I subscribe to order book depth 10 for all tradable instruments
+    Then every book subscription should be acknowledged within 30 seconds
+
   @connection
   Scenario: Handle connection lifecycle
     When I connect to the WebSocket server
@@ -44,6 +58,15 @@ Feature: Crypto.com Exchange WebSocket API - Order Book Data
     When I disconnect from the WebSocket server
     Then the connection should be closed gracefully
 
+  @connection
+  Scenario: Stay connected across exchange heartbeats
+    When I connect to the WebSocket server
+    Then the connection should be established successfully
+    When I subscribe to order book for instrument "instrument" with depth "depth"
+    Then I should receive order book updates within 5 seconds
+    And the connection should stay up without reconnecting for 35 seconds
+    And at least 1 heartbeats should have been answered
+
   @performance
   Scenario: Verify real-time data updates
     When I connect to the WebSocket server
@@ -51,3 +74,31 @@ Feature: Crypto.com Exchange WebSocket API - Order Book Data
     When I subscribe to order book for instrument "instrument" with depth "depth"
     Then I should receive order book updates within 5 seconds
     And updates should be received continuously
+    And the p99 latency for ws.connect should be under 5000 ms
+
+
+  @performance
+  Scenario: Verify order book feed quality and freshness
+    Given the feed monitor is attached to the WebSocket client
+    When I connect to the WebSocket server
+    Then the connection should be established successfully
+    When I subscribe to order book for instrument "instrument" with depth "depth"
+    Then I should receive order book updates within 5 seconds
+    When I monitor the feed for 10 seconds
+    Then the feed should have no sequence gaps
+    And the feed should have no duplicate or out-of-order updates
+    And at most 1% of updates should be stale
+    And no channel should be silent for more than 5 seconds
+    And the p99 latency for ws.lag.book should be under 2000 ms
+
+  @soak
+  Scenario: Soak the order book feed with constant-memory metrics
+    When I connect to the WebSocket server
+    Then the connection should be established successfully
+    When I subscribe to order book for instrument "instrument" with depth "depth"
+    Then I should receive order book updates within 5 seconds
+    When I soak the subscribed feed for 60 seconds in 10 second windows
+    Then every soak window should receive at least 1 messages per second
+    And the soak should have no validation failures
+    And memory should grow by less than 50 MB during the soak
+    And the soak should need at most 0 reconnects
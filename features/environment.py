@@ -1,8 +1,11 @@
 import logging
 import sys
 import os
-from utils.rest_client import CryptoRestClient
-from utils.websocket_client import CryptoWebSocketClient
+from utils.rest_client import CryptoRestClient, close_shared_session
+from utils.client_lifecycle import ClientManager
+from utils.history_cache import CachedRestClient, close_history_cache
+from utils.latency import latency_recorder
+from config.settings import config
 
 # Add the project root directory to Python path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -11,6 +14,12 @@ if project_root not in sys.path:
 
 BEHAVE_DEBUG_ON_ERROR = False
 
+def create_rest_client():
+    """REST client for the run; immutable history is served from the cache when one is configured"""
+    if config.history_cache_path:
+        return CachedRestClient()
+    return CryptoRestClient()
+
 def setup_debug_on_error(userdata):
     global BEHAVE_DEBUG_ON_ERROR
     BEHAVE_DEBUG_ON_ERROR = userdata.getbool("BEHAVE_DEBUG_ON_ERROR")
@@ -24,38 +33,31 @@ def before_all(context):
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    context.rest_client = CryptoRestClient()
-    context.ws_client = CryptoWebSocketClient()
+    # Clients are created lazily and reused for their scope (config.rest_client_scope / ws_client_scope)
+    context.clients = ClientManager(rest_factory=create_rest_client)
 
     context.config.setup_logging()
 
-def before_feature(context, feature):
-    """Setup before each feature"""
-    context.rest_client = CryptoRestClient()
-    context.ws_client = CryptoWebSocketClient()
-    pass
-
 def before_scenario(context, scenario):
     """Setup before each scenario"""
-    # Clean up any existing clients
-    if hasattr(context, 'rest_client'):
-        context.rest_client.close()
-    
-    if hasattr(context, 'ws_client'):
-        context.ws_client.disconnect()
+    context.clients.check_health()
+    context.rest_client = context.clients.rest
+    context.ws_client = context.clients.ws
 
 def after_scenario(context, scenario):
     """Cleanup after each scenario"""
-    if hasattr(context, 'rest_client'):
-        context.rest_client.close()
-        
-    if hasattr(context, 'ws_client'):
-        context.ws_client.disconnect()
+    context.clients.end_scope('scenario')
+
+def after_feature(context, feature):
+    """Cleanup after each feature"""
+    context.clients.end_scope('feature')
 
 def after_all(context):
     """Cleanup after all tests"""
-    if hasattr(context, 'ws_client'):
-        context.ws_client.disconnect()
+    context.clients.close()
+    close_shared_session()
+    close_history_cache()
+    latency_recorder.export_json(config.latency_report_path)
 
 def after_step(context, step):
     if BEHAVE_DEBUG_ON_ERROR and step.status == "failed":
@@ -41,6 +41,13 @@ Feature: Crypto.com Exchange REST API - Candlestick Data
     And the response should contain valid candlestick data
     
 
+  @backfill
+  Scenario: Backfill a day of one-minute candlesticks across many pages
+    When I backfill "M1" candlesticks for "BTCUSD-PERP" over the last 24 hours
+    Then the backfilled candlesticks should be unique, aligned and valid
+    And the backfill gaps should cover at most 1% of the range
+    And the response should be received within 30 seconds
+
   @negative
   Scenario Outline: Handle invalid parameters gracefully
     When I request candlestick data with invalid parameters "<param_type>"
@@ -58,6 +65,7 @@ Feature: Crypto.com Exchange REST API - Candlestick Data
     When I request candlestick data for "<instrument_name>" with timeframe "<timeframe>" and count "<count>"
     Then the response should be received within 3 seconds
     And the response status should be 200
+    And the p99 latency for get-candlestick should be under 3000 ms
     
     Examples:
       |instrument_name|timeframe|count|
@@ -8,3 +8,4 @@ Feature: Public Get Book API
     And the method should be "public/get-book"
     And the instrument_name in result should be "BTCUSD-PERP"
     And each bid and ask entry should have 3 valid fields: price, quantity, orders
+    And the order book should satisfy all invariants for the instrument tick size
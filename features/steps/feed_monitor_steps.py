@@ -0,0 +1,39 @@
+from behave import given, when, then
+from utils.feed_monitor import FeedMonitor
+
+
+@given('the feed monitor is attached to the WebSocket client')
+def step_attach_feed_monitor(context):
+    context.feed_monitor = FeedMonitor()
+    context.feed_monitor.attach(context.ws_client)
+
+@when('I monitor the feed for {seconds:d} seconds')
+def step_monitor_feed(context, seconds):
+    assert not context.ws_client.wait_until_disconnected(timeout=seconds), \
+        "WebSocket disconnected while monitoring the feed"
+
+@then('the feed should have no sequence gaps')
+def step_verify_no_gaps(context):
+    totals = context.feed_monitor.totals()
+    assert totals['messages'] > 0, "No data messages observed by the feed monitor"
+    gapped = {channel: stats['gaps'] for channel, stats in context.feed_monitor.summary().items() if stats['gaps']}
+    assert not gapped, f"Sequence gaps per channel: {gapped}"
+
+@then('the feed should have no duplicate or out-of-order updates')
+def step_verify_ordering(context):
+    totals = context.feed_monitor.totals()
+    assert totals['duplicates'] == 0, f"{totals['duplicates']} duplicate updates"
+    assert totals['out_of_order'] == 0, f"{totals['out_of_order']} out-of-order updates"
+
+@then('at most {percent:g}% of updates should be stale')
+def step_verify_staleness(context, percent):
+    totals = context.feed_monitor.totals()
+    stale_percent = 100.0 * totals['stale'] / max(1, totals['updates'])
+    assert stale_percent <= percent, \
+        f"{totals['stale']} of {totals['updates']} updates ({stale_percent:.1f}%) older than " \
+        f"{context.feed_monitor.stale_after_ms}ms on arrival (max lag {totals['max_lag_ms']}ms)"
+
+@then('no channel should be silent for more than {seconds:g} seconds')
+def step_verify_no_silent_channels(context, seconds):
+    silent = context.feed_monitor.silent_channels(int(seconds * 1000))
+    assert not silent, f"Channels silent (ms): {silent}"
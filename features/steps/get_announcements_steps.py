@@ -1,31 +1,33 @@
 from behave import given, when, then
-import requests
+from utils.async_rest_client import AsyncCryptoRestClient
 
 @given('the API endpoint is set to "{endpoint}"')
 def step_given_api_endpoint(context, endpoint):
+    base_url, _, method = endpoint.rpartition('/public/')
+    assert base_url and method == 'get-announcements', f"Not a get-announcements endpoint: {endpoint}"
     context.endpoint = endpoint
+    context.rest_client = context.clients.rest_for(base_url)
 
 @when('I send a GET request with category "{category}" and product_type "{product_type}"')
 def step_when_send_get_request(context, category, product_type):
-    params = {}
-    if category:
-        params['category'] = category
-    if product_type:
-        params['product_type'] = product_type
-    context.response = requests.get(context.endpoint, params=params)
+    context.response = context.rest_client.get_announcements(category, product_type)
             
 @when('I test all combinations of category and product_type')
 def step_when_test_all_combinations(context):
     categories = ['list', 'delist', 'event', 'product', 'system']
     product_types = ['Spot', 'Derivative', 'OTC', 'Staking', 'TradingArena']
-    for category in categories:
-        for product_type in product_types:
-            params = {
-                'category': category,
-                'product_type': product_type
-            }
-            context.response = requests.get(context.endpoint, params=params)
-            assert context.response.status_code == 200, f"Failed with {category}, {product_type}: status {context.response.status_code}"
+    combinations = [(category, product_type) for category in categories for product_type in product_types]
+    async_client = AsyncCryptoRestClient(rest_client=context.rest_client)
+    try:
+        responses = async_client.run_batch(
+            ("get_announcements", {'category': category, 'product_type': product_type})
+            for category, product_type in combinations
+        )
+    finally:
+        async_client.close()
+    for (category, product_type), response in zip(combinations, responses):
+        assert response.status_code == 200, f"Failed with {category}, {product_type}: status {response.status_code}"
+    context.response = responses[-1]
 
 
 @then('the response status code should be 200')
@@ -1,7 +1,5 @@
-import requests
 from behave import given, when, then
-
-BASE_URL = "https://uat-api.3ona.co/exchange/v1/public/get-book"  # Replace with actual base URL
+from utils.data_validators import OrderBookValidator
 
 @given('the instrument name is "{instrument_name}"')
 def step_instrument_name(context, instrument_name):
@@ -23,11 +21,7 @@ def step_depth(context, depth="1"):
     
 @when('I request the order book from the public API')
 def step_order_book(context):
-    params = {
-        "instrument_name": context.instrument_name,
-        "depth": context.depth
-    }
-    response = requests.get(BASE_URL, params=params)
+    response = context.rest_client.get_book(context.instrument_name, context.depth)
     context.response = response
     context.json = response.json()
 
@@ -58,3 +52,14 @@ def step_data_field(context):
         float(price)
         float(qty)
         int(orders)
+
+
+@then('the order book should satisfy all invariants for the instrument tick size')
+def step_book_invariants(context):
+    instrument = context.rest_client.get_instrument(context.instrument_name)
+    assert instrument and instrument.price_tick_size, \
+        f"No price_tick_size for {context.instrument_name} in get-instruments"
+    tick_size = instrument.price_tick_size
+
+    violations = OrderBookValidator.find_violations(context.json, tick_size=tick_size, max_depth=context.depth)
+    assert not violations, f"Order book invariant violations (level indices): {violations}"
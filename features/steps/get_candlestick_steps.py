@@ -1,19 +1,12 @@
-import requests
 from behave import given, when, then
 
-API_URL = "https://uat-api.3ona.co/exchange/v1/public/get-candlestick"  
-
 @given('the API endpoint is set')
 def step_given_api_endpoint(context):
-    context.api_url = API_URL
+    context.api_url = f"{context.rest_client.base_url}/public/get-candlestick"
 
 @when('I request candlestick data for instrument "{instrument}" and timeframe "{timeframe}"')
 def step_when_request_candlestick(context, instrument, timeframe):
-    params = {
-        "instrument_name": instrument,
-        "timeframe": timeframe
-    }
-    response = requests.get(context.api_url, params=params)
+    response = context.rest_client.get_candlestick(instrument, timeframe)
     context.response = response.json()
     print(context.api_url)
     print(f"Response: {context.response}")
@@ -1,45 +1,10 @@
-import requests
 from behave import given, when, then
-from jsonschema import validate
-
-settlement_schema = {
-    "type": "object",
-    "properties": {
-        "id": { "type": "number" },
-        "method": { "type": "string" },
-        "code": { "type": "number" },
-        "result": {
-            "type": "object",
-            "properties": {
-                "data": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "i": { "type": "string" },  # Instrument name
-                            "x": { "type": "number" },  # Expiration timestamp
-                            "v": { "type": "string" },  # Settlement value
-                            "t": { "type": "number" }   # Publish timestamp
-                        },
-                        "required": [ "i", "x", "v", "t" ]
-                    }
-                }
-            },
-            "required": ["data"]
-        }
-    },
-    "required": ["id", "method", "code", "result"]
-}
+from utils.schemas import validate_schema
 
 
 @when('I request expired settlement prices with instrument_type "{instrument_type}" and page {page}')
 def step_when_request_settlement_data(context, instrument_type, page):
-    url = f"{context.base_url}/public/get-expired-settlement-price"
-    params = {
-        "instrument_type": instrument_type,
-        "page": page
-    }
-    context.response = requests.get(url, params=params)
+    context.response = context.rest_client.get_expired_settlement_price(instrument_type, page)
     context.response_json = context.response.json()
 
 @then('the response method should be "public/get-expired-settlement-price"')
@@ -49,7 +14,7 @@ def step_then_response_method(context):
 
 @then('the response should contain settlement data with instrument name, expiry, value, and timestamp')
 def step_then_validate_data_schema(context):
-    validate(instance=context.response_json, schema=settlement_schema)
+    validate_schema(context.response_json, 'get-expired-settlement-price')
 
     data = context.response_json["result"]["data"]
     assert data, "Data array is empty"
@@ -1,12 +1,8 @@
-import requests
 from behave import when, then
-import json
-
-BASE_URL = "https://uat-api.3ona.co/exchange/v1/public/get-instruments"  
 
 @when('I request the list of supported instruments from the public API')
 def step_request_instruments(context):
-    response = requests.get(BASE_URL)
+    response = context.rest_client.get_instruments(use_cache=False)
     context.response = response
     context.json = response.json()
 
@@ -1,42 +1,10 @@
-import requests
 from behave import *
-from jsonschema import validate
-
-# JSON schema definition
-insurance_schema = {
-    "type": "object",
-    "properties": {
-        "id": {"type": "number"},
-        "method": {"type": "string"},
-        "code": {"type": "number"},
-        "result": {
-            "type": "object",
-            "properties": {
-                "instrument_name": {"type": "string"},
-                "data": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "v": {"type": "string"},
-                            "t": {"type": "number"}
-                        },
-                        "required": ["v", "t"]
-                    }
-                }
-            },
-            "required": ["instrument_name", "data"]
-        }
-    },
-    "required": ["id", "method", "code", "result"]
-}
+from utils.schemas import validate_schema
 
 
 @when('I request insurance fund data for instrument "{instrument}" with count {count}')
 def step_request_insurance_data(context, instrument, count):
-    url = f"{context.base_url}/public/get-insurance"
-    params = {"instrument_name": instrument, "count": count}
-    context.response = requests.get(url, params=params)
+    context.response = context.rest_client.get_insurance(instrument, count)
     context.response_json = context.response.json()
 
 
@@ -53,7 +21,7 @@ def step_check_method(context):
 
 @then('the response should include insurance data with value and timestamp')
 def step_validate_insurance_data_schema(context):
-    validate(instance=context.response_json, schema=insurance_schema)
+    validate_schema(context.response_json, 'get-insurance')
     data = context.response_json["result"]["data"]
     assert data, "No data returned"
     record = data[0]
@@ -1,5 +1,4 @@
 from behave import given, when, then
-import requests
 
 @given('the API endpoint for get-risk-parameters is set to "{endpoint}"')
 def step_given_api_endpoint(context, endpoint):
@@ -7,7 +6,7 @@ def step_given_api_endpoint(context, endpoint):
 
 @when('I send a GET request to the endpoint')
 def step_when_send_get_request(context):
-    context.response = requests.get(context.endpoint)
+    context.response = context.rest_client.get_risk_parameters(use_cache=False)
 
 
 @then('the response should have the required root fields')
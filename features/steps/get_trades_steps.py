@@ -1,8 +1,4 @@
 from behave import *
-import requests
-
-
-BASE_URL = "https://uat-api.3ona.co/exchange/v1/public/get-trades"  # Replace with actual base URL
 
 @given('the trade count is {count:d}')
 def step_trade_account(context, count):
@@ -10,11 +6,7 @@ def step_trade_account(context, count):
 
 @when('I request the public trades from the API')
 def step_request_trades(context):
-    params = {
-        "instrument_name": context.instrument_name,
-        "count": context.count
-    }
-    response = requests.get(BASE_URL, params=params)
+    response = context.rest_client.get_trades(context.instrument_name, context.count)
     context.response = response
     context.json = response.json()
 
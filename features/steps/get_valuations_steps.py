@@ -1,50 +1,14 @@
-import requests
 from behave import given, when, then
-from jsonschema import validate
+from utils.schemas import validate_schema
 
 
-valuation_schema = {
-    "type": "object",
-    "properties": {
-        "id": {"type": "number"},
-        "method": {"type": "string"},
-        "code": {"type": "number"},
-        "result": {
-            "type": "object",
-            "properties": {
-                "data": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "v": {"type": "string"},
-                            "t": {"type": "number"}
-                        },
-                        "required": ["v", "t"]
-                    }
-                },
-                "instrument_name": {"type": "string"}
-            },
-            "required": ["data", "instrument_name"]
-        }
-    },
-    "required": ["id", "method", "code", "result"]
-}
-
 @given('the public API is setup')
 def step_given_public_api(context):
-    base_url = "https://uat-api.3ona.co/exchange/v1"
-    context.base_url = base_url
+    context.base_url = context.rest_client.base_url
 
 @when('I request "{valuation_type}" valuations for instrument "{instrument}" with count {count}')
 def step_when_request_valuation(context, valuation_type, instrument, count):
-    url = f"{context.base_url}/public/get-valuations"
-    params = {
-        "instrument_name": instrument,
-        "valuation_type": valuation_type,
-        "count": count
-    }
-    context.response = requests.get(url, params=params)
+    context.response = context.rest_client.get_valuations(instrument, valuation_type, count)
     context.response_json = context.response.json()
 
 
@@ -60,7 +24,7 @@ def step_then_check_instrument(context, instrument):
 
 @then('the response should contain data with value and timestamp')
 def step_then_validate_data_fields(context):
-    validate(instance=context.response_json, schema=valuation_schema)
+    validate_schema(context.response_json, 'get-valuations')
     data = context.response_json["result"]["data"]
     assert data, "No data entries returned"
     first_entry = data[0]
@@ -0,0 +1,14 @@
+from behave import then
+from utils.latency import latency_recorder
+
+
+@then('the p{percentile:g} latency for {name} should be under {max_ms:g} ms')
+def step_verify_latency_percentile(context, percentile, name, max_ms):
+    """Assert on every call to an endpoint recorded so far in this run, e.g. get-candlestick or ws.connect"""
+    histogram = latency_recorder.find(name)
+    assert histogram is not None and histogram.count > 0, \
+        f"No latency samples recorded for {name} (recorded: {', '.join(latency_recorder.names())})"
+
+    actual_ms = histogram.percentile_ms(percentile)
+    assert actual_ms < max_ms, \
+        f"p{percentile:g} latency for {name} is {actual_ms:.1f}ms over {histogram.count} calls, limit {max_ms:g}ms"
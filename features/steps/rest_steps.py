@@ -4,15 +4,17 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from utils.rest_client import CryptoRestClient
 from utils.data_validators import CandlestickValidator
+from utils.models import Candle
+from utils.backfill import CandleBackfill
+from utils.test_helpers import CandlestickHelpers
 from config.test_data import TestData
 from behave import given, when, then
 
 
 @given('the REST API client is initialized')
 def step_init_rest_client(context):
-    context.rest_client = CryptoRestClient()
+    context.rest_client = context.clients.rest
 
 @when('I request candlestick data for "{instrument_name}" with timeframe "{timeframe}" and count "{count}"')
 def step_request_candlestick_basic(context, instrument_name, timeframe, count):
@@ -60,6 +62,45 @@ def step_request_invalid_parameters(context, param_type):
     )
     context.response_time = time.time() - context.start_time
 
+@when('I backfill "{timeframe}" candlesticks for "{instrument}" over the last {hours:d} hours')
+def step_backfill_candlesticks(context, timeframe, instrument, hours):
+    end_ts = int(time.time() * 1000)
+    start_ts = end_ts - hours * 3600 * 1000
+
+    context.start_time = time.time()
+    context.backfill = CandleBackfill(client=context.rest_client)
+    context.candles = context.backfill.fetch(instrument, timeframe, start_ts, end_ts)
+    context.response_time = time.time() - context.start_time
+    context.backfill_timeframe = timeframe
+    context.backfill_range = (start_ts, end_ts)
+    print(f"{len(context.candles)} candles in {context.backfill.requests} requests, "
+          f"{len(context.backfill.gaps)} gaps, {context.response_time:.2f}s", end="|")
+
+@then('the backfilled candlesticks should be unique, aligned and valid')
+def step_verify_backfill(context):
+    assert context.candles, "Backfill returned no candlesticks"
+    violations = CandlestickValidator.find_violations(context.candles, context.backfill_timeframe)
+    assert not violations, \
+        f"Backfill violations (first indices): { {name: indices[:10] for name, indices in violations.items()} }"
+
+@then('the backfill should report at most {count:d} gaps')
+def step_verify_backfill_gaps(context, count):
+    gaps = context.backfill.gaps
+    assert len(gaps) <= count, f"{len(gaps)} gaps in backfilled history, first: {gaps[:5]}"
+
+@then('the backfill gaps should cover at most {percent:g}% of the range')
+def step_verify_backfill_gap_share(context, percent):
+    start_ts, end_ts = context.backfill_range
+    duration = CandlestickHelpers.get_timeframe_duration_ms(context.backfill_timeframe)
+    expected = (end_ts - end_ts % duration - (start_ts + (-start_ts) % duration)) // duration + 1
+    gaps = context.backfill.gaps
+    for gap_start, gap_end in gaps:
+        assert start_ts <= gap_start <= gap_end <= end_ts and gap_start % duration == 0, \
+            f"Malformed gap {gap_start}-{gap_end} in range {start_ts}-{end_ts}"
+    missing = sum((gap_end - gap_start) // duration + 1 for gap_start, gap_end in gaps)
+    assert missing <= expected * percent / 100, \
+        f"{missing} of {expected} candlesticks missing in {len(gaps)} gaps, first: {gaps[:5]}"
+
 @then('the response status should be {expected_status:d}')
 def step_verify_response_status(context, expected_status):
     assert context.response.status_code == expected_status, \
@@ -84,6 +125,7 @@ def step_verify_valid_candlestick_data(context):
         "Invalid candlestick response structure"
     
     context.candlestick_data = response_data
+    context.candles = context.response.data_as(Candle)
 
 @then('the instrument name should be "{expected_instrument}"')
 def step_verify_instrument_name(context, expected_instrument):
@@ -102,37 +144,32 @@ def step_verify_candlestick_count(context, expected_count):
 
 @then('all candlesticks should be within the specified time range')
 def step_verify_time_range(context):
-    result = context.candlestick_data['result']
     start_ts = int(context.time_range_start.timestamp() * 1000)
     end_ts = int(context.time_range_end.timestamp() * 1000)
     
-    for candle in result['data']:
-        candle_time = candle['t']
-        assert start_ts <= candle_time <= end_ts, \
-            f"Candlestick timestamp {candle_time} outside range [{start_ts}, {end_ts}]"
+    violations = CandlestickValidator.find_violations(context.candles, start_ts=start_ts, end_ts=end_ts)
+    outside = violations.get('before_start', []) + violations.get('after_end', [])
+    assert not outside, \
+        f"{len(outside)} candlesticks outside range [{start_ts}, {end_ts}], first at index {min(outside)}"
 
 @then('each candlestick should have valid OHLC relationships')
 def step_verify_ohlc_relationships(context):
-    result = context.candlestick_data['result']
-    assert CandlestickValidator.validate_candlestick_data_integrity(result['data']), \
+    assert CandlestickValidator.validate_candlestick_data_integrity(context.candles), \
         "Candlestick data integrity validation failed"
 
 @then('candlesticks should be in chronological order')
 def step_verify_chronological_order(context):
-    result = context.candlestick_data['result']
-    candlesticks = result['data']
+    violations = CandlestickValidator.find_violations(context.candles)
     
-    for i in range(1, len(candlesticks)):
-        assert candlesticks[i]['t'] > candlesticks[i-1]['t'], \
-            f"Candlesticks not in chronological order at index {i}"
+    assert 'not_chronological' not in violations, \
+        f"Candlesticks not in chronological order at indices {violations['not_chronological'][:10]}"
 
 @then('all volumes should be non-negative')
 def step_verify_positive_volumes(context):
-    result = context.candlestick_data['result']
+    violations = CandlestickValidator.find_violations(context.candles)
     
-    for i, candle in enumerate(result['data']):
-        volume = float(candle['v'])
-        assert volume >= 0, f"Negative volume at index {i}: {volume}"
+    assert 'negative_volume' not in violations, \
+        f"Negative volume at indices {violations['negative_volume'][:10]}"
 
 @then('the response should contain an error message')
 def step_verify_error_message(context):
@@ -0,0 +1,38 @@
+from behave import when, then
+from config.settings import config
+from utils.soak import SoakRunner, summarize
+
+
+@when('I soak the subscribed feed for {seconds:d} seconds in {window:d} second windows')
+def step_soak_feed(context, seconds, window):
+    duration = config.soak_duration_seconds or seconds
+    window_seconds = window if not config.soak_duration_seconds else config.soak_window_seconds
+    context.soak = SoakRunner(context.ws_client, window_seconds=window_seconds)
+    context.soak_windows = context.soak.run(duration)
+    print(f"{len(context.soak_windows)} soak windows: {summarize(context.soak_windows)}", end="|")
+
+@then('every soak window should receive at least {rate:g} messages per second')
+def step_verify_soak_throughput(context, rate):
+    slow = [(index, window.messages_per_second) for index, window in enumerate(context.soak_windows)
+            if window.messages_per_second < rate]
+    assert context.soak_windows, "No soak windows recorded"
+    assert not slow, f"Windows below {rate} msg/s (index, rate): {slow}"
+
+@then('the soak should have no validation failures')
+def step_verify_soak_validation(context):
+    failures = {index: window.validation_failures for index, window in enumerate(context.soak_windows)
+                if window.validation_failures}
+    assert context.soak.monitor.total_failures == 0, f"Validation failures per window: {failures}"
+
+@then('memory should grow by less than {megabytes:g} MB during the soak')
+def step_verify_soak_memory(context, megabytes):
+    growth = context.soak.monitor.rss_growth_mb()
+    if growth is None:
+        print("RSS not available on this platform, skipping memory check", end="|")
+        return
+    assert growth < megabytes, f"RSS grew by {growth:.1f} MB over the soak (limit {megabytes} MB)"
+
+@then('the soak should need at most {count:d} reconnects')
+def step_verify_soak_reconnects(context, count):
+    reconnects = context.soak.monitor.total_reconnects
+    assert reconnects <= count, f"{reconnects} reconnects during the soak"
@@ -0,0 +1,79 @@
+import socket
+import time
+from behave import given, when, then
+from utils.websocket_client import book_channels
+from utils.websocket_pool import WebSocketConnectionPool
+
+
+@given('a WebSocket connection pool of up to {connections:d} connections with {channels:d} channels each')
+def step_create_pool(context, connections, channels):
+    context.ws_pool = WebSocketConnectionPool(max_connections=connections, max_channels_per_connection=channels)
+    context.add_cleanup(context.ws_pool.close)
+
+@when('I subscribe the pool to order book depth {depth:d} for {count:d} tradable instruments')
+def step_subscribe_pool_books(context, depth, count):
+    response = context.rest_client.get_instruments()
+    assert response.status_code == 200, f"Failed to fetch instruments: status {response.status_code}"
+    instruments = [instrument['symbol'] for instrument in response.json()['result']['data']
+                   if instrument.get('tradable')][:count]
+    assert len(instruments) == count, f"Only {len(instruments)} tradable instruments returned"
+
+    context.pool_subscriptions = context.ws_pool.subscribe(book_channels(instruments, depth))
+
+@then('the pool should use {count:d} connections')
+def step_verify_pool_connections(context, count):
+    clients = context.ws_pool.clients
+    assert len(clients) == count, f"Pool uses {len(clients)} connections, expected {count}"
+    loads = [len(context.ws_pool.channels_for(client)) for client in clients]
+    assert max(loads) <= context.ws_pool.max_channels_per_connection, f"Connection over capacity: {loads}"
+
+@then('every pool subscription should be acknowledged within {seconds:d} seconds')
+def step_verify_pool_subscriptions(context, seconds):
+    for bulk in context.pool_subscriptions:
+        assert bulk.wait(timeout=seconds), \
+            f"{len(bulk.pending())} of {len(bulk.channels)} channels unacknowledged after {seconds} seconds"
+        assert not bulk.failed(), f"Pool subscriptions failed: {bulk.failed()}"
+        assert not bulk.pending(), f"Pool channels never acknowledged: {bulk.pending()}"
+
+@then('the merged queue should deliver messages from every pool channel within {seconds:d} seconds')
+def step_verify_merged_queue(context, seconds):
+    expected = set(context.ws_pool.assignments())
+    # Only count what arrives from here on, not messages queued before a rebalance
+    for _ in range(context.ws_pool.messages.qsize()):
+        context.ws_pool.get(timeout=0)
+    seen = set()
+    deadline = time.monotonic() + seconds
+    while not expected <= seen and time.monotonic() < deadline:
+        item = context.ws_pool.get(timeout=max(0.0, deadline - time.monotonic()))
+        if item is not None and item[0] is not None:
+            seen.add(item[0])
+    missing = expected - seen
+    assert not missing, f"No merged messages from {sorted(missing)} within {seconds} seconds"
+    assert context.ws_pool.dropped_messages == 0, f"{context.ws_pool.dropped_messages} merged messages dropped"
+
+@when('a pool connection closes without reconnecting')
+def step_close_pool_connection(context):
+    client = context.ws_pool.clients[0]
+    context.closed_pool_client = client
+    context.closed_pool_channels = context.ws_pool.channels_for(client)
+    context.pool_rebalances = context.ws_pool.rebalances
+    # With auto_reconnect off the close is final and the pool takes over its channels
+    client.auto_reconnect = False
+    client.ws.sock.sock.shutdown(socket.SHUT_RDWR)
+
+@then('its channels should move to other pool connections within {seconds:d} seconds')
+def step_verify_pool_rebalance(context, seconds):
+    pool = context.ws_pool
+    deadline = time.monotonic() + seconds
+    while pool.rebalances == context.pool_rebalances and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert pool.rebalances > context.pool_rebalances, f"Pool did not rebalance within {seconds} seconds"
+    assert context.closed_pool_client not in pool.clients, "Closed connection still in the pool"
+
+    clients = pool.clients
+    assignments = pool.assignments()
+    for channel in context.closed_pool_channels:
+        assert channel in assignments, f"{channel} was not moved to another connection"
+        owner = clients[assignments[channel]]
+        assert owner.wait_for_subscription(channel, timeout=max(0.0, deadline - time.monotonic())), \
+            f"{channel} not re-subscribed within {seconds} seconds"
@@ -1,6 +1,6 @@
-import time
 import sys
 import os
+import socket
 from behave import given, when, then
 from config.test_data import TestData
 
@@ -10,12 +10,13 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 # Now import your modules
-from utils.websocket_client import CryptoWebSocketClient
+from utils.websocket_client import book_channels
 from utils.data_validators import OrderBookValidator
+from utils.order_book import OrderBookTracker
 
 @given('the WebSocket client is initialized')
 def step_init_websocket_client(context):
-    context.ws_client = CryptoWebSocketClient()
+    context.ws_client = context.clients.ws
 
 @when('I connect to the WebSocket server')
 def step_connect_websocket(context):
@@ -33,8 +34,6 @@ def step_subscribe_order_book(context, instrument, depth):
     print("instrument:", instrument, "and depth:", depth, end="|")
     context.subscription_result = context.ws_client.subscribe_to_book(instrument, depth)
 
-    time.sleep(1)
-
 @when('I subscribe to order book.update with valid "{channels}" and "{book_subscription_type}" and "{book_update_frequency}"')
 def step_subscribe_valid_parameters(context, channels, book_subscription_type, book_update_frequency):
     channels = TestData.get_valid_websocket_book_update_cases()[0]['channels']
@@ -50,7 +49,35 @@ def step_subscribe_valid_parameters(context, channels, book_subscription_type, b
     # For testing purposes, we can use a fixed subscription
     context.subscription_result = context.ws_client.subscribe_to_book_update(channels, book_subscription_type, book_update_frequency)
 
-    time.sleep(1)
+@when('I maintain a local order book from order book.update')
+def step_maintain_local_order_book(context):
+    case = TestData.get_valid_websocket_book_update_cases()[0]
+    if not context.ws_client.connected:
+        context.ws_client.connect()
+    assert context.ws_client.connected, "WebSocket client not connected"
+
+    context.book_channel = case['channels']
+    context.book_tracker = OrderBookTracker(context.ws_client)
+    context.book_tracker.track(
+        case['channels'],
+        book_subscription_type=[case['book_subscription_type']],
+        book_update_frequency=[case['book_update_frequency']]
+    )
+
+@then('the local order book should stay consistent for {seconds:d} seconds')
+def step_verify_local_order_book(context, seconds):
+    tracker = context.book_tracker
+    assert not context.ws_client.wait_until_disconnected(timeout=seconds), \
+        "WebSocket disconnected while maintaining the local order book"
+
+    book = tracker.book(context.book_channel)
+    assert book.snapshots > 0, f"No snapshot received for {context.book_channel}"
+    assert not book.needs_resync, f"Local book for {context.book_channel} still waiting for resync"
+    assert tracker.crossed == 0, f"Local book crossed {tracker.crossed} times"
+    assert tracker.errors == 0, f"{tracker.errors} malformed book messages"
+    print(f"snapshots={book.snapshots} updates={book.updates} gaps={book.gaps} "
+          f"resyncs={tracker.resyncs} checksum={book.checksum()} "
+          f"checksum_mismatches={book.checksum_mismatches}", end="|")
 
 @when('I subscribe to order book with invalid instrument "{instrument}" and valid depth "{depth}"')
 def step_subscribe_invalid_instrument_valid_depth(context, instrument, depth):
@@ -58,7 +85,7 @@ def step_subscribe_invalid_instrument_valid_depth(context, instrument, depth):
     depth = TestData.get_valid_websocket_cases()[0]['depth']
     print("instrument:", instrument, "and depth:", depth, end="|")    
     context.subscription_result = context.ws_client.subscribe_to_book(instrument, depth)
-    time.sleep(1)
+    context.subscription_response = context.ws_client.wait_for_response(timeout=10)
 
 
 
@@ -68,7 +95,7 @@ def step_subscribe_valid_instrument_invalid_depth(context, instrument, depth):
     depth = TestData.get_websocket_negative_cases()[0]['depth']
     print("instrument:", instrument, "and depth:", depth, end="|")    
     context.subscription_result = context.ws_client.subscribe_to_book(instrument, depth)
-    time.sleep(1)
+    context.subscription_response = context.ws_client.wait_for_response(timeout=10)
 
 @when('I subscribe to order book for instrument "{instrument}" with depth "{depth}"')
 def step_subscribe_to_order_book(context, instrument, depth):
@@ -78,15 +105,37 @@ def step_subscribe_to_order_book(context, instrument, depth):
     depth = TestData.get_valid_websocket_cases()[1]['depth']
     
     context.subscription_result = context.ws_client.subscribe_to_book(instrument, depth)
-    
-    time.sleep(10)
+    context.subscription_response = context.ws_client.wait_for_response(timeout=10)
+
+@when('I subscribe to order book depth {depth:d} for all tradable instruments')
+def step_subscribe_all_tradable_books(context, depth):
+    response = context.rest_client.get_instruments()
+    assert response.status_code == 200, f"Failed to fetch instruments: status {response.status_code}"
+    instruments = [instrument['symbol'] for instrument in response.json()['result']['data']
+                   if instrument.get('tradable')]
+    assert instruments, "No tradable instruments returned"
+
+    context.bulk_subscription = context.ws_client.subscribe_many(book_channels(instruments, depth))
+
+@then('every book subscription should be acknowledged within {seconds:d} seconds')
+def step_verify_bulk_subscription(context, seconds):
+    bulk = context.bulk_subscription
+    assert bulk.wait(timeout=seconds), \
+        f"{len(bulk.pending())} of {len(bulk.channels)} channels unacknowledged after {seconds} seconds"
+
+    failed = bulk.failed()
+    assert not failed, f"{len(failed)} of {len(bulk.channels)} subscriptions failed: {dict(list(failed.items())[:10])}"
+    pending = bulk.pending()
+    assert not pending, f"{len(pending)} of {len(bulk.channels)} channels never acknowledged: {pending[:10]}"
 
 @then('I should receive subscription confirmation')
 def step_verify_subscription_confirmation(context):
     assert context.subscription_result, "Subscription request failed"
     
-    # Wait for confirmation message
-    time.sleep(10)
+    # Wait for the response to the subscribe request
+    context.subscription_response = context.ws_client.wait_for_response(timeout=10)
+    assert context.subscription_response is not None, \
+        f"No response to subscribe request {context.ws_client.last_request_id} within 10 seconds"
     #channels = "book.BTCUSD-PERP.10"
     #assert context.ws_client.is_subscribed(channels), "No confirmation received for {channels}"
 
@@ -109,28 +158,31 @@ def step_verify_order_book_structure(context):
         assert OrderBookValidator.validate_order_book_structure(update), \
             "Invalid order book structure"
 
+def _order_book_violations(context):
+    """Parse each received book update once and cache its invariant violations"""
+    if not hasattr(context, 'order_book_violations'):
+        context.order_book_violations = [OrderBookValidator.find_violations(update)
+                                         for update in context.order_book_data]
+    return context.order_book_violations
+
 @then('the bid and ask prices should be in correct order')
 def step_verify_bid_ask_order(context):
-    for update in context.order_book_data:
-        assert OrderBookValidator.validate_bid_ask_order(update), \
-            "Bid and ask prices not in correct order"
+    for i, violations in enumerate(_order_book_violations(context)):
+        assert 'bids_not_sorted' not in violations and 'asks_not_sorted' not in violations, \
+            f"Bid and ask prices not in correct order in update {i}: {violations}"
 
 @then('all price and quantity values should be positive')
 def step_verify_positive_values(context):
-    for update in context.order_book_data:
-        assert OrderBookValidator.validate_positive_values(update), \
-            "Found non-positive price or quantity values"
+    for i, violations in enumerate(_order_book_violations(context)):
+        assert 'bids_non_positive' not in violations and 'asks_non_positive' not in violations, \
+            f"Found non-positive price or quantity values in update {i}: {violations}"
 
 @then('the depth should not exceed {max_depth:d} levels')
 def step_verify_depth_limit(context, max_depth):
-    for update in context.order_book_data:
-        data = update.get('params', {}).get('data', [])
-        if data:
-            bids = data[0].get('bids', [])
-            asks = data[0].get('asks', [])
-            
-            assert len(bids) <= max_depth, f"Bids depth {len(bids)} exceeds limit {max_depth}"
-            assert len(asks) <= max_depth, f"Asks depth {len(asks)} exceeds limit {max_depth}"
+    for i, update in enumerate(context.order_book_data):
+        violations = OrderBookValidator.find_violations(update, max_depth=max_depth)
+        assert 'bids_over_depth' not in violations, f"Bids depth exceeds limit {max_depth} in update {i}"
+        assert 'asks_over_depth' not in violations, f"Asks depth exceeds limit {max_depth} in update {i}"
 
 @then('I should receive an error message')
 def step_verify_error_message(context):
@@ -153,7 +205,7 @@ def step_disconnect_websocket(context):
 
 @then('the connection should be closed gracefully')
 def step_verify_disconnection(context):
-    time.sleep(1)
+    context.ws_client.wait_until_disconnected(timeout=5)
     assert not context.ws_client.connected, "WebSocket still connected after disconnect"
 
 @then('I should receive order book updates within {seconds:d} seconds')
@@ -163,27 +215,60 @@ def step_verify_timely_updates(context, seconds):
 
 @then('updates should be received continuously')
 def step_verify_continuous_updates(context):
-    initial_count = len(context.ws_client.get_received_messages())
-    time.sleep(10)
-    final_count = len(context.ws_client.get_received_messages())
-    
-    assert final_count > initial_count, "No continuous updates received"
+    assert context.ws_client.wait_for_messages(timeout=10), "No continuous updates received"
+
+@then('the connection should stay up without reconnecting for {seconds:d} seconds')
+def step_verify_connection_stays_up(context, seconds):
+    reconnects = context.ws_client.reconnects
+    assert not context.ws_client.wait_until_disconnected(timeout=seconds), \
+        f"Connection dropped within {seconds} seconds: {context.ws_client.connection_error}"
+    assert context.ws_client.reconnects == reconnects, \
+        f"{context.ws_client.reconnects - reconnects} reconnects within {seconds} seconds"
+
+@then('at least {count:d} heartbeats should have been answered')
+def step_verify_heartbeats(context, count):
+    assert context.ws_client.heartbeats >= count, \
+        f"Only {context.ws_client.heartbeats} heartbeats answered, expected at least {count}"
+
+@given('a subscribed websocket connection')
+def step_subscribed_connection(context):
+    context.ws_client = context.clients.connected_ws()
+    case = TestData.get_valid_websocket_cases()[0]
+    assert context.ws_client.subscribe_to_book(case['instrument'], case['depth']), "Book subscription failed"
+    assert context.ws_client.wait_for_messages(timeout=10), "No messages received before the connection loss"
+    context.reconnect_channels = context.ws_client.subscribed_channels()
+    context.reconnects_baseline = context.ws_client.reconnects
 
 @given('the websocket connection is lost')
+@when('the websocket connection is lost')
 def step_given(context):
+    context.reconnects_before = context.ws_client.reconnects
     print("Simulating WebSocket connection loss...")
-    # Simulate connection loss by disconnecting the client
-    context.ws_client.disconnect()
+    # The only drop in these scenarios: shut the TCP socket down underneath
+    # the client, as a lost connection would
+    context.ws_client.ws.sock.sock.shutdown(socket.SHUT_RDWR)
 
 
 @when('the system attempts to reconnect')
 def step_when(context):
-    time.sleep(5)
-    print("Attempting to reconnect WebSocket...")
-    context.connection_result = context.ws_client.connect() 
+    print("Waiting for the WebSocket client to reconnect...")
+    context.connection_result = context.ws_client.wait_for_reconnect(context.reconnects_before, timeout=10)
 
 @then('the WebSocket should be reconnected successfully')
 def step_then(context):
     assert context.connection_result, "Failed to reconnect WebSocket"
     assert context.ws_client.connected, "WebSocket client not in connected state after reconnection"
-    print("WebSocket reconnected successfully")
\ No newline at end of file
+    print("WebSocket reconnected successfully")
+
+@then('the subscriptions should be restored within {seconds:d} seconds')
+def step_verify_subscriptions_restored(context, seconds):
+    for channel in context.reconnect_channels:
+        assert context.ws_client.wait_for_subscription(channel, timeout=seconds), \
+            f"Subscription to {channel} not restored within {seconds} seconds"
+    assert context.ws_client.wait_for_messages(timeout=seconds), \
+        f"No messages received within {seconds} seconds of reconnecting"
+
+@then('exactly {count:d} reconnects should have happened')
+def step_verify_reconnect_count(context, count):
+    reconnects = context.ws_client.reconnects - context.reconnects_baseline
+    assert reconnects == count, f"{reconnects} reconnects for {count} forced drops"
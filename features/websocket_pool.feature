@@ -0,0 +1,22 @@
+Feature: WebSocket Connection Pool
+  As a developer subscribing to many channels
+  I want subscriptions sharded over several WebSocket connections
+  So that no single connection carries more channels than it should
+
+  @pool
+  Scenario: Shard order book subscriptions across connections
+    Given a WebSocket connection pool of up to 3 connections with 2 channels each
+    When I subscribe the pool to order book depth 10 for 4 tradable instruments
+    Then the pool should use 2 connections
+    And every pool subscription should be acknowledged within 10 seconds
+    And the merged queue should deliver messages from every pool channel within 10 seconds
+
+  @pool
+  Scenario: Move channels off a connection that closes for good
+    Given a WebSocket connection pool of up to 3 connections with 2 channels each
+    When I subscribe the pool to order book depth 10 for 4 tradable instruments
+    Then every pool subscription should be acknowledged within 10 seconds
+    When a pool connection closes without reconnecting
+    Then its channels should move to other pool connections within 10 seconds
+    And the pool should use 2 connections
+    And the merged queue should deliver messages from every pool channel within 10 seconds
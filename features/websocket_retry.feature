@@ -1,6 +1,25 @@
 Feature: Websocket Retry
 
   Scenario: Retry connection on websocket failure
+    Given a subscribed websocket connection
+    Then the connection should stay up without reconnecting for 5 seconds
     Given the websocket connection is lost
     When the system attempts to reconnect
     Then the webSocket should be reconnected successfully
+    And the subscriptions should be restored within 5 seconds
+    And exactly 1 reconnects should have happened
+    And the connection should stay up without reconnecting for 5 seconds
+    And the p99 latency for ws.reconnect should be under 5000 ms
+
+  Scenario: Recover from repeated connection drops
+    Given a subscribed websocket connection
+    When the websocket connection is lost
+    And the system attempts to reconnect
+    Then the webSocket should be reconnected successfully
+    And the subscriptions should be restored within 5 seconds
+    When the websocket connection is lost
+    And the system attempts to reconnect
+    Then the webSocket should be reconnected successfully
+    And the subscriptions should be restored within 5 seconds
+    And exactly 2 reconnects should have happened
+    And the connection should stay up without reconnecting for 5 seconds
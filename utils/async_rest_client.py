@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from config.settings import config
+from utils.json_codec import ApiResponse
+from utils.models import Instrument
+from utils.rest_client import CryptoRestClient
+
+logger = logging.getLogger(__name__)
+
+# A batch call is (method name on CryptoRestClient, keyword arguments)
+BatchCall = Tuple[str, Dict[str, Any]]
+
+
+class AsyncCryptoRestClient:
+    """
+    asyncio front-end for CryptoRestClient.
+
+    Requests are sent on the same pooled keep-alive session as the sync client
+    and run on a worker pool, with an asyncio semaphore bounding how many are
+    in flight at once.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 rest_client: Optional[CryptoRestClient] = None):
+        self.max_concurrency = max_concurrency or config.rest_max_concurrency
+        self._owns_client = rest_client is None
+        self.rest_client = rest_client or CryptoRestClient()
+        self.base_url = self.rest_client.base_url
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="async-rest"
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency semaphore bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a CryptoRestClient method on the worker pool under the semaphore"""
+        func = getattr(self.rest_client, method)
+        async with self._get_semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def get_candlestick(self, instrument_name: str, timeframe: str,
+                              count: Optional[int] = None, start_ts: Optional[int] = None,
+                              end_ts: Optional[int] = None) -> ApiResponse:
+        """Get candlestick data from public/get-candlestick endpoint"""
+        return await self._call("get_candlestick", instrument_name, timeframe,
+                                count=count, start_ts=start_ts, end_ts=end_ts)
+
+    async def get_book(self, instrument_name: str, depth: Optional[int] = None) -> ApiResponse:
+        """Get order book snapshot from public/get-book endpoint"""
+        return await self._call("get_book", instrument_name, depth)
+
+    async def get_trades(self, instrument_name: str, count: Optional[int] = None,
+                         start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> ApiResponse:
+        """Get recent public trades from public/get-trades endpoint"""
+        return await self._call("get_trades", instrument_name,
+                                count=count, start_ts=start_ts, end_ts=end_ts)
+
+    async def get_tickers(self, instrument_name: Optional[str] = None) -> ApiResponse:
+        """Get tickers for one instrument, or all instruments if omitted"""
+        return await self._call("get_tickers", instrument_name)
+
+    async def get_valuations(self, instrument_name: str, valuation_type: str,
+                             count: Optional[int] = None, start_ts: Optional[int] = None,
+                             end_ts: Optional[int] = None) -> ApiResponse:
+        """Get valuation data from public/get-valuations endpoint"""
+        return await self._call("get_valuations", instrument_name, valuation_type,
+                                count=count, start_ts=start_ts, end_ts=end_ts)
+
+    async def get_insurance(self, instrument_name: str, count: Optional[int] = None,
+                            start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> ApiResponse:
+        """Get insurance fund balance history from public/get-insurance endpoint"""
+        return await self._call("get_insurance", instrument_name,
+                                count=count, start_ts=start_ts, end_ts=end_ts)
+
+    async def get_announcements(self, category: Optional[str] = None,
+                                product_type: Optional[str] = None) -> ApiResponse:
+        """Get exchange announcements, optionally filtered by category and product type"""
+        return await self._call("get_announcements", category, product_type)
+
+    async def get_instruments(self, use_cache: bool = True) -> ApiResponse:
+        """Get list of available instruments (cached unless use_cache is False)"""
+        return await self._call("get_instruments", use_cache)
+
+    async def get_risk_parameters(self, use_cache: bool = True) -> ApiResponse:
+        """Get default and per-currency risk parameters (cached unless use_cache is False)"""
+        return await self._call("get_risk_parameters", use_cache)
+
+    async def get_instrument(self, symbol: str) -> Optional[Instrument]:
+        """Instrument metadata by symbol, or None if unknown"""
+        return await self._call("get_instrument", symbol)
+
+    async def get_currency_risk_parameters(self, instrument_name: str) -> Optional[Dict[str, Any]]:
+        """base_currency_config entry for a currency (e.g. BTC), or None if it uses the defaults"""
+        return await self._call("get_currency_risk_parameters", instrument_name)
+
+    async def get_expired_settlement_price(self, instrument_type: str,
+                                           page: Optional[int] = None) -> ApiResponse:
+        """Get settlement prices of expired instruments (e.g., FUTURE)"""
+        return await self._call("get_expired_settlement_price", instrument_type, page)
+
+    async def gather(self, calls: Iterable[BatchCall],
+                     return_exceptions: bool = False) -> List[Any]:
+        """
+        Run many calls concurrently and return their results in input order
+
+        Args:
+            calls: (method name, kwargs) pairs, e.g. ("get_book", {"instrument_name": "BTCUSD-PERP"})
+            return_exceptions: Return raised exceptions in place of results instead of raising
+        """
+        calls = list(calls)
+        # Validate every name before creating any coroutine, so none is left un-awaited
+        unknown = sorted({method for method, _ in calls if not self._is_endpoint(method)})
+        if unknown:
+            raise ValueError(f"Unknown batch methods {unknown}")
+        coroutines = [getattr(self, method)(**kwargs) for method, kwargs in calls]
+        logger.info(f"Dispatching batch of {len(coroutines)} requests "
+                    f"(max concurrency {self.max_concurrency})")
+        return await asyncio.gather(*coroutines, return_exceptions=return_exceptions)
+
+    def _is_endpoint(self, method: str) -> bool:
+        return (not method.startswith('_') and method != 'gather'
+                and asyncio.iscoroutinefunction(getattr(self, method, None)))
+
+    def run_batch(self, calls: Iterable[BatchCall],
+                  return_exceptions: bool = False) -> List[Any]:
+        """Blocking wrapper around gather() for synchronous callers such as behave steps"""
+        return asyncio.run(self.gather(calls, return_exceptions=return_exceptions))
+
+    def close(self) -> None:
+        """Shut down the worker pool and close the underlying client if this instance created it"""
+        self._executor.shutdown(wait=True)
+        if self._owns_client:
+            self.rest_client.close()
+
+    async def __aenter__(self) -> "AsyncCryptoRestClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,133 @@
+import logging
+from typing import Callable, Dict, Optional
+from config.settings import config
+from utils.reference_data import ReferenceDataCache
+from utils.rest_client import CryptoRestClient
+from utils.websocket_client import CryptoWebSocketClient
+
+logger = logging.getLogger(__name__)
+
+# Narrowest last: a client lives until the end of its scope
+SCOPES = ('run', 'feature', 'scenario')
+
+
+def _check_scope(scope: str) -> str:
+    if scope not in SCOPES:
+        raise ValueError(f"Unknown client scope '{scope}', expected one of {SCOPES}")
+    return scope
+
+
+class ClientManager:
+    """
+    Owns the REST and WebSocket clients of a test run
+
+    Clients are created on first use and kept for their scope (run, feature or
+    scenario). Between scenarios a longer-lived WebSocket client is reset
+    instead of reconnected: subscriptions, buffers and handlers are cleared
+    but the socket stays open. A client that fails its health check (closed
+    or errored connection) is dropped and rebuilt on next use.
+    """
+
+    def __init__(self, rest_scope: Optional[str] = None, ws_scope: Optional[str] = None,
+                 rest_factory: Callable[[], CryptoRestClient] = CryptoRestClient,
+                 ws_factory: Callable[[], CryptoWebSocketClient] = CryptoWebSocketClient):
+        """
+        Args:
+            rest_scope: Lifetime of the REST client; defaults to config.rest_client_scope
+            ws_scope: Lifetime of the WebSocket client; defaults to config.ws_client_scope
+            rest_factory: Builds the REST client, e.g. one with a history cache
+            ws_factory: Builds the WebSocket client
+        """
+        self.rest_scope = _check_scope(rest_scope or config.rest_client_scope)
+        self.ws_scope = _check_scope(ws_scope or config.ws_client_scope)
+        self.rest_factory = rest_factory
+        self.ws_factory = ws_factory
+        self._rest: Optional[CryptoRestClient] = None
+        self._ws: Optional[CryptoWebSocketClient] = None
+        # base URL -> REST client for features that name a host other than config.rest_base_url
+        self._rest_by_url: Dict[str, CryptoRestClient] = {}
+        self.stats: Dict[str, int] = {'rest_created': 0, 'ws_created': 0, 'ws_resets': 0, 'ws_replaced': 0}
+
+    @property
+    def rest(self) -> CryptoRestClient:
+        if self._rest is None:
+            self._rest = self.rest_factory()
+            self.stats['rest_created'] += 1
+        return self._rest
+
+    def rest_for(self, base_url: str) -> CryptoRestClient:
+        """REST client for `base_url`: the scope's client if it already points there, else one kept alongside it"""
+        base_url = base_url.rstrip('/')
+        if self.rest.base_url == base_url:
+            return self._rest
+        if base_url not in self._rest_by_url:
+            # Its own reference cache: cached instruments of one host must not answer for another
+            self._rest_by_url[base_url] = CryptoRestClient(base_url=base_url, reference_cache=ReferenceDataCache())
+            self.stats['rest_created'] += 1
+        return self._rest_by_url[base_url]
+
+    @property
+    def ws(self) -> CryptoWebSocketClient:
+        """WebSocket client for the current scope; it connects only when a step asks it to"""
+        if self._ws is None:
+            self._ws = self.ws_factory()
+            self.stats['ws_created'] += 1
+        return self._ws
+
+    def connected_ws(self) -> CryptoWebSocketClient:
+        """WebSocket client with an open connection, connecting if needed"""
+        client = self.ws
+        if not client.connect():
+            raise ConnectionError(f"WebSocket connection failed: {client.connection_error}")
+        return client
+
+    def check_health(self) -> None:
+        """
+        Drop a WebSocket client whose connection died on its own
+
+        A never-connected client is kept, and one that is reconnecting is given
+        up to websocket_timeout to finish first.
+        """
+        client = self._ws
+        if client is None or client.ws is None or client.is_healthy():
+            return
+        if client.reconnecting:
+            with client.condition:
+                client.condition.wait_for(lambda: not client.reconnecting, config.websocket_timeout)
+            if client.is_healthy():
+                return
+        logger.info(f"Replacing unhealthy WebSocket client (error: {client.connection_error})")
+        client.disconnect()
+        self._ws = None
+        self.stats['ws_replaced'] += 1
+
+    def end_scope(self, scope: str) -> None:
+        """
+        Close clients that live only as long as `scope`
+
+        At the end of a scenario, a WebSocket client that outlives it is reset
+        instead so the next scenario starts clean on the same connection.
+        """
+        _check_scope(scope)
+        ending = SCOPES[SCOPES.index(scope):]
+
+        if self.rest_scope in ending:
+            if self._rest is not None:
+                self._rest.close()
+                self._rest = None
+            for client in self._rest_by_url.values():
+                client.close()
+            self._rest_by_url.clear()
+
+        if self._ws is not None:
+            if self.ws_scope in ending:
+                self._ws.disconnect()
+                self._ws = None
+            elif scope == 'scenario':
+                self._ws.reset()
+                self.stats['ws_resets'] += 1
+
+    def close(self) -> None:
+        """Close every client (end of the run)"""
+        self.end_scope('run')
+        logger.info(f"Client lifecycle: {self.stats}")
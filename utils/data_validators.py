@@ -1,9 +1,103 @@
 import logging
-from typing import Dict, Any, List
+import numpy as np
+from typing import Dict, Any, List, Optional, Union
+from utils.models import Candle, as_candles
+from utils.test_helpers import BookHelpers, CandlestickHelpers
 
 logger = logging.getLogger(__name__)
 
+# Timeframes whose candles are not evenly spaced (calendar months)
+CALENDAR_TIMEFRAMES = {'1M'}
+
+
+class CandlestickArrays:
+    """
+    Candlestick batch parsed once into columns: float64 o/h/l/c/v and int64 t
+
+    Missing price or volume fields parse to NaN and a missing timestamp to -1,
+    so every check can run as a vectorized comparison over the whole batch.
+    """
+
+    def __init__(self, o: np.ndarray, h: np.ndarray, l: np.ndarray, c: np.ndarray,
+                 v: np.ndarray, t: np.ndarray):
+        self.o, self.h, self.l, self.c, self.v, self.t = o, h, l, c, v, t
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    @classmethod
+    def from_candles(cls, candles: List[Union[Candle, Dict[str, Any]]]) -> "CandlestickArrays":
+        """Build columns from Candle models (no re-parsing) or raw candle dicts"""
+        if candles and isinstance(candles[0], Candle):
+            return cls.from_models(as_candles(candles))
+        values = np.fromiter(
+            (float(candle.get(field, 'nan')) for candle in candles for field in 'ohlcv'),
+            dtype=np.float64, count=5 * len(candles)
+        ).reshape(len(candles), 5)
+        t = np.fromiter((candle.get('t', -1) for candle in candles), dtype=np.int64, count=len(candles))
+        return cls(*values.T, t)
+
+    @classmethod
+    def from_models(cls, candles: List[Candle]) -> "CandlestickArrays":
+        values = np.fromiter(
+            (value for candle in candles
+             for value in (candle.open, candle.high, candle.low, candle.close, candle.volume)),
+            dtype=np.float64, count=5 * len(candles)
+        ).reshape(len(candles), 5)
+        t = np.fromiter((candle.timestamp for candle in candles), dtype=np.int64, count=len(candles))
+        return cls(*values.T, t)
+
+    @classmethod
+    def from_response(cls, response_data: Dict[str, Any]) -> "CandlestickArrays":
+        return cls.from_candles(response_data['result']['data'])
+
+    def find_violations(self, timeframe: Optional[str] = None, start_ts: Optional[int] = None,
+                        end_ts: Optional[int] = None) -> Dict[str, List[int]]:
+        """
+        Run every candle check over the batch
+
+        Args:
+            timeframe: Also check candle spacing is a multiple of this timeframe (e.g. M5)
+            start_ts: Also check no candle starts before this timestamp in milliseconds
+            end_ts: Also check no candle starts after this timestamp in milliseconds
+
+        Returns:
+            Check name -> indices of the violating candles, for failed checks only
+        """
+        o, h, l, c, v, t = self.o, self.h, self.l, self.c, self.v, self.t
+        checks = {
+            'missing_fields': np.isnan(np.column_stack((o, h, l, c, v))).any(axis=1) | (t < 0),
+            'high_below_open_close_low': h < np.maximum(np.maximum(o, c), l),
+            'low_above_open_close': l > np.minimum(o, c),
+            'non_positive_price': (o <= 0) | (h <= 0) | (l <= 0) | (c <= 0),
+            'negative_volume': v < 0,
+        }
+        violations = {name: np.flatnonzero(mask).tolist() for name, mask in checks.items()}
+
+        if len(t) > 1:
+            steps = np.diff(t)
+            violations['not_chronological'] = (np.flatnonzero(steps <= 0) + 1).tolist()
+            duration = CandlestickHelpers.get_timeframe_duration_ms(timeframe) if timeframe else 0
+            if duration and timeframe not in CALENDAR_TIMEFRAMES:
+                violations['misaligned_spacing'] = (np.flatnonzero(steps % duration != 0) + 1).tolist()
+        if start_ts is not None:
+            violations['before_start'] = np.flatnonzero(t < start_ts).tolist()
+        if end_ts is not None:
+            violations['after_end'] = np.flatnonzero(t > end_ts).tolist()
+
+        return {name: indices for name, indices in violations.items() if indices}
+
+
 class CandlestickValidator:
+
+    # Checks that make a candle invalid on its own, as opposed to batch-level ordering checks
+    CANDLE_CHECKS = ('missing_fields', 'high_below_open_close_low', 'low_above_open_close', 'negative_volume')
+
+    @staticmethod
+    def find_violations(candlesticks: List[Union[Candle, Dict[str, Any]]], timeframe: Optional[str] = None,
+                        start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> Dict[str, List[int]]:
+        """Vectorized checks over a candle list; see CandlestickArrays.find_violations"""
+        return CandlestickArrays.from_candles(candlesticks).find_violations(timeframe, start_ts, end_ts)
     
     @staticmethod
     def validate_candlestick_response(response_data: Dict[str, Any]) -> bool:
@@ -21,9 +115,8 @@ class CandlestickValidator:
             data = result['data']
             assert isinstance(data, list), "Data should be a list"
             
-            for candle in data:
-                assert CandlestickValidator._validate_single_candle(candle), \
-                    "Invalid candlestick data"
+            assert CandlestickValidator.validate_candlestick_data_integrity(data), \
+                "Invalid candlestick data"
             
             return True
             
@@ -32,20 +125,21 @@ class CandlestickValidator:
             return False
     
     @staticmethod
-    def _validate_single_candle(candle: Dict[str, Any]) -> bool:
+    def _validate_single_candle(candle: Union[Candle, Dict[str, Any]]) -> bool:
         """Validate single candlestick data"""
-        required_fields = ['o', 'h', 'l', 'c', 'v', 't']
+        if not isinstance(candle, Candle):
+            candle = Candle.from_raw(candle)
         
-        for field in required_fields:
-            if field not in candle:
-                return False
+        # Missing fields parse to NaN (prices) or -1 (timestamp)
+        if candle.timestamp < 0:
+            return False
         
-        # Validate OHLC relationships
-        open_price = float(candle['o'])
-        high_price = float(candle['h'])
-        low_price = float(candle['l'])
-        close_price = float(candle['c'])
-        volume = float(candle['v'])
+        # Validate OHLC relationships; any comparison with NaN fails
+        open_price = candle.open
+        high_price = candle.high
+        low_price = candle.low
+        close_price = candle.close
+        volume = candle.volume
         
         # High should be >= all other prices
         if not (high_price >= open_price and high_price >= close_price and high_price >= low_price):
@@ -56,23 +150,94 @@ class CandlestickValidator:
             return False
         
         # Volume should be non-negative
-        if volume < 0:
+        if not volume >= 0:
             return False
         
         return True
     
     @staticmethod
-    def validate_candlestick_data_integrity(candlesticks: List[Dict[str, Any]]) -> bool:
+    def validate_candlestick_data_integrity(candlesticks: List[Union[Candle, Dict[str, Any]]]) -> bool:
         """Validate integrity of candlestick data array"""
         try:
-            for candle in candlesticks:
-                if not CandlestickValidator._validate_single_candle(candle):
-                    return False
+            violations = CandlestickValidator.find_violations(candlesticks)
+            failed = {name: violations[name][:10] for name in CandlestickValidator.CANDLE_CHECKS if name in violations}
+            if failed:
+                logger.error(f"Invalid candles (first indices per check): {failed}")
+                return False
             return True
         except Exception as e:
             logger.error(f"Data integrity validation failed: {e}")
             return False
 
+class OrderBookArrays:
+    """
+    Order book message parsed once into (n, 3) price/quantity/count arrays per side
+
+    Delta messages (book.update) are parsed from their `update` field; levels
+    in a delta may carry a zero quantity to remove a price level.
+    """
+
+    def __init__(self, bids: np.ndarray, asks: np.ndarray, instrument_name: Optional[str] = None,
+                 is_delta: bool = False):
+        self.bids = bids
+        self.asks = asks
+        self.instrument_name = instrument_name
+        self.is_delta = is_delta
+
+    @classmethod
+    def from_book_data(cls, book_data: Dict[str, Any], instrument_name: Optional[str] = None) -> "OrderBookArrays":
+        levels = book_data.get('update', book_data)
+        return cls(
+            BookHelpers.levels_to_array(levels.get('bids', [])),
+            BookHelpers.levels_to_array(levels.get('asks', [])),
+            book_data.get('instrument_name', instrument_name),
+            is_delta='update' in book_data
+        )
+
+    @classmethod
+    def from_message(cls, message: Dict[str, Any]) -> Optional["OrderBookArrays"]:
+        """Parse a REST get-book response or WebSocket book push; None if it carries no book data"""
+        payload = message.get('result') or message.get('params') or {}
+        data = payload.get('data') or []
+        if not data:
+            return None
+        return cls.from_book_data(data[0], payload.get('instrument_name'))
+
+    def find_violations(self, tick_size: Optional[float] = None,
+                        max_depth: Optional[int] = None) -> Dict[str, List[int]]:
+        """
+        Run every book invariant over both sides
+
+        Args:
+            tick_size: Also check every price is a multiple of the instrument's price_tick_size
+            max_depth: Also check neither side has more than this many levels
+
+        Returns:
+            Check name -> indices of the violating levels, for failed checks only.
+            'crossed' holds [0] when the best bid is at or above the best ask.
+        """
+        violations: Dict[str, List[int]] = {}
+        for side, levels, direction in (('bids', self.bids, -1), ('asks', self.asks, 1)):
+            prices, quantities, counts = levels[:, 0], levels[:, 1], levels[:, 2]
+            if self.is_delta:
+                invalid = (prices <= 0) | (quantities < 0) | (counts < 0)
+            else:
+                # Same rules as the per-level checks: equal adjacent prices are in order, counts aren't checked
+                invalid = (prices <= 0) | (quantities <= 0)
+                violations[f'{side}_not_sorted'] = (np.flatnonzero(np.diff(prices) * direction < 0) + 1).tolist()
+                if max_depth is not None:
+                    violations[f'{side}_over_depth'] = list(range(max_depth, len(prices)))
+            violations[f'{side}_non_positive'] = np.flatnonzero(invalid).tolist()
+            if tick_size:
+                ticks = prices / tick_size
+                off_tick = np.abs(ticks - np.round(ticks)) > 1e-6 * np.maximum(1.0, np.abs(ticks))
+                violations[f'{side}_off_tick'] = np.flatnonzero(off_tick).tolist()
+
+        if not self.is_delta and len(self.bids) and len(self.asks) and self.bids[0, 0] >= self.asks[0, 0]:
+            violations['crossed'] = [0]
+        return {name: indices for name, indices in violations.items() if indices}
+
+
 class OrderBookValidator:
     
     @staticmethod
@@ -102,29 +267,19 @@ class OrderBookValidator:
             logger.error(f"Order book structure validation failed: {e}")
             return False
     
+    @staticmethod
+    def find_violations(message: Dict[str, Any], tick_size: Optional[float] = None,
+                        max_depth: Optional[int] = None) -> Dict[str, List[int]]:
+        """Parse a book message once and run every invariant; see OrderBookArrays.find_violations"""
+        book = OrderBookArrays.from_message(message)
+        return book.find_violations(tick_size, max_depth) if book is not None else {}
+    
     @staticmethod
     def validate_bid_ask_order(message: Dict[str, Any]) -> bool:
         """Validate that bids are in descending order and asks in ascending order"""
         try:
-            data = message['params']['data']
-            if not data:
-                return True
-            
-            book_data = data[0]
-            bids = book_data.get('bids', [])
-            asks = book_data.get('asks', [])
-            
-            # Validate bids are in descending order (highest price first)
-            for i in range(1, len(bids)):
-                if float(bids[i][0]) > float(bids[i-1][0]):
-                    return False
-            
-            # Validate asks are in ascending order (lowest price first)
-            for i in range(1, len(asks)):
-                if float(asks[i][0]) < float(asks[i-1][0]):
-                    return False
-            
-            return True
+            violations = OrderBookValidator.find_violations(message)
+            return 'bids_not_sorted' not in violations and 'asks_not_sorted' not in violations
             
         except (KeyError, TypeError, IndexError, ValueError) as e:
             logger.error(f"Bid/ask order validation failed: {e}")
@@ -134,28 +289,18 @@ class OrderBookValidator:
     def validate_positive_values(message: Dict[str, Any]) -> bool:
         """Validate that all prices and quantities are positive"""
         try:
-            data = message['params']['data']
-            if not data:
-                return True
-            
-            book_data = data[0]
-            bids = book_data.get('bids', [])
-            asks = book_data.get('asks', [])
-            
-            # Check all bid prices and quantities
-            for bid in bids:
-                price, quantity = float(bid[0]), float(bid[1])
-                if price <= 0 or quantity <= 0:
-                    return False
-            
-            # Check all ask prices and quantities
-            for ask in asks:
-                price, quantity = float(ask[0]), float(ask[1])
-                if price <= 0 or quantity <= 0:
-                    return False
-            
-            return True
+            violations = OrderBookValidator.find_violations(message)
+            return 'bids_non_positive' not in violations and 'asks_non_positive' not in violations
             
         except (KeyError, TypeError, IndexError, ValueError) as e:
             logger.error(f"Positive values validation failed: {e}")
             return False
+    
+    @staticmethod
+    def tick_sizes(instruments_response: Dict[str, Any]) -> Dict[str, float]:
+        """Map instrument symbol -> price_tick_size from a public/get-instruments response"""
+        return {
+            instrument['symbol']: float(instrument['price_tick_size'])
+            for instrument in instruments_response.get('result', {}).get('data', [])
+            if instrument.get('price_tick_size')
+        }
@@ -0,0 +1,178 @@
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from config.settings import config
+from utils.latency import LatencyHistogram, LatencyRecorder, latency_recorder
+from utils.websocket_client import CryptoWebSocketClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChannelFeedStats:
+    """Feed quality counters for one channel"""
+    channel: str
+    messages: int = 0
+    updates: int = 0
+    gaps: int = 0
+    duplicates: int = 0
+    out_of_order: int = 0
+    stale: int = 0
+    last_sequence: Optional[int] = None
+    last_timestamp: Optional[int] = None
+    last_received_ms: Optional[int] = None
+    max_lag_ms: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'messages': self.messages,
+            'updates': self.updates,
+            'gaps': self.gaps,
+            'duplicates': self.duplicates,
+            'out_of_order': self.out_of_order,
+            'stale': self.stale,
+            'max_lag_ms': self.max_lag_ms,
+        }
+
+
+def _sequence_of(entry: Dict[str, Any]) -> Optional[int]:
+    """Update id of a book entry (u) or numeric trade id (d), if present"""
+    for key in ('u', 'd'):
+        value = entry.get(key)
+        if value is not None:
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class FeedMonitor:
+    """
+    Streaming checker of sequence ids and exchange timestamps per channel
+
+    For each pushed data entry it checks:
+      - gaps: `pu` (previous update id) differs from the last seen `u`
+      - duplicates: the same sequence id (u, or trade id d) seen again
+      - out-of-order: a lower sequence id, or an older `t` on channels without ids
+      - stale: the entry's `t` is older than `stale_after_ms` when received
+
+    Counters are per data entry (`updates`); `messages` counts push messages.
+
+    Receive lag (local clock minus `t`) is recorded in the latency recorder
+    as ws.lag.<channel type>, e.g. ws.lag.book.
+    """
+
+    def __init__(self, stale_after_ms: Optional[int] = None,
+                 recorder: Optional[LatencyRecorder] = None):
+        self.stale_after_ms = stale_after_ms or config.ws_stale_after_ms
+        self.recorder = recorder or latency_recorder
+        self.channels: Dict[str, ChannelFeedStats] = {}
+        self._lock = threading.Lock()
+        self._client: Optional[CryptoWebSocketClient] = None
+
+    def attach(self, client: CryptoWebSocketClient) -> None:
+        """Observe every message the client receives"""
+        self._client = client
+        client.add_message_handler('feed_monitor', self.observe)
+        client.add_reconnect_handler('feed_monitor', self._on_reconnect)
+
+    def detach(self) -> None:
+        if self._client is not None:
+            self._client.remove_message_handler('feed_monitor')
+            self._client.remove_reconnect_handler('feed_monitor')
+            self._client = None
+
+    def _on_reconnect(self, client: CryptoWebSocketClient) -> None:
+        """Sequences restart with the replayed subscriptions, so the break is not counted as a gap"""
+        with self._lock:
+            for stats in self.channels.values():
+                stats.last_sequence = None
+
+    def observe(self, message: Dict[str, Any], channel: Optional[str]) -> None:
+        """Check one pushed message; responses to requests are ignored"""
+        payload = message.get('result') or message.get('params')
+        if not channel or not isinstance(payload, dict):
+            return
+        data = payload.get('data')
+        if not isinstance(data, list) or not data:
+            return
+
+        now_ms = int(time.time() * 1000)
+        lag_histogram = self.recorder.histogram(f"ws.lag.{channel.split('.')[0]}")
+        with self._lock:
+            stats = self.channels.get(channel)
+            if stats is None:
+                stats = self.channels[channel] = ChannelFeedStats(channel)
+            stats.messages += 1
+            stats.last_received_ms = now_ms
+            # Trade pushes list the newest trade first, so check entries oldest first
+            entries = sorted((entry for entry in data if isinstance(entry, dict)),
+                             key=lambda entry: (_sequence_of(entry) or 0, entry.get('t') or 0))
+            for entry in entries:
+                self._check_entry(stats, entry, now_ms, lag_histogram)
+
+    def _check_entry(self, stats: ChannelFeedStats, entry: Dict[str, Any], now_ms: int,
+                     lag_histogram: LatencyHistogram) -> None:
+        stats.updates += 1
+        sequence = _sequence_of(entry)
+        previous = entry.get('pu')
+        timestamp = entry.get('t')
+
+        if sequence is not None and stats.last_sequence is not None:
+            if sequence == stats.last_sequence:
+                stats.duplicates += 1
+                return
+            if sequence < stats.last_sequence:
+                stats.out_of_order += 1
+                return
+            if previous is not None and previous != stats.last_sequence:
+                stats.gaps += 1
+                logger.warning(f"Sequence gap on {stats.channel}: last u={stats.last_sequence}, pu={previous}")
+        elif sequence is None and timestamp is not None and stats.last_timestamp is not None \
+                and timestamp < stats.last_timestamp:
+            stats.out_of_order += 1
+
+        if sequence is not None:
+            stats.last_sequence = sequence
+        if timestamp is not None:
+            lag_ms = now_ms - int(timestamp)
+            lag_histogram.record(lag_ms * 1_000_000)
+            stats.max_lag_ms = max(stats.max_lag_ms, lag_ms)
+            if lag_ms > self.stale_after_ms:
+                stats.stale += 1
+            if stats.last_timestamp is None or timestamp > stats.last_timestamp:
+                stats.last_timestamp = timestamp
+
+    def silent_channels(self, max_silence_ms: Optional[int] = None) -> Dict[str, int]:
+        """Channels with no message for longer than `max_silence_ms`, with their silence in ms"""
+        max_silence_ms = max_silence_ms or self.stale_after_ms
+        now_ms = int(time.time() * 1000)
+        with self._lock:
+            silence = {channel: now_ms - stats.last_received_ms
+                       for channel, stats in self.channels.items() if stats.last_received_ms is not None}
+        return {channel: ms for channel, ms in silence.items() if ms > max_silence_ms}
+
+    def totals(self) -> Dict[str, int]:
+        """Counters summed over all channels"""
+        totals = ChannelFeedStats('*')
+        with self._lock:
+            for stats in self.channels.values():
+                totals.messages += stats.messages
+                totals.updates += stats.updates
+                totals.gaps += stats.gaps
+                totals.duplicates += stats.duplicates
+                totals.out_of_order += stats.out_of_order
+                totals.stale += stats.stale
+                totals.max_lag_ms = max(totals.max_lag_ms, stats.max_lag_ms)
+        return totals.to_dict()
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {channel: stats.to_dict() for channel, stats in sorted(self.channels.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.channels.clear()
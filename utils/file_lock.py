@@ -0,0 +1,84 @@
+import json
+import os
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+logger = logging.getLogger(__name__)
+
+_thread_lock = threading.Lock()
+
+
+def supports_process_locking() -> bool:
+    """Whether JSON state files can be safely shared between processes"""
+    return fcntl is not None or msvcrt is not None
+
+
+def _lock(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        # Lock the first byte; LK_LOCK gives up after ~10s, so keep retrying
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                time.sleep(0.01)
+
+
+def _unlock(f) -> None:
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def locked_json_file(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Open a JSON state file under an exclusive lock and write it back on exit
+
+    The yielded dict is read from the file (empty if missing or unreadable) and
+    persisted when the block exits without an exception. The lock is held across
+    threads in this process and across processes (fcntl on POSIX, msvcrt on
+    Windows) where supports_process_locking() is True.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with _thread_lock:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+', encoding='utf-8') as f:
+            _lock(f)
+            try:
+                raw = f.read()
+                try:
+                    state = json.loads(raw) if raw else {}
+                except json.JSONDecodeError:
+                    logger.warning(f"Discarding corrupt state file {path}")
+                    state = {}
+
+                yield state
+
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+            finally:
+                _unlock(f)
@@ -0,0 +1,369 @@
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from config.settings import config
+from utils.backfill import Window, backfill_windows
+from utils.data_validators import CALENDAR_TIMEFRAMES
+from utils.json_codec import ApiResponse
+from utils.rest_client import CryptoRestClient
+from utils.test_helpers import CandlestickHelpers
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    instrument_name TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    t INTEGER NOT NULL,
+    o TEXT, h TEXT, l TEXT, c TEXT, v TEXT,
+    PRIMARY KEY (instrument_name, timeframe, t)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS candle_coverage (
+    instrument_name TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    PRIMARY KEY (instrument_name, timeframe, start_ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settlements (
+    instrument_type TEXT NOT NULL,
+    instrument_name TEXT NOT NULL,
+    x INTEGER NOT NULL,
+    v TEXT NOT NULL,
+    t INTEGER NOT NULL,
+    PRIMARY KEY (instrument_name, x)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS series_usage (
+    series TEXT PRIMARY KEY,
+    last_used_ms INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _series_key(instrument_name: str, timeframe: str) -> str:
+    return f"candles:{instrument_name}:{timeframe}"
+
+
+class HistoryCache:
+    """
+    SQLite store of immutable market history: closed candles and expired settlement prices
+
+    Candles are keyed by (instrument, timeframe, t) and the time ranges already
+    fetched are kept as merged intervals in candle_coverage, so a range query
+    knows exactly which sub-ranges are missing even where the exchange had no
+    candles. Values are stored as the exchange's strings so cached responses
+    match live ones.
+
+    When the database grows past `max_bytes`, the least recently used candle
+    series are evicted whole (settlement prices are small and never evicted).
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or config.history_cache_path
+        self.max_bytes = max_bytes or config.history_cache_max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Several behave processes may share the file; SQLite serializes the writers
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # Candles
+
+    def missing_ranges(self, instrument_name: str, timeframe: str, start_ts: int, end_ts: int) -> List[Window]:
+        """Sub-ranges of [start_ts, end_ts] not fetched yet"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start_ts, end_ts FROM candle_coverage "
+                "WHERE instrument_name = ? AND timeframe = ? AND end_ts >= ? AND start_ts <= ? ORDER BY start_ts",
+                (instrument_name, timeframe, start_ts, end_ts)
+            ).fetchall()
+
+        missing = []
+        cursor = start_ts
+        for covered_start, covered_end in rows:
+            if covered_start > cursor:
+                missing.append((cursor, covered_start - 1))
+            cursor = max(cursor, covered_end + 1)
+        if cursor <= end_ts:
+            missing.append((cursor, end_ts))
+        return missing
+
+    def get_candles(self, instrument_name: str, timeframe: str, start_ts: int, end_ts: int) -> List[Dict[str, Any]]:
+        """Cached candles in [start_ts, end_ts] as raw exchange dicts, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT t, o, h, l, c, v FROM candles "
+                "WHERE instrument_name = ? AND timeframe = ? AND t BETWEEN ? AND ? ORDER BY t",
+                (instrument_name, timeframe, start_ts, end_ts)
+            ).fetchall()
+            self._touch(_series_key(instrument_name, timeframe))
+        return [{'o': o, 'h': h, 'l': l, 'c': c, 'v': v, 't': t} for t, o, h, l, c, v in rows]
+
+    def put_candles(self, instrument_name: str, timeframe: str, candles: Iterable[Dict[str, Any]],
+                    start_ts: int, end_ts: int) -> None:
+        """
+        Store closed candles fetched for [start_ts, end_ts] and mark the range covered
+
+        Only pass candles that can no longer change; the still-open bar must not be cached.
+        An empty range (end_ts < start_ts) stores the candles without marking coverage.
+        """
+        rows = [(instrument_name, timeframe, int(candle['t']), candle.get('o'), candle.get('h'),
+                 candle.get('l'), candle.get('c'), candle.get('v')) for candle in candles]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                if end_ts >= start_ts:
+                    self._add_coverage(instrument_name, timeframe, start_ts, end_ts)
+                self._touch(_series_key(instrument_name, timeframe))
+        self.evict()
+
+    def _add_coverage(self, instrument_name: str, timeframe: str, start_ts: int, end_ts: int) -> None:
+        """Insert [start_ts, end_ts], merging it with overlapping or adjacent intervals"""
+        overlapping = self._conn.execute(
+            "SELECT start_ts, end_ts FROM candle_coverage "
+            "WHERE instrument_name = ? AND timeframe = ? AND end_ts >= ? AND start_ts <= ?",
+            (instrument_name, timeframe, start_ts - 1, end_ts + 1)
+        ).fetchall()
+        for covered_start, covered_end in overlapping:
+            start_ts = min(start_ts, covered_start)
+            end_ts = max(end_ts, covered_end)
+        self._conn.execute(
+            "DELETE FROM candle_coverage WHERE instrument_name = ? AND timeframe = ? AND start_ts BETWEEN ? AND ?",
+            (instrument_name, timeframe, start_ts, end_ts)
+        )
+        self._conn.execute("INSERT INTO candle_coverage VALUES (?, ?, ?, ?)",
+                           (instrument_name, timeframe, start_ts, end_ts))
+
+    # Settlement prices
+
+    def put_settlements(self, instrument_type: str, entries: Iterable[Dict[str, Any]]) -> int:
+        """Store expired settlement prices; returns how many were not cached before"""
+        rows = [(instrument_type, entry['i'], int(entry['x']), entry['v'], int(entry['t'])) for entry in entries]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                before = self._conn.total_changes
+                self._conn.executemany("INSERT OR IGNORE INTO settlements VALUES (?, ?, ?, ?, ?)", rows)
+                return self._conn.total_changes - before
+
+    def get_settlements(self, instrument_type: str) -> List[Dict[str, Any]]:
+        """Cached settlement prices for an instrument type, most recent expiry first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT instrument_name, x, v, t FROM settlements WHERE instrument_type = ? "
+                "ORDER BY x DESC, instrument_name",
+                (instrument_type,)
+            ).fetchall()
+        return [{'i': name, 'x': x, 'v': v, 't': t} for name, x, v, t in rows]
+
+    # Size management
+
+    def _touch(self, series: str) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO series_usage VALUES (?, ?)", (series, int(time.time() * 1000)))
+
+    def size_bytes(self) -> int:
+        """Bytes used by live pages (free pages left by deletes are not counted)"""
+        with self._lock:
+            return self._size_bytes()
+
+    def _size_bytes(self) -> int:
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def evict(self) -> int:
+        """Drop least recently used candle series until the cache fits in max_bytes"""
+        evicted = 0
+        with self._lock:
+            while self._size_bytes() > self.max_bytes:
+                row = self._conn.execute(
+                    "SELECT series FROM series_usage ORDER BY last_used_ms LIMIT 1").fetchone()
+                if row is None:
+                    break
+                _, instrument_name, timeframe = row[0].split(':', 2)
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    for table in ('candles', 'candle_coverage'):
+                        self._conn.execute(f"DELETE FROM {table} WHERE instrument_name = ? AND timeframe = ?",
+                                           (instrument_name, timeframe))
+                    self._conn.execute("DELETE FROM series_usage WHERE series = ?", row)
+                evicted += 1
+                logger.info(f"Evicted {instrument_name} {timeframe} candles from history cache")
+            if evicted:
+                self._conn.execute("PRAGMA incremental_vacuum")
+        self.evictions += evicted
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for table in ('candles', 'candle_coverage', 'settlements', 'series_usage'):
+                    self._conn.execute(f"DELETE FROM {table}")
+            self._conn.execute("PRAGMA incremental_vacuum")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_shared_cache: Optional[HistoryCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_history_cache() -> HistoryCache:
+    """Get the process-wide cache at config.history_cache_path, opening it on first use"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = HistoryCache()
+            logger.info(f"Opened history cache {_shared_cache.path} (max {_shared_cache.max_bytes} bytes)")
+        return _shared_cache
+
+
+def close_history_cache() -> None:
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is not None:
+            _shared_cache.close()
+            _shared_cache = None
+
+
+def _is_cacheable(timeframe: str) -> bool:
+    return timeframe not in CALENDAR_TIMEFRAMES and CandlestickHelpers.get_timeframe_duration_ms(timeframe) > 0
+
+
+class CachedRestClient(CryptoRestClient):
+    """
+    REST client that serves immutable history from a HistoryCache
+
+    Candlestick requests with both start_ts and end_ts are answered from the
+    cache, fetching only the missing closed ranges (in pages of
+    candlestick_page_size) and, when the range reaches it, the still-open bar.
+    Settlement prices seen in any response are stored, and
+    expired_settlement_prices() only pages until it reaches cached entries.
+    Everything else goes to the exchange unchanged.
+    """
+
+    def __init__(self, history_cache: Optional[HistoryCache] = None, **kwargs: Any):
+        """
+        Args:
+            history_cache: Cache to read and fill; defaults to the process-wide one
+            kwargs: Passed to CryptoRestClient
+        """
+        super().__init__(**kwargs)
+        self.history_cache = history_cache or get_history_cache()
+        self.page_size = config.candlestick_page_size
+
+    def get_candlestick(self, instrument_name: str, timeframe: str,
+                        count: Optional[int] = None, start_ts: Optional[int] = None,
+                        end_ts: Optional[int] = None) -> ApiResponse:
+        if start_ts is None or end_ts is None or not _is_cacheable(timeframe):
+            return super().get_candlestick(instrument_name, timeframe, count, start_ts, end_ts)
+
+        duration = CandlestickHelpers.get_timeframe_duration_ms(timeframe)
+        candles: List[Dict[str, Any]] = []
+        if count is not None:
+            if count <= 0:
+                return self._candlestick_response(instrument_name, timeframe, candles)
+            # Only the last `count` bars of the range can be returned, so don't fetch or store the rest
+            start_ts = max(start_ts, end_ts - end_ts % duration - (count - 1) * duration)
+
+        now_ms = int(time.time() * 1000)
+        open_bar_ts = now_ms - now_ms % duration
+        closed_end_ts = min(end_ts, open_bar_ts - 1)
+
+        if closed_end_ts >= start_ts:
+            error = self._fill_closed_range(instrument_name, timeframe, start_ts, closed_end_ts, open_bar_ts)
+            if error is not None:
+                return error
+            candles = self.history_cache.get_candles(instrument_name, timeframe, start_ts, closed_end_ts)
+
+        if end_ts >= open_bar_ts:
+            response = super().get_candlestick(instrument_name, timeframe, count=1,
+                                               start_ts=max(start_ts, open_bar_ts), end_ts=end_ts)
+            if response.status_code != 200:
+                return response
+            candles.extend(candle for candle in response.json()['result']['data']
+                           if int(candle['t']) >= open_bar_ts)
+
+        if count is not None:
+            # Like the exchange, return the most recent `count` candles of the range
+            candles = candles[-count:]
+        return self._candlestick_response(instrument_name, timeframe, candles)
+
+    @staticmethod
+    def _candlestick_response(instrument_name: str, timeframe: str,
+                              candles: List[Dict[str, Any]]) -> ApiResponse:
+        return ApiResponse.from_payload({
+            'id': -1,
+            'method': 'public/get-candlestick',
+            'code': 0,
+            'result': {'instrument_name': instrument_name, 'interval': timeframe, 'data': candles}
+        })
+
+    def _fill_closed_range(self, instrument_name: str, timeframe: str, start_ts: int, end_ts: int,
+                           open_bar_ts: int) -> Optional[ApiResponse]:
+        """
+        Fetch and cache the missing parts of a closed range; returns the failed response, if any
+
+        The exchange may publish the bar that has just closed a little late, so
+        that bar's period only counts as covered once the bar has been returned.
+        """
+        last_closed_ts = open_bar_ts - CandlestickHelpers.get_timeframe_duration_ms(timeframe)
+        missing = self.history_cache.missing_ranges(instrument_name, timeframe, start_ts, end_ts)
+        if not missing:
+            self.history_cache.hits += 1
+            return None
+
+        self.history_cache.misses += 1
+        for gap_start, gap_end in missing:
+            for window_start, window_end in backfill_windows(gap_start, gap_end, timeframe, self.page_size):
+                response = super().get_candlestick(instrument_name, timeframe, count=self.page_size,
+                                                   start_ts=window_start, end_ts=window_end)
+                if response.status_code != 200:
+                    return response
+                closed = [candle for candle in response.json()['result']['data']
+                          if window_start <= int(candle['t']) <= window_end and int(candle['t']) < open_bar_ts]
+                covered_end = window_end
+                if window_end >= last_closed_ts and not any(int(candle['t']) == last_closed_ts for candle in closed):
+                    covered_end = last_closed_ts - 1
+                self.history_cache.put_candles(instrument_name, timeframe, closed, window_start, covered_end)
+        return None
+
+    def get_expired_settlement_price(self, instrument_type: str,
+                                     page: Optional[int] = None) -> ApiResponse:
+        response = super().get_expired_settlement_price(instrument_type, page)
+        if response.status_code == 200:
+            self.history_cache.put_settlements(instrument_type, response.json()['result'].get('data', []))
+        return response
+
+    def expired_settlement_prices(self, instrument_type: str, max_pages: int = 100) -> List[Dict[str, Any]]:
+        """
+        All expired settlement prices for an instrument type, most recent first
+
+        Pages are fetched newest first and paging stops at the first page that
+        adds nothing new, so only expiries since the last call hit the network.
+        """
+        for page in range(1, max_pages + 1):
+            response = super().get_expired_settlement_price(instrument_type, page)
+            if response.status_code != 200:
+                logger.warning(f"Settlement prices page {page} failed with status {response.status_code}")
+                break
+            entries = response.json()['result'].get('data', [])
+            if not entries or self.history_cache.put_settlements(instrument_type, entries) == 0:
+                break
+        return self.history_cache.get_settlements(instrument_type)
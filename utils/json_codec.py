@@ -0,0 +1,128 @@
+import json
+import logging
+from typing import Any, Callable, Dict, List, Union
+import requests
+from config.settings import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # optional fast backend
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional fast backend
+    msgspec = None
+
+BACKENDS = ('orjson', 'msgspec', 'json')
+
+
+def _select_backend(preferred: str) -> str:
+    available = {'orjson': orjson is not None, 'msgspec': msgspec is not None, 'json': True}
+    if preferred != 'auto':
+        if preferred not in available:
+            raise ValueError(f"Unknown JSON backend '{preferred}', expected auto or one of {BACKENDS}")
+        if not available[preferred]:
+            logger.warning(f"JSON backend '{preferred}' is not installed, falling back to stdlib json")
+            return 'json'
+        return preferred
+    return next(name for name in BACKENDS if available[name])
+
+
+BACKEND = _select_backend(config.json_backend)
+
+
+def _build_loads(backend: str) -> Callable[[Union[str, bytes]], Any]:
+    if backend == 'orjson':
+        return orjson.loads
+    if backend == 'msgspec':
+        decoder = msgspec.json.Decoder()
+
+        def loads(data: Union[str, bytes]) -> Any:
+            try:
+                return decoder.decode(data)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+        return loads
+    return json.loads
+
+
+def _build_dumps(backend: str) -> Callable[[Any], str]:
+    if backend == 'orjson':
+        return lambda obj: orjson.dumps(obj).decode()
+    if backend == 'msgspec':
+        encoder = msgspec.json.Encoder()
+        return lambda obj: encoder.encode(obj).decode()
+    return json.dumps
+
+
+_fast_loads = _build_loads(BACKEND)
+dumps = _build_dumps(BACKEND)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Decode JSON with the fastest installed backend
+
+    Payloads the fast backend rejects are retried with stdlib json, so malformed
+    input raises the usual json.JSONDecodeError (a ValueError) whatever the backend.
+    """
+    if BACKEND == 'json':
+        return json.loads(data)
+    try:
+        return _fast_loads(data)
+    except ValueError:
+        return json.loads(data)
+
+
+class ApiResponse:
+    """
+    requests.Response wrapper that decodes the JSON body at most once
+
+    Every other attribute (status_code, headers, text, ...) is read from the
+    wrapped response, so it can be used wherever a Response was.
+    """
+
+    _UNSET = object()
+
+    def __init__(self, response: requests.Response):
+        self.response = response
+        self._json: Any = self._UNSET
+        self._models: Dict[type, List[Any]] = {}
+
+    @classmethod
+    def from_payload(cls, payload: Any, status_code: int = 200) -> "ApiResponse":
+        """Response built locally (e.g. from a cache) that behaves like one received from the exchange"""
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = dumps(payload).encode()
+        response.headers['Content-Type'] = 'application/json'
+        api_response = cls(response)
+        api_response._json = payload
+        return api_response
+
+    def json(self, **kwargs: Any) -> Any:
+        """Decoded body, cached after the first call; kwargs fall back to requests' own decoder"""
+        if kwargs:
+            return self.response.json(**kwargs)
+        if self._json is self._UNSET:
+            self._json = loads(self.response.content)
+        return self._json
+
+    def data_as(self, model: type) -> List[Any]:
+        """result.data parsed into model instances via model.from_raw, cached per model"""
+        if model not in self._models:
+            self._models[model] = [model.from_raw(raw) for raw in self.json()['result']['data']]
+        return self._models[model]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.response, name)
+
+    def __bool__(self) -> bool:
+        return bool(self.response)
+
+    def __repr__(self) -> str:
+        return f"<ApiResponse [{self.response.status_code}]>"
+
@@ -0,0 +1,213 @@
+import json
+import os
+import threading
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sub-bucket resolution: each power-of-two range is split into 2**(SUB_BUCKET_BITS - 1)
+# buckets, bounding the relative error of any recorded value to under 1%.
+SUB_BUCKET_BITS = 8
+
+
+def _bucket_index(value: int) -> int:
+    shift = max(0, value.bit_length() - SUB_BUCKET_BITS)
+    return (shift << SUB_BUCKET_BITS) + (value >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """Lowest and highest value (inclusive) that map to a bucket index"""
+    shift = index >> SUB_BUCKET_BITS
+    mantissa = index & ((1 << SUB_BUCKET_BITS) - 1)
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram in nanoseconds (HDR-style)
+
+    Memory is bounded by the number of distinct buckets rather than the number
+    of samples, and histograms from different threads, scenarios or processes
+    can be merged without losing percentile accuracy.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts: Dict[int, int] = {}
+        self.count: int = 0
+        self.total_ns: int = 0
+        self.min_ns: Optional[int] = None
+        self.max_ns: Optional[int] = None
+
+    def record(self, value_ns: int) -> None:
+        """Record one latency sample in nanoseconds"""
+        value_ns = max(0, int(value_ns))
+        index = _bucket_index(value_ns)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total_ns += value_ns
+            if self.min_ns is None or value_ns < self.min_ns:
+                self.min_ns = value_ns
+            if self.max_ns is None or value_ns > self.max_ns:
+                self.max_ns = value_ns
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's samples into this one"""
+        other = other.snapshot()
+        with self._lock:
+            for index, count in other.counts.items():
+                self.counts[index] = self.counts.get(index, 0) + count
+            self.count += other.count
+            self.total_ns += other.total_ns
+            if other.min_ns is not None and (self.min_ns is None or other.min_ns < self.min_ns):
+                self.min_ns = other.min_ns
+            if other.max_ns is not None and (self.max_ns is None or other.max_ns > self.max_ns):
+                self.max_ns = other.max_ns
+        return self
+
+    def snapshot(self) -> "LatencyHistogram":
+        """Consistent point-in-time copy, safe to read while recording continues"""
+        copy = LatencyHistogram()
+        with self._lock:
+            copy.counts = dict(self.counts)
+            copy.count = self.count
+            copy.total_ns = self.total_ns
+            copy.min_ns = self.min_ns
+            copy.max_ns = self.max_ns
+        return copy
+
+    def percentile(self, percentile: float) -> int:
+        """Value in nanoseconds at or below which `percentile` percent of samples fall"""
+        snapshot = self.snapshot()
+        if not snapshot.count:
+            return 0
+        rank = max(1, int(-(-percentile * snapshot.count // 100)))
+        seen = 0
+        for index in sorted(snapshot.counts):
+            seen += snapshot.counts[index]
+            if seen >= rank:
+                _, upper = _bucket_bounds(index)
+                return min(upper, snapshot.max_ns)
+        return snapshot.max_ns
+
+    def percentile_ms(self, percentile: float) -> float:
+        return self.percentile(percentile) / 1e6
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def iter_buckets(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield (lowest ns, highest ns, count) for each non-empty bucket in order"""
+        snapshot = self.snapshot()
+        for index in sorted(snapshot.counts):
+            lower, upper = _bucket_bounds(index)
+            yield lower, upper, snapshot.counts[index]
+
+    def summary(self) -> Dict[str, Any]:
+        """Count and headline percentiles in milliseconds"""
+        snapshot = self.snapshot()
+        return {
+            'count': snapshot.count,
+            'min_ms': round((snapshot.min_ns or 0) / 1e6, 3),
+            'mean_ms': round(snapshot.mean_ns / 1e6, 3),
+            'p50_ms': round(snapshot.percentile_ms(50), 3),
+            'p90_ms': round(snapshot.percentile_ms(90), 3),
+            'p95_ms': round(snapshot.percentile_ms(95), 3),
+            'p99_ms': round(snapshot.percentile_ms(99), 3),
+            'p99.9_ms': round(snapshot.percentile_ms(99.9), 3),
+            'max_ms': round((snapshot.max_ns or 0) / 1e6, 3),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form that from_dict() can restore and merge"""
+        snapshot = self.snapshot()
+        return {
+            'summary': snapshot.summary(),
+            'sub_bucket_bits': SUB_BUCKET_BITS,
+            'total_ns': snapshot.total_ns,
+            'min_ns': snapshot.min_ns,
+            'max_ns': snapshot.max_ns,
+            'buckets': {str(index): count for index, count in sorted(snapshot.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        if data.get('sub_bucket_bits', SUB_BUCKET_BITS) != SUB_BUCKET_BITS:
+            raise ValueError("Histogram was exported with a different bucket resolution")
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data['buckets'].items()}
+        histogram.count = sum(histogram.counts.values())
+        histogram.total_ns = data['total_ns']
+        histogram.min_ns = data['min_ns']
+        histogram.max_ns = data['max_ns']
+        return histogram
+
+
+class LatencyRecorder:
+    """Registry of named latency histograms, e.g. 'rest.get-candlestick' or 'ws.connect'"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Get the histogram for a name, creating it on first use"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            return histogram
+
+    def record(self, name: str, value_ns: int) -> None:
+        self.histogram(name).record(value_ns)
+
+    def find(self, name: str) -> Optional[LatencyHistogram]:
+        """Look up a histogram by full name, or by endpoint name with 'rest.' / 'ws.' omitted"""
+        with self._lock:
+            for candidate in (name, f"rest.{name}", f"ws.{name}"):
+                if candidate in self._histograms:
+                    return self._histograms[candidate]
+        return None
+
+    def names(self) -> list:
+        with self._lock:
+            return sorted(self._histograms)
+
+    def snapshot(self) -> Dict[str, LatencyHistogram]:
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {name: histogram.snapshot() for name, histogram in histograms.items()}
+
+    def merge(self, snapshots: Dict[str, LatencyHistogram]) -> None:
+        """Merge histograms from another recorder, e.g. a parallel worker's export"""
+        for name, histogram in snapshots.items():
+            self.histogram(name).merge(histogram)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: histogram.to_dict() for name, histogram in sorted(self.snapshot().items())}
+
+    def export_json(self, path: str) -> None:
+        """Write every histogram (summary plus mergeable buckets) to a JSON file"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Latency histograms written to {path}")
+
+    @staticmethod
+    def load_json(path: str) -> Dict[str, LatencyHistogram]:
+        with open(path) as f:
+            data = json.load(f)
+        return {name: LatencyHistogram.from_dict(entry) for name, entry in data.items()}
+
+
+# Process-wide recorder fed by the REST and WebSocket clients
+latency_recorder = LatencyRecorder()
@@ -0,0 +1,301 @@
+"""
+Load generator for the public REST API, built on CryptoRestClient.
+
+Usage:
+    python -m utils.loadgen --executor constant-arrival-rate --rate 100 --duration 30
+    python -m utils.loadgen --executor ramping-arrival-rate --stages 20:10s,100:30s,0:10s
+    python -m utils.loadgen --executor closed-loop --vus 10 --duration 60 --endpoint get-book
+"""
+import argparse
+import csv
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from config.test_data import TestData
+from utils.json_codec import ApiResponse
+from utils.latency import LatencyHistogram
+from utils.rate_limiter import RateLimiter
+from utils.rest_client import CryptoRestClient
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CSV = os.path.join(PROJECT_ROOT, 'instrument_name_timeframe.csv')
+
+EXECUTORS = ('constant-arrival-rate', 'ramping-arrival-rate', 'closed-loop')
+
+# Endpoint name -> request built from one (instrument_name, timeframe) target
+ENDPOINTS: Dict[str, Callable[[CryptoRestClient, str, str], ApiResponse]] = {
+    'get-candlestick': lambda client, instrument, timeframe: client.get_candlestick(instrument, timeframe),
+    'get-book': lambda client, instrument, timeframe: client.get_book(instrument, 10),
+    'get-trades': lambda client, instrument, timeframe: client.get_trades(instrument),
+    'get-tickers': lambda client, instrument, timeframe: client.get_tickers(instrument),
+}
+
+Target = Tuple[str, str]
+Stage = Tuple[float, float]
+
+
+def load_targets_from_csv(path: str = DEFAULT_CSV) -> List[Target]:
+    """Read (instrument_name, timeframe) pairs from a CSV with those headers"""
+    with open(path, newline='') as f:
+        return [(row['instrument_name'].strip(), row['timeframe'].strip()) for row in csv.DictReader(f)]
+
+
+def load_targets_from_test_data() -> List[Target]:
+    """Use the positive REST test cases from TestData"""
+    return [(case['instrument_name'], case['timeframe']) for case in TestData.get_possitive_test_cases()]
+
+
+def parse_duration(value: str) -> float:
+    """Parse k6-style durations such as 30s, 5m or 1h into seconds"""
+    units = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+    for suffix in ('ms', 's', 'm', 'h'):
+        if value.endswith(suffix):
+            return float(value[:-len(suffix)]) * units[suffix]
+    return float(value)
+
+
+def parse_stages(value: str) -> List[Stage]:
+    """Parse 'rate:duration,...' (e.g. 20:10s,100:30s) into (target rate, seconds) stages"""
+    stages = []
+    for stage in value.split(','):
+        rate, duration = stage.split(':')
+        stages.append((float(rate), parse_duration(duration)))
+    return stages
+
+
+class LoadResult:
+    """Thread-safe collector of per-request outcomes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.status_codes: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.dropped: int = 0
+        self.started_at: float = 0.0
+        self.finished_at: float = 0.0
+
+    def record(self, latency_ns: int, status: Optional[int], error: Optional[str] = None) -> None:
+        self.latency.record(latency_ns)
+        with self._lock:
+            if status is not None:
+                self.status_codes[status] += 1
+            if error is not None:
+                self.errors[error] += 1
+
+    def record_dropped(self) -> None:
+        with self._lock:
+            self.dropped += 1
+
+    @property
+    def elapsed(self) -> float:
+        return self.finished_at - self.started_at
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.latency.count
+        latency = self.latency.summary()
+        return {
+            'requests': total,
+            'dropped_iterations': self.dropped,
+            'elapsed_s': round(self.elapsed, 3),
+            'achieved_rps': round(total / self.elapsed, 2) if self.elapsed else 0.0,
+            'status_codes': dict(self.status_codes),
+            'errors': dict(self.errors),
+            'latency_ms': {
+                name[:-len('_ms')]: value for name, value in latency.items() if name.endswith('_ms')
+            },
+            'latency_histogram': self.latency.to_dict(),
+        }
+
+    def histogram(self, buckets_ms: Tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)) -> List[Tuple[str, int]]:
+        """Count latencies into fixed millisecond buckets for the text report"""
+        counts = Counter()
+        for _, upper_ns, count in self.latency.iter_buckets():
+            latency_ms = upper_ns / 1e6
+            label = next((f"<= {bound:g} ms" for bound in buckets_ms if latency_ms <= bound),
+                         f"> {buckets_ms[-1]:g} ms")
+            counts[label] += count
+        labels = [f"<= {bound:g} ms" for bound in buckets_ms] + [f"> {buckets_ms[-1]:g} ms"]
+        return [(label, counts[label]) for label in labels if counts[label]]
+
+
+class LoadGenerator:
+    """
+    Drives one endpoint with a k6-style executor
+
+    Arrival-rate executors start iterations on a fixed schedule regardless of
+    response time, dropping an iteration when all `vus` workers are busy
+    (open model). The closed-loop executor keeps `vus` workers each sending
+    back-to-back requests (closed model).
+    """
+
+    def __init__(self, endpoint: str, targets: List[Target], vus: int = 100,
+                 client: Optional[CryptoRestClient] = None):
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unsupported endpoint '{endpoint}', expected one of {sorted(ENDPOINTS)}")
+        if not targets:
+            raise ValueError("No load targets given")
+        self.request = ENDPOINTS[endpoint]
+        self.targets = itertools.cycle(targets)
+        self._targets_lock = threading.Lock()
+        self.vus = vus
+        # Capacity tests deliberately push past the functional-test budget, so the
+        # shared limiter is bypassed unless a client with one is passed in. Retries
+        # are off too: every 429 must be reported as its own request.
+        if client is None:
+            client = CryptoRestClient(pool_maxsize=vus, rate_limiter=RateLimiter({}, enabled=False))
+            client.max_retries = 0
+        self.client = client
+        self.result = LoadResult()
+
+    def _next_target(self) -> Target:
+        with self._targets_lock:
+            return next(self.targets)
+
+    def _iteration(self) -> None:
+        instrument, timeframe = self._next_target()
+        start = time.perf_counter_ns()
+        try:
+            response = self.request(self.client, instrument, timeframe)
+            self.result.record(time.perf_counter_ns() - start, response.status_code)
+        except Exception as e:
+            # Anything else would vanish in a pool future or end a closed-loop worker
+            if not isinstance(e, requests.exceptions.RequestException):
+                logger.debug(f"Load iteration failed: {e!r}")
+            self.result.record(time.perf_counter_ns() - start, None, type(e).__name__)
+
+    def _run_arrivals(self, rate_at: Callable[[float], float], duration: float) -> LoadResult:
+        """Start iterations at the instantaneous rate given by rate_at(elapsed seconds)"""
+        slots = threading.BoundedSemaphore(self.vus)
+
+        def run_slot() -> None:
+            try:
+                self._iteration()
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.vus, thread_name_prefix="loadgen") as pool:
+            self.result.started_at = time.perf_counter()
+            elapsed = 0.0
+            credit = 0.0
+            while elapsed < duration:
+                # Integrate the rate in steps of at most 10ms so ramps are followed closely
+                rate = rate_at(elapsed)
+                step = min(1.0 / rate, 0.01) if rate > 0 else 0.01
+                credit += rate * step
+                elapsed += step
+                if credit < 1:
+                    continue
+
+                delay = self.result.started_at + elapsed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+                while credit >= 1:
+                    credit -= 1
+                    if slots.acquire(blocking=False):
+                        pool.submit(run_slot)
+                    else:
+                        self.result.record_dropped()
+        self.result.finished_at = time.perf_counter()
+        return self.result
+
+    def constant_arrival_rate(self, rate: float, duration: float) -> LoadResult:
+        """Start `rate` iterations per second for `duration` seconds"""
+        return self._run_arrivals(lambda elapsed: rate, duration)
+
+    def ramping_arrival_rate(self, stages: List[Stage], start_rate: float = 0.0) -> LoadResult:
+        """Ramp linearly from each stage's starting rate to its target over the stage duration"""
+        def rate_at(elapsed: float) -> float:
+            previous = start_rate
+            for target, stage_duration in stages:
+                if elapsed < stage_duration:
+                    return previous + (target - previous) * elapsed / stage_duration
+                elapsed -= stage_duration
+                previous = target
+            return previous
+
+        return self._run_arrivals(rate_at, sum(duration for _, duration in stages))
+
+    def closed_loop(self, vus: int, duration: float) -> LoadResult:
+        """Run `vus` workers issuing requests back-to-back for `duration` seconds"""
+        def worker(deadline: float) -> None:
+            while time.perf_counter() < deadline:
+                self._iteration()
+
+        self.result.started_at = time.perf_counter()
+        deadline = self.result.started_at + duration
+        threads = [threading.Thread(target=worker, args=(deadline,), daemon=True) for _ in range(vus)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.result.finished_at = time.perf_counter()
+        return self.result
+
+
+def format_report(result: LoadResult) -> str:
+    """Render a load result summary and latency histogram as text"""
+    summary = result.summary()
+    latency = summary['latency_ms']
+    lines = [
+        f"requests..........: {summary['requests']} ({summary['achieved_rps']}/s over {summary['elapsed_s']}s)",
+        f"dropped iterations: {summary['dropped_iterations']}",
+        f"status codes......: {summary['status_codes']}",
+        f"errors............: {summary['errors']}",
+        "latency (ms)......: " + " ".join(f"{name}={value}" for name, value in latency.items()),
+        "latency histogram:",
+    ]
+    total = max(1, summary['requests'])
+    for label, count in result.histogram():
+        lines.append(f"  {label:>12} | {'#' * max(1, int(50 * count / total))} {count}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate load against the public REST API")
+    parser.add_argument('--executor', choices=EXECUTORS, default='constant-arrival-rate')
+    parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), default='get-candlestick')
+    parser.add_argument('--rate', type=float, default=100.0, help="Iterations per second (constant-arrival-rate)")
+    parser.add_argument('--duration', type=parse_duration, default=30.0, help="Test duration, e.g. 30s or 5m")
+    parser.add_argument('--stages', type=parse_stages, help="Ramping stages, e.g. 20:10s,100:30s,0:10s")
+    parser.add_argument('--vus', type=int, default=100, help="Worker pool size / closed-loop users")
+    parser.add_argument('--source', choices=('csv', 'testdata'), default='csv', help="Where to take instruments from")
+    parser.add_argument('--csv', default=DEFAULT_CSV, help="CSV with instrument_name,timeframe columns")
+    parser.add_argument('--json', dest='json_path', help="Also write the summary as JSON to this path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    targets = load_targets_from_csv(args.csv) if args.source == 'csv' else load_targets_from_test_data()
+    generator = LoadGenerator(args.endpoint, targets, vus=args.vus)
+
+    if args.executor == 'constant-arrival-rate':
+        result = generator.constant_arrival_rate(args.rate, args.duration)
+    elif args.executor == 'ramping-arrival-rate':
+        if not args.stages:
+            parser.error("--stages is required for ramping-arrival-rate")
+        result = generator.ramping_arrival_rate(args.stages)
+    else:
+        result = generator.closed_loop(args.vus, args.duration)
+
+    print(format_report(result))
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(result.summary(), f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
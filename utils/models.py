@@ -0,0 +1,201 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Type, TypeVar, Union
+
+T = TypeVar('T', bound='Model')
+
+NAN = float('nan')
+
+
+def _float(value: Any, default: Optional[float] = NAN) -> Optional[float]:
+    """Parse an exchange number (usually a string); None/missing becomes `default`"""
+    return default if value is None else float(value)
+
+
+def _int(value: Any, default: Optional[int] = None) -> Optional[int]:
+    return default if value is None else int(value)
+
+
+class Model(ABC):
+    """
+    Base for compact market data records
+
+    Subclasses declare their fields in __slots__, so instances carry no
+    per-object __dict__, and convert string numbers once in from_raw().
+    """
+    __slots__ = ()
+
+    @classmethod
+    @abstractmethod
+    def from_raw(cls: Type[T], raw: Any) -> T:
+        """Build a record from one entry of the exchange response"""
+
+    @classmethod
+    def from_list(cls: Type[T], raw_items: Sequence[Any]) -> List[T]:
+        return [cls.from_raw(raw) for raw in raw_items]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Candle(Model):
+    """public/get-candlestick entry; missing prices parse to NaN and a missing timestamp to -1"""
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, timestamp: int, open: float, high: float, low: float, close: float, volume: float):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "Candle":
+        return cls(_int(raw.get('t'), -1), _float(raw.get('o')), _float(raw.get('h')),
+                   _float(raw.get('l')), _float(raw.get('c')), _float(raw.get('v')))
+
+
+class Trade(Model):
+    """public/get-trades or trade.{instrument} entry"""
+    __slots__ = ('trade_id', 'timestamp', 'timestamp_ns', 'price', 'quantity', 'side', 'instrument_name', 'match_id')
+
+    def __init__(self, trade_id: str, timestamp: int, timestamp_ns: Optional[int], price: float, quantity: float,
+                 side: str, instrument_name: str, match_id: Optional[str] = None):
+        self.trade_id = trade_id
+        self.timestamp = timestamp
+        self.timestamp_ns = timestamp_ns
+        self.price = price
+        self.quantity = quantity
+        self.side = side
+        self.instrument_name = instrument_name
+        self.match_id = match_id
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "Trade":
+        return cls(raw['d'], int(raw['t']), _int(raw.get('tn')), float(raw['p']), float(raw['q']),
+                   raw['s'], raw['i'], raw.get('m'))
+
+
+class Ticker(Model):
+    """public/get-tickers or ticker.{instrument} entry; prices absent without trades are None"""
+    __slots__ = ('instrument_name', 'timestamp', 'high', 'low', 'last', 'volume', 'volume_value',
+                 'open_interest', 'change', 'best_bid', 'best_ask')
+
+    def __init__(self, instrument_name: str, timestamp: int, high: Optional[float] = None,
+                 low: Optional[float] = None, last: Optional[float] = None, volume: Optional[float] = None,
+                 volume_value: Optional[float] = None, open_interest: Optional[float] = None,
+                 change: Optional[float] = None, best_bid: Optional[float] = None,
+                 best_ask: Optional[float] = None):
+        self.instrument_name = instrument_name
+        self.timestamp = timestamp
+        self.high = high
+        self.low = low
+        self.last = last
+        self.volume = volume
+        self.volume_value = volume_value
+        self.open_interest = open_interest
+        self.change = change
+        self.best_bid = best_bid
+        self.best_ask = best_ask
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "Ticker":
+        return cls(raw['i'], int(raw['t']), _float(raw.get('h'), None), _float(raw.get('l'), None),
+                   _float(raw.get('a'), None), _float(raw.get('v'), None), _float(raw.get('vv'), None),
+                   _float(raw.get('oi'), None), _float(raw.get('c'), None), _float(raw.get('b'), None),
+                   _float(raw.get('k'), None))
+
+
+class BookLevel(Model):
+    """One [price, quantity, number of orders] order book level"""
+    __slots__ = ('price', 'quantity', 'count')
+
+    def __init__(self, price: float, quantity: float, count: int):
+        self.price = price
+        self.quantity = quantity
+        self.count = count
+
+    @classmethod
+    def from_raw(cls, raw: Sequence[Any]) -> "BookLevel":
+        return cls(float(raw[0]), float(raw[1]), int(raw[2]))
+
+
+class Instrument(Model):
+    """public/get-instruments entry"""
+    __slots__ = ('symbol', 'inst_type', 'display_name', 'base_ccy', 'quote_ccy', 'quote_decimals',
+                 'quantity_decimals', 'price_tick_size', 'qty_tick_size', 'max_leverage', 'tradable',
+                 'expiry_timestamp_ms', 'underlying_symbol')
+
+    def __init__(self, symbol: str, inst_type: str, display_name: str, base_ccy: str, quote_ccy: str,
+                 quote_decimals: int, quantity_decimals: int, price_tick_size: float, qty_tick_size: float,
+                 max_leverage: Optional[float], tradable: bool, expiry_timestamp_ms: int,
+                 underlying_symbol: Optional[str] = None):
+        self.symbol = symbol
+        self.inst_type = inst_type
+        self.display_name = display_name
+        self.base_ccy = base_ccy
+        self.quote_ccy = quote_ccy
+        self.quote_decimals = quote_decimals
+        self.quantity_decimals = quantity_decimals
+        self.price_tick_size = price_tick_size
+        self.qty_tick_size = qty_tick_size
+        self.max_leverage = max_leverage
+        self.tradable = tradable
+        self.expiry_timestamp_ms = expiry_timestamp_ms
+        self.underlying_symbol = underlying_symbol
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "Instrument":
+        return cls(raw['symbol'], raw['inst_type'], raw.get('display_name', ''), raw.get('base_ccy', ''),
+                   raw.get('quote_ccy', ''), _int(raw.get('quote_decimals'), 0),
+                   _int(raw.get('quantity_decimals'), 0), float(raw['price_tick_size']),
+                   float(raw['qty_tick_size']), _float(raw.get('max_leverage') or None, None),
+                   bool(raw.get('tradable')), _int(raw.get('expiry_timestamp_ms'), 0),
+                   raw.get('underlying_symbol'))
+
+
+class Valuation(Model):
+    """public/get-valuations (and get-insurance) entry"""
+    __slots__ = ('timestamp', 'value')
+
+    def __init__(self, timestamp: int, value: float):
+        self.timestamp = timestamp
+        self.value = value
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "Valuation":
+        return cls(int(raw['t']), float(raw['v']))
+
+
+class SettlementPrice(Model):
+    """public/get-expired-settlement-price entry"""
+    __slots__ = ('instrument_name', 'expiry_timestamp', 'value', 'timestamp')
+
+    def __init__(self, instrument_name: str, expiry_timestamp: int, value: float, timestamp: int):
+        self.instrument_name = instrument_name
+        self.expiry_timestamp = expiry_timestamp
+        self.value = value
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_raw(cls, raw: Dict[str, Any]) -> "SettlementPrice":
+        return cls(raw['i'], int(raw['x']), float(raw['v']), int(raw['t']))
+
+
+def as_candles(candles: Sequence[Union[Candle, Dict[str, Any]]]) -> List[Candle]:
+    """Accept parsed candles or raw candle dicts"""
+    return [candle if isinstance(candle, Candle) else Candle.from_raw(candle) for candle in candles]
+
+
+def as_levels(levels: Sequence[Union[BookLevel, Sequence[Any]]]) -> List[BookLevel]:
+    """Accept parsed book levels or raw [price, quantity, count] lists"""
+    return [level if isinstance(level, BookLevel) else BookLevel.from_raw(level) for level in levels]
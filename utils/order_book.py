@@ -0,0 +1,325 @@
+import threading
+import zlib
+import logging
+from bisect import bisect_left
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from config.settings import config
+from utils.websocket_client import CryptoWebSocketClient
+
+logger = logging.getLogger(__name__)
+
+# (price, quantity, number of orders) as exposed by depth views
+Level = Tuple[Decimal, Decimal, int]
+
+
+class SequenceGapError(Exception):
+    """An update's previous sequence id does not match the last applied one"""
+
+    def __init__(self, instrument_name: str, expected: Optional[int], received: Optional[int]):
+        super().__init__(f"{instrument_name}: expected pu={expected}, got pu={received}")
+        self.instrument_name = instrument_name
+        self.expected = expected
+        self.received = received
+
+
+class ChecksumMismatchError(Exception):
+    """The local book's checksum differs from the exchange's cs after applying a message"""
+
+    def __init__(self, instrument_name: str, expected: int, actual: int):
+        super().__init__(f"{instrument_name}: exchange cs={expected}, local checksum={actual}")
+        self.instrument_name = instrument_name
+        self.expected = expected
+        self.actual = actual
+
+
+class BookSide:
+    """
+    Price levels of one side of the book, kept in a sorted price array
+
+    Lookups and the insert position are found by binary search; the best price
+    is the last element for bids and the first for asks, so reading it is O(1).
+    """
+
+    def __init__(self, descending: bool):
+        self.descending = descending
+        self._prices: List[Decimal] = []
+        self._levels: Dict[Decimal, Tuple[Decimal, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def clear(self) -> None:
+        self._prices.clear()
+        self._levels.clear()
+
+    def update(self, price: Decimal, quantity: Decimal, orders: int = 0) -> None:
+        """Set a level's quantity; a zero quantity removes the level"""
+        if quantity == 0:
+            if self._levels.pop(price, None) is not None:
+                del self._prices[bisect_left(self._prices, price)]
+            return
+        if price not in self._levels:
+            self._prices.insert(bisect_left(self._prices, price), price)
+        self._levels[price] = (quantity, orders)
+
+    def best(self) -> Optional[Level]:
+        if not self._prices:
+            return None
+        price = self._prices[-1] if self.descending else self._prices[0]
+        quantity, orders = self._levels[price]
+        return price, quantity, orders
+
+    def levels(self, count: Optional[int] = None) -> List[Level]:
+        """Up to `count` levels from the best price outwards"""
+        count = len(self._prices) if count is None else min(count, len(self._prices))
+        if self.descending:
+            prices = self._prices[len(self._prices) - count:][::-1]
+        else:
+            prices = self._prices[:count]
+        return [(price, *self._levels[price]) for price in prices]
+
+    def quantity(self, price: Decimal) -> Decimal:
+        level = self._levels.get(price)
+        return level[0] if level else Decimal(0)
+
+
+def _parse_levels(raw_levels: List[List[Any]]) -> List[Level]:
+    """Parse [price, quantity, orders] string triples from a book message"""
+    levels = []
+    for raw in raw_levels:
+        orders = int(raw[2]) if len(raw) > 2 else 0
+        levels.append((Decimal(raw[0]), Decimal(raw[1]), orders))
+    return levels
+
+
+class LocalOrderBook:
+    """
+    Incrementally maintained order book for one instrument
+
+    A snapshot replaces the book; each delta is applied in place, provided its
+    `pu` (previous update id) matches the last applied `u`. When a message
+    carries the exchange's checksum (`cs`) and verify_checksum is on, the
+    resulting book must match it. On either mismatch the book is marked for
+    resync and further deltas are ignored until the next snapshot arrives.
+    """
+
+    def __init__(self, instrument_name: str, depth: Optional[int] = None,
+                 verify_checksum: Optional[bool] = None):
+        self.instrument_name = instrument_name
+        self.depth = depth
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.sequence: Optional[int] = None
+        self.timestamp: Optional[int] = None
+        self.needs_resync: bool = True
+        self.snapshots: int = 0
+        self.updates: int = 0
+        self.stale_updates: int = 0
+        self.gaps: int = 0
+        self.checksum_mismatches: int = 0
+        self.verify_checksum = config.ws_book_verify_checksum if verify_checksum is None else verify_checksum
+
+    def _verify(self, data: Dict[str, Any]) -> None:
+        """Check the book against the message's cs; raises ChecksumMismatchError and marks it for resync"""
+        expected = data.get('cs')
+        if not self.verify_checksum or expected is None:
+            return
+        # The exchange may send the CRC32 as a signed 32-bit integer
+        expected = int(expected) & 0xFFFFFFFF
+        actual = self.checksum()
+        if actual != expected:
+            self.needs_resync = True
+            self.checksum_mismatches += 1
+            raise ChecksumMismatchError(self.instrument_name, expected, actual)
+
+    def apply_snapshot(self, data: Dict[str, Any]) -> None:
+        """Replace the book with a snapshot's bids and asks"""
+        self.bids.clear()
+        self.asks.clear()
+        for price, quantity, orders in _parse_levels(data.get('bids', [])):
+            self.bids.update(price, quantity, orders)
+        for price, quantity, orders in _parse_levels(data.get('asks', [])):
+            self.asks.update(price, quantity, orders)
+        self.sequence = data.get('u')
+        self.timestamp = data.get('t')
+        self.needs_resync = False
+        self.snapshots += 1
+        self._verify(data)
+
+    def apply_update(self, data: Dict[str, Any]) -> bool:
+        """
+        Apply one delta; returns False if it was ignored
+
+        Deltas are ignored while waiting for a snapshot and when already applied.
+        Raises SequenceGapError (and marks the book for resync) if updates were
+        missed, and ChecksumMismatchError if the result differs from the exchange's.
+        """
+        if self.needs_resync:
+            return False
+
+        sequence, previous = data.get('u'), data.get('pu')
+        if sequence is not None and self.sequence is not None and sequence <= self.sequence:
+            self.stale_updates += 1
+            return False
+        if previous is not None and previous != self.sequence:
+            self.needs_resync = True
+            self.gaps += 1
+            raise SequenceGapError(self.instrument_name, self.sequence, previous)
+
+        update = data.get('update', data)
+        for price, quantity, orders in _parse_levels(update.get('bids', [])):
+            self.bids.update(price, quantity, orders)
+        for price, quantity, orders in _parse_levels(update.get('asks', [])):
+            self.asks.update(price, quantity, orders)
+        if sequence is not None:
+            self.sequence = sequence
+        self.timestamp = data.get('t', self.timestamp)
+        self.updates += 1
+        self._verify(data)
+        return True
+
+    def apply_message(self, message: Dict[str, Any]) -> bool:
+        """
+        Apply a book or book.update push message; returns True if the book changed
+
+        Raises SequenceGapError if updates were missed and ChecksumMismatchError
+        if the book no longer matches the exchange's checksum.
+        """
+        payload = message.get('result') or message.get('params') or {}
+        data = payload.get('data') or []
+        if not data:
+            return False
+        if payload.get('channel') == 'book.update':
+            return self.apply_update(data[0])
+        self.apply_snapshot(data[0])
+        return True
+
+    @property
+    def best_bid(self) -> Optional[Level]:
+        return self.bids.best()
+
+    @property
+    def best_ask(self) -> Optional[Level]:
+        return self.asks.best()
+
+    @property
+    def spread(self) -> Optional[Decimal]:
+        bid, ask = self.best_bid, self.best_ask
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    def is_crossed(self) -> bool:
+        """True if the best bid is at or above the best ask"""
+        spread = self.spread
+        return spread is not None and spread <= 0
+
+    def depth_view(self, levels: Optional[int] = None) -> Dict[str, List[Level]]:
+        """Top `levels` bids and asks (the subscribed depth if omitted), best first"""
+        levels = levels or self.depth
+        return {'bids': self.bids.levels(levels), 'asks': self.asks.levels(levels)}
+
+    def checksum(self, levels: Optional[int] = None) -> int:
+        """
+        CRC32 of the top levels, interleaving bid and ask "price:quantity" pairs
+
+        Prices and quantities keep the exchange's string form, so the result can
+        be compared with the cs field of book messages.
+        """
+        view = self.depth_view(levels)
+        parts = []
+        for i in range(max(len(view['bids']), len(view['asks']))):
+            for side in (view['bids'], view['asks']):
+                if i < len(side):
+                    parts.append(f"{side[i][0]}:{side[i][1]}")
+        return zlib.crc32(":".join(parts).encode())
+
+
+class OrderBookTracker:
+    """
+    Keeps a LocalOrderBook per subscribed book channel up to date from a client's messages
+
+    When a sequence gap or checksum mismatch is detected the channel is
+    re-subscribed with its original parameters, which makes the exchange send
+    a fresh snapshot. The re-subscribe runs on its own thread, since the rate
+    limiter may make it wait and messages arrive on the socket thread.
+    After the client reconnects every book waits for the snapshot that the
+    replayed subscription brings, ignoring deltas until then.
+    """
+
+    def __init__(self, client: CryptoWebSocketClient, handler_name: str = 'order_book'):
+        self.client = client
+        self.handler_name = handler_name
+        self.books: Dict[str, LocalOrderBook] = {}
+        self.resyncs: int = 0
+        self.crossed: int = 0
+        self.errors: int = 0
+        self._params: Dict[str, Dict[str, Any]] = {}
+        self._resyncing: Set[str] = set()
+        self._lock = threading.Lock()
+        self.on_gap: Optional[Callable[[str, SequenceGapError], None]] = None
+        client.add_message_handler(handler_name, self._on_message)
+        client.add_reconnect_handler(handler_name, self._on_reconnect)
+
+    def track(self, channel: str, **params: Any):
+        """Subscribe to a book channel (e.g. book.BTCUSD-PERP.10) and maintain its local book"""
+        _, instrument_name, depth = channel.split('.')
+        with self._lock:
+            self.books[channel] = LocalOrderBook(instrument_name, int(depth))
+            self._params[channel] = params
+        return self.client.subscribe([channel], **params)
+
+    def book(self, channel: str) -> Optional[LocalOrderBook]:
+        return self.books.get(channel)
+
+    def _on_message(self, message: Dict[str, Any], channel: Optional[str]) -> None:
+        book = self.books.get(channel) if channel else None
+        if book is None:
+            return
+        try:
+            if book.apply_message(message) and book.is_crossed():
+                self.crossed += 1
+                logger.error(f"Crossed book on {channel}: bid {book.best_bid} >= ask {book.best_ask}")
+        except SequenceGapError as e:
+            logger.warning(f"Order book gap on {channel}: {e}, resubscribing")
+            if self.on_gap is not None:
+                self.on_gap(channel, e)
+            self._resync(channel)
+        except ChecksumMismatchError as e:
+            logger.warning(f"Order book checksum mismatch on {channel}: {e}, resubscribing")
+            self._resync(channel)
+        except (InvalidOperation, KeyError, TypeError, IndexError, ValueError) as e:
+            self.errors += 1
+            logger.error(f"Malformed order book message on {channel}: {e}")
+
+    def _on_reconnect(self, client: CryptoWebSocketClient) -> None:
+        with self._lock:
+            for book in self.books.values():
+                book.needs_resync = True
+            self.resyncs += len(self.books)
+
+    def _resync(self, channel: str) -> None:
+        """Start re-subscribing a channel off the socket thread, unless already under way"""
+        with self._lock:
+            if channel in self._resyncing:
+                return
+            self._resyncing.add(channel)
+            params = self._params.get(channel, {})
+            self.resyncs += 1
+        threading.Thread(target=self._resubscribe, args=(channel, params), daemon=True).start()
+
+    def _resubscribe(self, channel: str, params: Dict[str, Any]) -> None:
+        try:
+            self.client.unsubscribe([channel])
+            self.client.subscribe([channel], **params)
+        except ConnectionError as e:
+            logger.error(f"Could not resync {channel}: {e}")
+        finally:
+            with self._lock:
+                self._resyncing.discard(channel)
+
+    def close(self) -> None:
+        """Stop tracking; subscriptions are left as they are"""
+        self.client.remove_message_handler(self.handler_name)
+        self.client.remove_reconnect_handler(self.handler_name)
@@ -0,0 +1,335 @@
+"""
+Parallel behave runner: splits features or scenarios across worker processes.
+
+Each worker is a separate behave process with its own REST and WebSocket
+clients (created by features/environment.py as usual). All workers share the
+file-backed rate limiter, and their JUnit, Allure and latency results are
+merged into the reports/ layout behave.ini uses.
+
+Scenario durations from every run are kept in a timing history and used to
+balance the next run: work is packed longest-first onto the least loaded
+worker, and each worker starts with its @smoke scenarios.
+
+Usage:
+    python -m utils.parallel_runner --workers 4
+    python -m utils.parallel_runner --workers 8 --by scenario --tags @rest
+    python -m utils.parallel_runner features/get_book.feature features/book_data.feature
+"""
+import argparse
+import configparser
+import glob
+import heapq
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from behave.parser import parse_file
+from behave.tag_expression import TagExpression
+
+from config.settings import config
+from utils.latency import LatencyRecorder
+from utils.rate_limiter import default_state_path
+from utils.timing_history import TimingHistory, scenario_key
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURES_DIR = os.path.join(PROJECT_ROOT, 'features')
+REPORTS_DIR = os.path.join(PROJECT_ROOT, 'reports')
+
+SPLIT_MODES = ('feature', 'scenario')
+SKIPPED_STATUSES = ('skipped', 'untested')
+
+
+@dataclass
+class WorkItem:
+    """A feature file, or one scenario (outline) in it, to run as a unit"""
+    location: str
+    feature: str
+    name: str
+    tags: List[str] = field(default_factory=list)
+    # Timing history keys of the scenarios this item runs
+    keys: List[str] = field(default_factory=list)
+
+    @property
+    def is_smoke(self) -> bool:
+        return 'smoke' in self.tags
+
+
+@dataclass
+class WorkerResult:
+    index: int
+    items: List[WorkItem]
+    returncode: int
+    duration: float
+    output_dir: str
+
+    @property
+    def passed(self) -> bool:
+        return self.returncode == 0
+
+
+def _default_tags() -> List[str]:
+    """default_tags from behave.ini, applied when no --tags are given"""
+    parser = configparser.ConfigParser()
+    parser.read(os.path.join(PROJECT_ROOT, 'behave.ini'))
+    value = parser.get('behave', 'default_tags', fallback='')
+    return value.split() if value else []
+
+
+def discover(paths: Sequence[str] = (), tags: Sequence[str] = (), by: str = 'feature') -> List[WorkItem]:
+    """
+    Find the features (by='feature') or scenarios (by='scenario') matching the tag expression
+
+    Args:
+        paths: Feature files or directories; defaults to features/
+        tags: behave --tags values; behave.ini's default_tags when empty
+        by: Unit of work handed to workers
+    """
+    if by not in SPLIT_MODES:
+        raise ValueError(f"Unknown split mode '{by}', expected one of {SPLIT_MODES}")
+    expression = TagExpression(list(tags) or _default_tags())
+
+    files: List[str] = []
+    for path in paths or [FEATURES_DIR]:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '**', '*.feature'), recursive=True)))
+        else:
+            files.append(path)
+
+    items = []
+    for path in files:
+        feature = parse_file(path)
+        if feature is None:
+            continue
+        location = os.path.relpath(path, PROJECT_ROOT)
+        scenarios = [scenario for scenario in feature.scenarios if expression.check(scenario.effective_tags)]
+        if not scenarios:
+            continue
+        if by == 'feature':
+            tags = sorted({tag for scenario in scenarios for tag in scenario.effective_tags})
+            items.append(WorkItem(location, feature.name, feature.name, tags,
+                                  [scenario_key(location, scenario.name) for scenario in scenarios]))
+        else:
+            items.extend(WorkItem(f"{location}:{scenario.line}", feature.name, scenario.name,
+                                  list(scenario.effective_tags), [scenario_key(location, scenario.name)])
+                         for scenario in scenarios)
+    return items
+
+
+def pack(items: Sequence[WorkItem], workers: int, history: TimingHistory) -> List[List[WorkItem]]:
+    """
+    Split work items into at most `workers` bins of similar expected duration
+
+    Longest-processing-time first: items are placed, slowest first, on the bin
+    with the least expected work so far. Each bin then runs its @smoke items
+    first, fastest first, for an early failure signal.
+    """
+    estimates = {id(item): history.estimate(item.keys) for item in items}
+    bin_count = max(1, min(workers, len(items)))
+    bins: List[List[WorkItem]] = [[] for _ in range(bin_count)]
+    loads: List[Tuple[float, int]] = [(0.0, index) for index in range(bin_count)]
+    for item in sorted(items, key=lambda item: estimates[id(item)], reverse=True):
+        load, index = heapq.heappop(loads)
+        bins[index].append(item)
+        heapq.heappush(loads, (load + estimates[id(item)], index))
+
+    for work in bins:
+        work.sort(key=lambda item: (not item.is_smoke, estimates[id(item)] if item.is_smoke else 0))
+    return bins
+
+
+def _allure_available() -> bool:
+    try:
+        import allure_behave  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ParallelRunner:
+    """Run bins of work items as concurrent behave processes and merge their reports"""
+
+    def __init__(self, workers: int, reports_dir: str = REPORTS_DIR, tags: Sequence[str] = (),
+                 behave_args: Sequence[str] = (), history: Optional[TimingHistory] = None):
+        """
+        Args:
+            workers: Number of behave processes run at once
+            reports_dir: Root of the merged reports (behave.ini expects reports/)
+            tags: --tags passed to every worker
+            behave_args: Extra behave arguments passed to every worker
+            history: Timing history updated with this run's scenario durations
+        """
+        self.workers = workers
+        self.reports_dir = reports_dir
+        self.tags = list(tags)
+        self.behave_args = list(behave_args)
+        self.history = history
+        self.allure = _allure_available()
+
+    def _worker_dir(self, index: int) -> str:
+        return os.path.join(self.reports_dir, 'parallel', f"worker-{index}")
+
+    def _command(self, index: int, items: Sequence[WorkItem]) -> List[str]:
+        command = [sys.executable, '-m', 'behave', *(item.location for item in items),
+                   '--junit', '--junit-directory', os.path.join(self._worker_dir(index), 'junit')]
+        for tag in self.tags:
+            command.extend(['--tags', tag])
+        if self.allure:
+            # Allure result files have unique names, so every worker writes to the shared directory
+            command.extend(['-f', 'allure_behave.formatter:AllureFormatter',
+                            '-o', os.path.join(self.reports_dir, 'allure-results')])
+        command.extend(['-f', 'progress', *self.behave_args])
+        return command
+
+    def _environment(self, index: int) -> Dict[str, str]:
+        env = dict(os.environ)
+        env['RATE_LIMIT_STATE_FILE'] = default_state_path()
+        env['LATENCY_REPORT_PATH'] = os.path.join(self._worker_dir(index), 'latency.json')
+        env['PARALLEL_WORKER'] = str(index)
+        return env
+
+    def _run_worker(self, index: int, items: List[WorkItem]) -> WorkerResult:
+        output_dir = self._worker_dir(index)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        os.makedirs(output_dir)
+
+        start = time.perf_counter()
+        with open(os.path.join(output_dir, 'behave.log'), 'w', encoding='utf-8') as log:
+            returncode = subprocess.call(self._command(index, items), cwd=PROJECT_ROOT,
+                                         env=self._environment(index), stdout=log, stderr=subprocess.STDOUT)
+        duration = time.perf_counter() - start
+        logger.info(f"Worker {index} finished {len(items)} items in {duration:.1f}s (exit code {returncode})")
+        return WorkerResult(index, items, returncode, duration, output_dir)
+
+    def run(self, bins: Sequence[List[WorkItem]]) -> List[WorkerResult]:
+        """Run each bin in its own behave process, at most `workers` at a time"""
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="behave-worker") as pool:
+            futures = [pool.submit(self._run_worker, index, items) for index, items in enumerate(bins)]
+            results = [future.result() for future in futures]
+        cases = self.merge_junit(results)
+        self.merge_latency(results)
+        if self.history is not None:
+            self.history.record(scenario_durations(cases, [item for items in bins for item in items]))
+        return results
+
+    def merge_junit(self, results: Sequence[WorkerResult]) -> Dict[str, List[ET.Element]]:
+        """
+        Combine the workers' TESTS-<feature>.xml files into reports/junit, one file per feature
+
+        A worker given part of a feature reports the rest of its scenarios as
+        skipped, so for each test case the result of the worker that ran it wins.
+        Returns the merged test cases per file name.
+        """
+        suites: Dict[str, ET.Element] = {}
+        cases: Dict[str, Dict[str, ET.Element]] = {}
+        for result in results:
+            for path in sorted(glob.glob(os.path.join(result.output_dir, 'junit', '*.xml'))):
+                suite = ET.parse(path).getroot()
+                name = os.path.basename(path)
+                suites.setdefault(name, suite)
+                feature_cases = cases.setdefault(name, {})
+                for case in suite.findall('testcase'):
+                    previous = feature_cases.get(case.get('name'))
+                    if previous is None or previous.get('status') in SKIPPED_STATUSES:
+                        feature_cases[case.get('name')] = case
+
+        junit_dir = os.path.join(self.reports_dir, 'junit')
+        os.makedirs(junit_dir, exist_ok=True)
+        for name, suite in suites.items():
+            merged = list(cases[name].values())
+            for case in suite.findall('testcase'):
+                suite.remove(case)
+            suite.extend(merged)
+            suite.set('tests', str(len(merged)))
+            suite.set('failures', str(sum(case.find('failure') is not None for case in merged)))
+            suite.set('errors', str(sum(case.find('error') is not None for case in merged)))
+            suite.set('skipped', str(sum(case.get('status') in SKIPPED_STATUSES for case in merged)))
+            suite.set('time', f"{sum(float(case.get('time', 0)) for case in merged):.6f}")
+            ET.ElementTree(suite).write(os.path.join(junit_dir, name), encoding='utf-8', xml_declaration=True)
+        return {name: list(feature_cases.values()) for name, feature_cases in cases.items()}
+
+    def merge_latency(self, results: Sequence[WorkerResult]) -> None:
+        """Merge the workers' latency histograms into config.latency_report_path"""
+        recorder = LatencyRecorder()
+        for result in results:
+            path = os.path.join(result.output_dir, 'latency.json')
+            if os.path.exists(path):
+                recorder.merge(LatencyRecorder.load_json(path))
+        if recorder.names():
+            recorder.export_json(config.latency_report_path)
+
+
+def scenario_durations(cases: Dict[str, List[ET.Element]], items: Sequence[WorkItem]) -> Dict[str, float]:
+    """
+    Seconds per timing history key from merged JUnit test cases
+
+    behave names each file TESTS-<feature file stem>.xml and each outline row
+    "<scenario> -- @<row>", so rows are summed into their outline's key.
+    """
+    paths = {os.path.splitext(os.path.basename(item.location.split(':')[0]))[0]: item.location.split(':')[0]
+             for item in items}
+    durations: Dict[str, float] = {}
+    for name, feature_cases in cases.items():
+        path = paths.get(name[len('TESTS-'):-len('.xml')])
+        if path is None:
+            continue
+        for case in feature_cases:
+            if case.get('status') in SKIPPED_STATUSES:
+                continue
+            key = scenario_key(path, case.get('name', '').split(' -- @')[0].strip())
+            durations[key] = durations.get(key, 0.0) + float(case.get('time', 0))
+    return durations
+
+
+def format_summary(results: Sequence[WorkerResult], wall_time: float) -> str:
+    lines = []
+    for result in results:
+        status = "passed" if result.passed else f"FAILED (exit code {result.returncode})"
+        lines.append(f"worker {result.index}: {len(result.items)} items in {result.duration:.1f}s, {status} "
+                     f"- {os.path.relpath(os.path.join(result.output_dir, 'behave.log'), PROJECT_ROOT)}")
+    busy = sum(result.duration for result in results)
+    lines.append(f"wall time {wall_time:.1f}s, worker time {busy:.1f}s "
+                 f"({busy / wall_time if wall_time else 0:.1f}x parallel)")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run behave features or scenarios across worker processes")
+    parser.add_argument('paths', nargs='*', help="Feature files or directories (default: features/)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="Concurrent behave processes")
+    parser.add_argument('--by', choices=SPLIT_MODES, default='feature', help="Unit of work handed to workers")
+    parser.add_argument('--tags', action='append', default=[], help="behave tag expression (repeatable)")
+    parser.add_argument('--timings', help="Timing history file (default: TIMING_HISTORY_PATH or a temp file)")
+    parser.add_argument('--dry-run', action='store_true', help="Only print how the work would be split")
+    args, behave_args = parser.parse_known_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    items = discover(args.paths, args.tags, args.by)
+    if not items:
+        print("No features or scenarios match")
+        return 0
+    history = TimingHistory(args.timings)
+    bins = pack(items, args.workers, history)
+    if args.dry_run:
+        for index, work in enumerate(bins):
+            print(f"worker {index} (~{history.estimate(key for item in work for key in item.keys):.1f}s): "
+                  + " ".join(item.location for item in work))
+        return 0
+
+    start = time.perf_counter()
+    results = ParallelRunner(args.workers, tags=args.tags, behave_args=behave_args, history=history).run(bins)
+    print(format_summary(results, time.perf_counter() - start))
+    return 0 if all(result.passed for result in results) else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,167 @@
+import os
+import time
+import tempfile
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from config.settings import config
+from utils.file_lock import locked_json_file, supports_process_locking
+
+logger = logging.getLogger(__name__)
+
+# Endpoint -> limiter group. Unlisted REST endpoints fall into 'rest_public'.
+ENDPOINT_GROUPS: Dict[str, str] = {
+    'public/get-book': 'rest_market',
+    'public/get-trades': 'rest_market',
+    'public/get-tickers': 'rest_market',
+    'public/get-candlestick': 'rest_market',
+    'public/get-valuations': 'rest_market',
+}
+
+DEFAULT_REST_GROUP = 'rest_public'
+WEBSOCKET_GROUP = 'ws_market'
+
+
+def group_for_endpoint(endpoint: str) -> str:
+    """Map an endpoint path or full URL (e.g. .../public/get-book) to its limiter group"""
+    for method, group in ENDPOINT_GROUPS.items():
+        if endpoint.split('?')[0].endswith(method):
+            return group
+    return DEFAULT_REST_GROUP
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds to wait"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        logger.warning(f"Unparseable Retry-After header: {value}")
+        return None
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter keyed by endpoint group
+
+    Each group refills at `rate` tokens per second up to `burst` tokens. When
+    `state_path` is set the buckets live in a locked JSON file so every thread
+    and process using the same path draws from the same budget.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]],
+                 state_path: Optional[str] = None, enabled: bool = True):
+        """
+        Args:
+            limits: group -> (rate per second, burst size)
+            state_path: Shared state file; None keeps buckets in this process only
+            enabled: When False, acquire() never blocks
+        """
+        self.limits = limits
+        self.state_path = state_path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._local_state: Dict[str, list] = {}
+
+    def _take(self, group: str, tokens: float) -> float:
+        """Try to take tokens; return 0 on success or the seconds to wait before retrying"""
+        rate, burst = self.limits.get(group, self.limits[DEFAULT_REST_GROUP])
+        now = time.time()
+
+        if self.state_path:
+            with locked_json_file(self.state_path) as state:
+                return self._take_from(state, group, tokens, rate, burst, now)
+        with self._lock:
+            return self._take_from(self._local_state, group, tokens, rate, burst, now)
+
+    @staticmethod
+    def _take_from(state: Dict[str, list], group: str, tokens: float,
+                   rate: float, burst: float, now: float) -> float:
+        available, updated_at, blocked_until = state.get(group, [burst, now, 0.0])
+
+        if blocked_until > now:
+            return blocked_until - now
+
+        available = min(burst, available + (now - updated_at) * rate)
+        if available >= tokens:
+            state[group] = [available - tokens, now, blocked_until]
+            return 0.0
+
+        state[group] = [available, now, blocked_until]
+        return (tokens - available) / rate
+
+    def acquire(self, group: str, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until `tokens` are available in `group`
+
+        Returns False if the timeout expires first.
+        """
+        if not self.enabled:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._take(group, tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                logger.warning(f"Rate limiter timeout waiting for group '{group}'")
+                return False
+            logger.debug(f"Rate limited on '{group}', waiting {wait:.3f}s")
+            time.sleep(wait)
+
+    def penalize(self, group: str, seconds: float) -> None:
+        """Block a group for the given time, e.g. after a 429 with Retry-After"""
+        until = time.time() + seconds
+        logger.warning(f"Pausing '{group}' requests for {seconds:.2f}s")
+
+        def apply(state: Dict[str, list]) -> None:
+            blocked_until = state.get(group, [0.0, until, 0.0])[2]
+            # Resume with an empty bucket so traffic ramps back up instead of bursting
+            state[group] = [0.0, until, max(until, blocked_until)]
+
+        if self.state_path:
+            with locked_json_file(self.state_path) as state:
+                apply(state)
+        else:
+            with self._lock:
+                apply(self._local_state)
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def default_state_path() -> str:
+    """Shared bucket file, one per API host so UAT and production budgets stay apart"""
+    if config.rate_limit_state_file:
+        return config.rate_limit_state_file
+    host = config.rest_base_url.split('//')[-1].split('/')[0].replace(':', '_')
+    return os.path.join(tempfile.gettempdir(), f"crypto_tasks_rate_limit_{host}.json")
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the limiter shared by all clients in this process, built from Config"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            shared = config.rate_limit_shared
+            if shared and not supports_process_locking():
+                logger.warning("No cross-process file lock on this platform; rate limits are per process")
+                shared = False
+            _rate_limiter = RateLimiter(
+                limits={
+                    'rest_market': (config.rest_market_rate_limit, config.rest_market_rate_burst),
+                    DEFAULT_REST_GROUP: (config.rest_public_rate_limit, config.rest_public_rate_burst),
+                    WEBSOCKET_GROUP: (config.ws_rate_limit, config.ws_rate_burst),
+                },
+                state_path=default_state_path() if shared else None,
+                enabled=config.rate_limit_enabled
+            )
+        return _rate_limiter
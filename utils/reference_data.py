@@ -0,0 +1,169 @@
+import threading
+import time
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from config.settings import config
+from utils.json_codec import ApiResponse
+from utils.models import Instrument
+
+logger = logging.getLogger(__name__)
+
+INSTRUMENTS = "public/get-instruments"
+RISK_PARAMETERS = "public/get-risk-parameters"
+
+# Sends a request with the given extra headers, e.g. If-None-Match
+Fetcher = Callable[[Dict[str, str]], ApiResponse]
+
+
+@dataclass
+class ReferenceEntry:
+    """One cached reference-data response and its lookup index"""
+    response: ApiResponse
+    fetched_at: float
+    etag: Optional[str] = None
+    update_timestamp_ms: Optional[int] = None
+    # Built on the first lookup, so fetching never depends on every entry parsing
+    index: Optional[Dict[str, Any]] = None
+
+
+def _update_timestamp(response: ApiResponse) -> Optional[int]:
+    value = response.json().get('result', {}).get('update_timestamp_ms')
+    return int(value) if value is not None else None
+
+
+def build_index(method: str, response: ApiResponse) -> Dict[str, Any]:
+    """
+    symbol -> Instrument for get-instruments, instrument_name -> config entry for get-risk-parameters
+
+    Instruments missing a required field are skipped with a warning.
+    """
+    result = response.json().get('result', {})
+    if method == INSTRUMENTS:
+        index = {}
+        for raw in result.get('data', []):
+            try:
+                instrument = Instrument.from_raw(raw)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping malformed instrument {raw.get('symbol', '?')}: {e!r}")
+                continue
+            index[instrument.symbol] = instrument
+        return index
+    if method == RISK_PARAMETERS:
+        return {entry['instrument_name']: entry for entry in result.get('base_currency_config', [])
+                if 'instrument_name' in entry}
+    return {}
+
+
+class ReferenceDataCache:
+    """
+    Process-wide cache of slowly changing reference data with per-endpoint TTLs
+
+    A fresh entry is returned without a request. Once its TTL expires the next
+    caller revalidates it: the request carries If-None-Match when the exchange
+    sent an ETag, and a 304, or a 200 with an unchanged update_timestamp_ms,
+    keeps the cached response and index. Only one thread refreshes an endpoint
+    at a time; the others wait and reuse its result.
+
+    Cached responses are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            ttls: Seconds each endpoint stays fresh; defaults to the config TTLs
+        """
+        self.ttls = ttls or {
+            INSTRUMENTS: config.instruments_cache_ttl,
+            RISK_PARAMETERS: config.risk_parameters_cache_ttl,
+        }
+        self.hits: int = 0
+        self.misses: int = 0
+        self.revalidations: int = 0
+        self._entries: Dict[str, ReferenceEntry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _lock_for(self, method: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(method, threading.Lock())
+
+    def _is_fresh(self, method: str, entry: Optional[ReferenceEntry]) -> bool:
+        return entry is not None and time.monotonic() - entry.fetched_at < self.ttls.get(method, 0)
+
+    def get(self, method: str, fetch: Fetcher) -> ApiResponse:
+        """Cached response for an endpoint, fetching or revalidating it when the TTL has expired"""
+        entry = self._entries.get(method)
+        if self._is_fresh(method, entry):
+            self.hits += 1
+            return entry.response
+
+        with self._lock_for(method):
+            # Another thread may have refreshed the entry while this one waited
+            entry = self._entries.get(method)
+            if self._is_fresh(method, entry):
+                self.hits += 1
+                return entry.response
+            return self._refresh(method, entry, fetch)
+
+    def _refresh(self, method: str, entry: Optional[ReferenceEntry], fetch: Fetcher) -> ApiResponse:
+        headers = {'If-None-Match': entry.etag} if entry is not None and entry.etag else {}
+        response = fetch(headers)
+
+        if entry is not None and response.status_code == 304:
+            self.revalidations += 1
+            entry.fetched_at = time.monotonic()
+            logger.info(f"{method} not modified (ETag {entry.etag})")
+            return entry.response
+
+        if response.status_code != 200:
+            # Errors are never cached; keep serving the previous entry until one succeeds
+            return response
+
+        update_timestamp_ms = _update_timestamp(response)
+        if entry is not None and update_timestamp_ms is not None \
+                and update_timestamp_ms == entry.update_timestamp_ms:
+            self.revalidations += 1
+            entry.fetched_at = time.monotonic()
+            entry.etag = response.headers.get('ETag') or entry.etag
+            logger.info(f"{method} unchanged since update_timestamp_ms={update_timestamp_ms}")
+            return entry.response
+
+        self.misses += 1
+        self._entries[method] = ReferenceEntry(
+            response=response,
+            fetched_at=time.monotonic(),
+            etag=response.headers.get('ETag'),
+            update_timestamp_ms=update_timestamp_ms
+        )
+        return response
+
+    def lookup(self, method: str, key: str, fetch: Fetcher) -> Optional[Any]:
+        """Indexed entry (see build_index) for `key`, refreshing the endpoint first if needed"""
+        self.get(method, fetch)
+        entry = self._entries.get(method)
+        if entry is None:
+            return None
+        if entry.index is None:
+            entry.index = build_index(method, entry.response)
+        return entry.index.get(key)
+
+    def invalidate(self, method: Optional[str] = None) -> None:
+        """Drop one endpoint's entry, or all of them"""
+        if method is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(method, None)
+
+
+_shared_cache: Optional[ReferenceDataCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_reference_cache() -> ReferenceDataCache:
+    """Get the process-wide reference-data cache, creating it on first use"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ReferenceDataCache()
+        return _shared_cache
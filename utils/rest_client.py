@@ -1,28 +1,147 @@
 import requests
+import threading
 import time
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional
 from config.settings import config
+from utils.rate_limiter import RateLimiter, get_rate_limiter, group_for_endpoint, parse_retry_after
+from utils.latency import LatencyRecorder, latency_recorder
+from utils.json_codec import ApiResponse
+from utils.models import Instrument
+from utils.reference_data import INSTRUMENTS, RISK_PARAMETERS, ReferenceDataCache, build_index, get_reference_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+_shared_session: Optional[requests.Session] = None
+_shared_session_lock = threading.Lock()
+
+
+def _build_session(pool_connections: int, pool_maxsize: int) -> requests.Session:
+    """Build a keep-alive session with a sized connection pool"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=config.rest_pool_block
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Content-Type': 'application/json',
+        'User-Agent': 'CryptoExchange-TestFramework/1.0',
+        'Connection': 'keep-alive'
+    })
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """Get the process-wide pooled session, creating it on first use"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = _build_session(config.rest_pool_connections, config.rest_pool_maxsize)
+            logger.info(f"Created shared REST session (pool_connections={config.rest_pool_connections}, "
+                        f"pool_maxsize={config.rest_pool_maxsize})")
+        return _shared_session
+
+
+def close_shared_session() -> None:
+    """Close the process-wide pooled session and its connections"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+            _shared_session = None
+
+
 class CryptoRestClient:
-    
-    def __init__(self):
-        self.base_url = config.rest_base_url
+
+    def __init__(self, session: Optional[requests.Session] = None,
+                 pool_maxsize: Optional[int] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 recorder: Optional[LatencyRecorder] = None,
+                 reference_cache: Optional[ReferenceDataCache] = None,
+                 base_url: Optional[str] = None):
+        """
+        Args:
+            session: Session to send requests on; defaults to the shared pooled session
+            pool_maxsize: Build a private session with this pool size instead of the shared one
+            rate_limiter: Limiter consulted before each request; defaults to the shared one
+            recorder: Latency recorder fed with every request; defaults to the process-wide one
+            reference_cache: Cache for instruments and risk parameters; defaults to the
+                process-wide one, or none when config.reference_cache_enabled is off
+            base_url: API root such as https://uat-api.3ona.co/exchange/v1; defaults to config.rest_base_url
+        """
+        self.base_url = (base_url or config.rest_base_url).rstrip('/')
         self.timeout = config.rest_timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'User-Agent': 'CryptoExchange-TestFramework/1.0'
-        })
-    
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.recorder = recorder or latency_recorder
+        self.max_retries = config.max_retries
+        if reference_cache is None and config.reference_cache_enabled:
+            reference_cache = get_reference_cache()
+        self.reference_cache = reference_cache
+        if session is None and pool_maxsize is not None:
+            session = _build_session(config.rest_pool_connections, pool_maxsize)
+            self._owns_session = True
+        else:
+            self._owns_session = False
+        self.session = session if session is not None else get_shared_session()
+
+    def _get(self, method: str, params: Optional[Dict[str, Any]] = None,
+             headers: Optional[Dict[str, str]] = None) -> ApiResponse:
+        """
+        Send a GET request to a public endpoint, e.g. public/get-book
+
+        Waits for the endpoint group's rate limit before sending. A 429 response
+        pauses the whole group for its Retry-After time (or exponential backoff
+        when absent) and is retried up to config.max_retries times.
+        """
+        endpoint = f"{self.base_url}/{method}"
+        group = group_for_endpoint(method)
+        histogram = self.recorder.histogram(f"rest.{method.split('/')[-1]}")
+
+        logger.info(f"Making request to {endpoint} with params: {params}")
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(group)
+            start = time.perf_counter_ns()
+            try:
+                response = self.session.get(
+                    endpoint,
+                    params=params,
+                    headers=headers,
+                    timeout=self.timeout
+                )
+                histogram.record(time.perf_counter_ns() - start)
+                logger.info(f"Response status: {response.status_code}")
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed: {str(e)}")
+                raise
+
+            if response.status_code != 429 or attempt == self.max_retries:
+                return ApiResponse(response)
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is None:
+                retry_after = config.retry_delay * (2 ** attempt)
+            logger.warning(f"Throttled by {method} (attempt {attempt + 1}), retrying in {retry_after:.2f}s")
+            self.rate_limiter.penalize(group, retry_after)
+
+        return ApiResponse(response)
+
+    @staticmethod
+    def _params(**kwargs: Any) -> Dict[str, Any]:
+        """Build query params, dropping unset values"""
+        return {key: str(value) for key, value in kwargs.items() if value is not None}
+
     def get_candlestick(self, instrument_name: str, timeframe: str,
                 count: Optional[int] = None, start_ts: Optional[int] = None,
-                end_ts: Optional[int] = None) -> requests.Response:
+                end_ts: Optional[int] = None) -> ApiResponse:
         """
         Get candlestick data from public/get-candlestick endpoint
-        
+
         Args:
             instrument_name: Trading pair (e.g., BTC_USDT)
             timeframe: Time interval (1m, 5m, 15m, 30m, 1h, 4h, 6h, 12h, 1D, 7D, 14D, 1M)
@@ -30,40 +149,117 @@ class CryptoRestClient:
             start_ts: Start timestamp in milliseconds
             end_ts: End timestamp in milliseconds
         """
-        endpoint = f"{self.base_url}/public/get-candlestick"
-        
-        params: Dict[str, Any] = {
-            "instrument_name": instrument_name,
-            "timeframe": timeframe
-        }
-        
-        if count is not None:
-            params["count"] = str(count)
-        if start_ts is not None:
-            params["start_ts"] = str(start_ts)
-        if end_ts is not None:
-            params["end_ts"] = str(end_ts)
-            
-        logger.info(f"Making request to {endpoint} with params: {params}")
-        
-        try:
-            response = self.session.get(
-                endpoint,
-                params=params,
-                timeout=self.timeout
-            )
-            logger.info(f"Response status: {response.status_code}")
-            return response
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise
-    
-    def get_instruments(self) -> requests.Response:
-        """Get list of available instruments"""
-        endpoint = f"{self.base_url}/public/get-instruments"
-        return self.session.get(endpoint, timeout=self.timeout)
-    
+        params = self._params(
+            instrument_name=instrument_name,
+            timeframe=timeframe,
+            count=count,
+            start_ts=start_ts,
+            end_ts=end_ts
+        )
+        return self._get("public/get-candlestick", params)
+
+    def get_book(self, instrument_name: str, depth: Optional[int] = None) -> ApiResponse:
+        """Get order book snapshot from public/get-book endpoint"""
+        return self._get("public/get-book", self._params(instrument_name=instrument_name, depth=depth))
+
+    def get_trades(self, instrument_name: str, count: Optional[int] = None,
+                   start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> ApiResponse:
+        """Get recent public trades from public/get-trades endpoint"""
+        params = self._params(
+            instrument_name=instrument_name,
+            count=count,
+            start_ts=start_ts,
+            end_ts=end_ts
+        )
+        return self._get("public/get-trades", params)
+
+    def get_tickers(self, instrument_name: Optional[str] = None) -> ApiResponse:
+        """Get tickers for one instrument, or all instruments if omitted"""
+        return self._get("public/get-tickers", self._params(instrument_name=instrument_name))
+
+    def get_valuations(self, instrument_name: str, valuation_type: str,
+                       count: Optional[int] = None, start_ts: Optional[int] = None,
+                       end_ts: Optional[int] = None) -> ApiResponse:
+        """
+        Get valuation data from public/get-valuations endpoint
+
+        Args:
+            instrument_name: Index or instrument (e.g., BTCUSD-INDEX)
+            valuation_type: index_price, mark_price, funding_hist, funding_rate or estimated_funding_rate
+            count: Number of records to return
+        """
+        params = self._params(
+            instrument_name=instrument_name,
+            valuation_type=valuation_type,
+            count=count,
+            start_ts=start_ts,
+            end_ts=end_ts
+        )
+        return self._get("public/get-valuations", params)
+
+    def get_insurance(self, instrument_name: str, count: Optional[int] = None,
+                      start_ts: Optional[int] = None, end_ts: Optional[int] = None) -> ApiResponse:
+        """Get insurance fund balance history from public/get-insurance endpoint"""
+        params = self._params(
+            instrument_name=instrument_name,
+            count=count,
+            start_ts=start_ts,
+            end_ts=end_ts
+        )
+        return self._get("public/get-insurance", params)
+
+    def get_announcements(self, category: Optional[str] = None,
+                          product_type: Optional[str] = None) -> ApiResponse:
+        """Get exchange announcements, optionally filtered by category and product type"""
+        return self._get("public/get-announcements",
+                         self._params(category=category or None, product_type=product_type or None))
+
+    def _get_reference(self, method: str, use_cache: bool = True) -> ApiResponse:
+        """GET a reference-data endpoint through the reference cache, if there is one and use_cache is set"""
+        if self.reference_cache is None or not use_cache:
+            return self._get(method)
+        return self.reference_cache.get(method, lambda headers: self._get(method, headers=headers))
+
+    def get_instruments(self, use_cache: bool = True) -> ApiResponse:
+        """
+        Get list of available instruments (cached for config.instruments_cache_ttl)
+
+        Args:
+            use_cache: False always requests the endpoint, e.g. to test it
+        """
+        return self._get_reference(INSTRUMENTS, use_cache)
+
+    def get_risk_parameters(self, use_cache: bool = True) -> ApiResponse:
+        """
+        Get default and per-currency risk parameters (cached for config.risk_parameters_cache_ttl)
+
+        Args:
+            use_cache: False always requests the endpoint, e.g. to test it
+        """
+        return self._get_reference(RISK_PARAMETERS, use_cache)
+
+    def get_instrument(self, symbol: str) -> Optional[Instrument]:
+        """Instrument metadata (tick sizes, decimals, leverage) by symbol, or None if unknown"""
+        if self.reference_cache is None:
+            return build_index(INSTRUMENTS, self._get(INSTRUMENTS)).get(symbol)
+        return self.reference_cache.lookup(INSTRUMENTS, symbol, lambda headers: self._get(INSTRUMENTS, headers=headers))
+
+    def get_currency_risk_parameters(self, instrument_name: str) -> Optional[Dict[str, Any]]:
+        """base_currency_config entry for a currency (e.g. BTC), or None if it uses the defaults"""
+        if self.reference_cache is None:
+            response = self._get(RISK_PARAMETERS)
+            return next((entry for entry in response.json()['result']['base_currency_config']
+                         if entry.get('instrument_name') == instrument_name), None)
+        return self.reference_cache.lookup(RISK_PARAMETERS, instrument_name,
+                                           lambda headers: self._get(RISK_PARAMETERS, headers=headers))
+
+    def get_expired_settlement_price(self, instrument_type: str,
+                                     page: Optional[int] = None) -> ApiResponse:
+        """Get settlement prices of expired instruments (e.g., FUTURE)"""
+        return self._get("public/get-expired-settlement-price",
+                         self._params(instrument_type=instrument_type, page=page))
+
     def close(self):
-        """Close the session"""
-        self.session.close()
+        """Close the session if this client owns it; the shared pool stays warm"""
+        if self._owns_session:
+            self.session.close()
@@ -0,0 +1,121 @@
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Generic, Iterator, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class RingBuffer(Generic[T]):
+    """
+    Fixed-capacity, thread-safe FIFO that drops the oldest item when full
+
+    Appends, length and counter reads are O(1). snapshot() copies at most
+    `capacity` items, so its cost does not grow with how long the buffer ran.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._items: Deque[T] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self.total: int = 0
+        self.dropped: int = 0
+
+    def append(self, item: T) -> bool:
+        """Add an item; returns True if the oldest item was dropped to make room"""
+        with self._lock:
+            dropped = len(self._items) == self.capacity
+            self._items.append(item)
+            self.total += 1
+            if dropped:
+                self.dropped += 1
+            return dropped
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate over a snapshot, so concurrent appends cannot invalidate the iterator"""
+        return iter(self.snapshot())
+
+    def snapshot(self) -> List[T]:
+        """Copy of the retained items, oldest first"""
+        with self._lock:
+            return list(self._items)
+
+    def latest(self) -> Optional[T]:
+        """Most recently appended item, or None if empty"""
+        with self._lock:
+            return self._items[-1] if self._items else None
+
+    def tail(self, count: int) -> List[T]:
+        """Up to `count` most recent items, oldest first"""
+        with self._lock:
+            if count >= len(self._items):
+                return list(self._items)
+            return [self._items[i] for i in range(len(self._items) - count, len(self._items))]
+
+    def clear(self) -> None:
+        """Drop retained items; lifetime counters are kept"""
+        with self._lock:
+            self._items.clear()
+
+
+class ChannelMessageBuffer:
+    """
+    Bounded store of WebSocket messages with a ring buffer per channel
+
+    Every message goes into the combined buffer and, when it belongs to a
+    channel, into that channel's own (smaller) buffer so per-channel reads
+    never scan other channels' traffic.
+    """
+
+    def __init__(self, capacity: int, channel_capacity: int):
+        self.channel_capacity = channel_capacity
+        self.all: RingBuffer[Dict[str, Any]] = RingBuffer(capacity)
+        self._channels: Dict[str, RingBuffer[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def append(self, message: Dict[str, Any], channel: Optional[str] = None) -> None:
+        self.all.append(message)
+        if channel:
+            self.channel(channel).append(message)
+
+    def channel(self, channel: str) -> RingBuffer[Dict[str, Any]]:
+        """Buffer for one channel, created on first use"""
+        with self._lock:
+            buffer = self._channels.get(channel)
+            if buffer is None:
+                buffer = self._channels[channel] = RingBuffer(self.channel_capacity)
+            return buffer
+
+    def channels(self) -> List[str]:
+        with self._lock:
+            return list(self._channels)
+
+    @property
+    def total(self) -> int:
+        """Messages received since creation, including dropped ones"""
+        return self.all.total
+
+    @property
+    def dropped(self) -> int:
+        """Messages evicted from the combined buffer"""
+        return self.all.dropped
+
+    def __len__(self) -> int:
+        return len(self.all)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.all)
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        return self.all.snapshot()
+
+    def clear(self) -> None:
+        with self._lock:
+            channels = list(self._channels.values())
+        self.all.clear()
+        for buffer in channels:
+            buffer.clear()
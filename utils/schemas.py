@@ -0,0 +1,170 @@
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+from jsonschema import Draft7Validator, ValidationError
+from jsonschema.exceptions import best_match
+
+
+def _response_schema(item_schema: Dict[str, Any], result_required: Tuple[str, ...] = ('data',),
+                     result_properties: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Envelope shared by public REST responses: id, method, code and result.data[]"""
+    return {
+        "type": "object",
+        "properties": {
+            "id": {"type": "number"},
+            "method": {"type": "string"},
+            "code": {"type": "number"},
+            "result": {
+                "type": "object",
+                "properties": {
+                    "data": {"type": "array", "items": item_schema},
+                    **(result_properties or {}),
+                },
+                "required": list(result_required)
+            }
+        },
+        "required": ["id", "method", "code", "result"]
+    }
+
+
+_value_item = {
+    "type": "object",
+    "properties": {
+        "v": {"type": "string"},
+        "t": {"type": "number"}
+    },
+    "required": ["v", "t"]
+}
+
+_book_levels = {
+    "type": "array",
+    "items": {"type": "array", "items": {"type": "string"}, "minItems": 3, "maxItems": 3}
+}
+
+# Endpoint or stream name -> JSON Schema (draft 7)
+SCHEMAS: Dict[str, Dict[str, Any]] = {
+    'get-tickers': {
+        "type": "object",
+        "properties": {
+            "id": {"type": "number"},
+            "method": {"type": "string"},
+            "code": {"type": "number"},
+            "result": {
+                "type": "object",
+                "properties": {
+                    "data": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "h": {"type": ["string", "null"]},
+                                "l": {"type": ["string", "null"]},
+                                "a": {"type": ["string", "null"]},
+                                "i": {"type": "string"},
+                                "v": {"type": "string"},
+                                "vv": {"type": "string"},
+                                "oi": {"type": "string"},
+                                "c": {"type": ["string", "null"]},
+                                "b": {"type": ["string", "null"]},
+                                "k": {"type": ["string", "null"]},
+                                "t": {"type": "number"}
+                            },
+                            "required": ["i", "t"]
+                        }
+                    }
+                }
+            }
+        }
+    },
+    'get-valuations': _response_schema(
+        _value_item,
+        result_required=('data', 'instrument_name'),
+        result_properties={"instrument_name": {"type": "string"}}
+    ),
+    'get-insurance': _response_schema(
+        _value_item,
+        result_required=('instrument_name', 'data'),
+        result_properties={"instrument_name": {"type": "string"}}
+    ),
+    'get-expired-settlement-price': _response_schema({
+        "type": "object",
+        "properties": {
+            "i": {"type": "string"},  # Instrument name
+            "x": {"type": "number"},  # Expiration timestamp
+            "v": {"type": "string"},  # Settlement value
+            "t": {"type": "number"}   # Publish timestamp
+        },
+        "required": ["i", "x", "v", "t"]
+    }),
+    # WebSocket book / book.update pushes
+    'ws-book': {
+        "type": "object",
+        "properties": {
+            "result": {
+                "type": "object",
+                "properties": {
+                    "instrument_name": {"type": "string"},
+                    "subscription": {"type": "string"},
+                    "channel": {"type": "string"},
+                    "data": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "bids": _book_levels,
+                                "asks": _book_levels,
+                                "update": {
+                                    "type": "object",
+                                    "properties": {"bids": _book_levels, "asks": _book_levels}
+                                },
+                                "t": {"type": "number"},
+                                "u": {"type": "number"},
+                                "pu": {"type": "number"}
+                            },
+                            "required": ["t"]
+                        }
+                    }
+                },
+                "required": ["channel", "data"]
+            }
+        },
+        "required": ["result"]
+    },
+}
+
+
+@lru_cache(maxsize=None)
+def get_validator(name: str) -> Draft7Validator:
+    """Validator for a registered schema; the schema is checked and compiled once per process"""
+    schema = SCHEMAS[name]
+    Draft7Validator.check_schema(schema)
+    return Draft7Validator(schema)
+
+
+def compile_all() -> None:
+    """Build every validator up front, e.g. before timing-sensitive scenarios"""
+    for name in SCHEMAS:
+        get_validator(name)
+
+
+def validate_schema(instance: Any, name: str) -> None:
+    """Raise the most relevant ValidationError if instance does not match the named schema"""
+    validator = get_validator(name)
+    if validator.is_valid(instance):
+        return
+    error = best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def is_valid(instance: Any, name: str) -> bool:
+    """Fast yes/no check that stops at the first error instead of collecting them"""
+    return get_validator(name).is_valid(instance)
+
+
+def stream_validator(name: str) -> Callable[[Any], bool]:
+    """Bound is_valid for one schema, for per-message checks on hot WebSocket streams"""
+    return get_validator(name).is_valid
+
+
+def iter_errors(instance: Any, name: str) -> Iterator[ValidationError]:
+    return get_validator(name).iter_errors(instance)
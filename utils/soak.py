@@ -0,0 +1,249 @@
+import json
+import math
+import os
+import sys
+import threading
+import time
+import logging
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+from config.settings import config
+from utils.ring_buffer import ChannelMessageBuffer
+from utils.schemas import stream_validator
+from utils.websocket_client import CryptoWebSocketClient
+
+logger = logging.getLogger(__name__)
+
+# name -> check(message) returning False for an invalid message
+Validator = Callable[[Dict[str, Any]], bool]
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # ru_maxrss is bytes on macOS and KB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+    return None
+
+
+def default_validators() -> Dict[str, Validator]:
+    """Schema check of order book pushes"""
+    is_valid_book = stream_validator('ws-book')
+    return {
+        'book_schema': lambda message: not str(message.get('result', {}).get('channel', '')).startswith('book')
+        or is_valid_book(message)
+    }
+
+
+@dataclass
+class SoakWindow:
+    """Metrics of one soak window"""
+    started_at: float
+    seconds: float
+    messages: int
+    messages_per_second: float
+    mean_interval_ms: float
+    jitter_ms: float
+    max_interval_ms: float
+    validation_failures: Dict[str, int]
+    reconnects: int
+    rss_mb: Optional[float]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _WindowCounters:
+    """Running counters for the current window; inter-arrival stats use Welford's algorithm"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.start = time.monotonic()
+        self.messages = 0
+        self.intervals = 0
+        self.interval_mean = 0.0
+        self.interval_m2 = 0.0
+        self.max_interval = 0.0
+        self.validation_failures: Dict[str, int] = {}
+        self.reconnects = 0
+
+    def add_interval(self, seconds: float) -> None:
+        self.intervals += 1
+        delta = seconds - self.interval_mean
+        self.interval_mean += delta / self.intervals
+        self.interval_m2 += delta * (seconds - self.interval_mean)
+        self.max_interval = max(self.max_interval, seconds)
+
+    def close(self) -> SoakWindow:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        variance = self.interval_m2 / (self.intervals - 1) if self.intervals > 1 else 0.0
+        rss = rss_mb()
+        return SoakWindow(
+            started_at=self.started_at,
+            seconds=round(elapsed, 3),
+            messages=self.messages,
+            messages_per_second=round(self.messages / elapsed, 2),
+            mean_interval_ms=round(self.interval_mean * 1000, 3),
+            jitter_ms=round(math.sqrt(variance) * 1000, 3),
+            max_interval_ms=round(self.max_interval * 1000, 3),
+            validation_failures=dict(self.validation_failures),
+            reconnects=self.reconnects,
+            rss_mb=None if rss is None else round(rss, 1)
+        )
+
+
+class SoakMonitor:
+    """
+    Constant-memory metrics for long WebSocket runs
+
+    Every pushed data message is counted and run through the validators, and
+    its inter-arrival time on its channel feeds a running mean and standard
+    deviation (jitter). Nothing is kept per message: memory depends only on
+    the number of channels and on `max_windows`, not on run length.
+    """
+
+    def __init__(self, validators: Optional[Dict[str, Validator]] = None, max_windows: Optional[int] = None):
+        self.validators = validators if validators is not None else default_validators()
+        self.windows: Deque[SoakWindow] = deque(maxlen=max_windows or config.soak_max_windows)
+        self.total_messages: int = 0
+        self.total_failures: int = 0
+        self.total_reconnects: int = 0
+        self._last_arrival: Dict[str, float] = {}
+        self._current = _WindowCounters()
+        self._lock = threading.Lock()
+
+    def attach(self, client: CryptoWebSocketClient) -> None:
+        client.add_message_handler('soak', self.observe)
+
+    def detach(self, client: CryptoWebSocketClient) -> None:
+        client.remove_message_handler('soak')
+
+    def observe(self, message: Dict[str, Any], channel: Optional[str]) -> None:
+        payload = message.get('result') or message.get('params')
+        if not channel or not isinstance(payload, dict) or 'data' not in payload:
+            return
+        failed = [name for name, validator in self.validators.items() if not validator(message)]
+        now = time.monotonic()
+        with self._lock:
+            window = self._current
+            window.messages += 1
+            self.total_messages += 1
+            last = self._last_arrival.get(channel)
+            if last is not None:
+                window.add_interval(now - last)
+            self._last_arrival[channel] = now
+            for name in failed:
+                window.validation_failures[name] = window.validation_failures.get(name, 0) + 1
+            self.total_failures += len(failed)
+
+    def record_reconnect(self) -> None:
+        with self._lock:
+            self._current.reconnects += 1
+            self.total_reconnects += 1
+
+    def rotate(self) -> SoakWindow:
+        """Close the current window and start the next one"""
+        with self._lock:
+            window = self._current.close()
+            self._current = _WindowCounters()
+            self.windows.append(window)
+        return window
+
+    def rss_growth_mb(self) -> Optional[float]:
+        """RSS of the last window minus the first, or None without RSS readings"""
+        readings = [window.rss_mb for window in self.windows if window.rss_mb is not None]
+        if len(readings) < 2:
+            return None
+        return readings[-1] - readings[0]
+
+
+class SoakRunner:
+    """
+    Hold subscriptions on a client for a long time and report rolling windows
+
+    The client's message buffers are shrunk to `retain` messages for the run,
+    so the messages themselves are not what grows. Reconnects done by the
+    client are counted; a client without auto_reconnect is reconnected and
+    re-subscribed by the runner instead. Each window is logged and, when
+    `report_path` is set, appended to it as a JSON line.
+    """
+
+    def __init__(self, client: CryptoWebSocketClient, monitor: Optional[SoakMonitor] = None,
+                 window_seconds: Optional[float] = None, report_path: Optional[str] = None,
+                 retain: int = 100):
+        self.client = client
+        self.monitor = monitor or SoakMonitor()
+        self.window_seconds = window_seconds or config.soak_window_seconds
+        self.report_path = report_path if report_path is not None else config.soak_report_path
+        self.retain = retain
+
+    def _write(self, window: SoakWindow) -> None:
+        if not self.report_path:
+            return
+        directory = os.path.dirname(self.report_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.report_path, 'a') as f:
+            f.write(json.dumps(window.to_dict()) + "\n")
+
+    def _recover(self, channels: List[str]) -> None:
+        """Reconnect and re-subscribe after the connection dropped"""
+        logger.warning("Soak connection lost, reconnecting")
+        if self.client.connect() and channels:
+            self.client.subscribe_many(channels)
+        self.monitor.record_reconnect()
+
+    def run(self, duration: float) -> List[SoakWindow]:
+        """Soak for `duration` seconds; returns the windows still held by the monitor"""
+        channels = self.client.subscribed_channels()
+        buffers = self.client.received_messages
+        self.client.received_messages = ChannelMessageBuffer(self.retain, self.retain)
+        self.monitor.attach(self.client)
+        self.client.add_reconnect_handler('soak', lambda client: self.monitor.record_reconnect())
+        logger.info(f"Soaking {len(channels)} channels for {duration:.0f}s in {self.window_seconds:.0f}s windows")
+
+        deadline = time.monotonic() + duration
+        try:
+            while True:
+                window_end = min(time.monotonic() + self.window_seconds, deadline)
+                while time.monotonic() < window_end:
+                    if not self.client.auto_reconnect and not self.client.is_healthy():
+                        self._recover(channels)
+                    time.sleep(min(1.0, max(0.0, window_end - time.monotonic())))
+                window = self.monitor.rotate()
+                self._write(window)
+                logger.info(f"Soak window: {window.messages_per_second} msg/s, jitter {window.jitter_ms}ms, "
+                            f"max gap {window.max_interval_ms}ms, failures {window.validation_failures}, "
+                            f"reconnects {window.reconnects}, RSS {window.rss_mb}MB")
+                if time.monotonic() >= deadline:
+                    break
+        finally:
+            self.monitor.detach(self.client)
+            self.client.remove_reconnect_handler('soak')
+            self.client.received_messages = buffers
+        return list(self.monitor.windows)
+
+
+def summarize(windows: List[SoakWindow]) -> Dict[str, Tuple[float, float]]:
+    """(min, max) of the main per-window metrics, for reports and assertions"""
+    if not windows:
+        return {}
+    metrics = ('messages_per_second', 'jitter_ms', 'max_interval_ms')
+    summary = {name: (min(getattr(w, name) for w in windows), max(getattr(w, name) for w in windows))
+               for name in metrics}
+    readings = [w.rss_mb for w in windows if w.rss_mb is not None]
+    if readings:
+        summary['rss_mb'] = (min(readings), max(readings))
+    return summary
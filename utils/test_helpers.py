@@ -1,10 +1,14 @@
 import time
 import json
 import logging
-from typing import Dict, List, Any, Optional, Callable
+import threading
+from typing import Dict, List, Any, Optional, Callable, Iterable, Union
 from datetime import datetime, timedelta
+import numpy as np
 import requests
 from config.settings import config
+from utils.models import BookLevel, Candle, as_candles, as_levels
+from utils.rate_limiter import get_rate_limiter, group_for_endpoint, parse_retry_after
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +19,34 @@ class TestHelpers:
     def wait_for_condition(condition_func: Callable[[], bool],
                         timeout: int = 10,
                         interval: float = 0.1,
-                        error_message: str = "Condition not met within timeout") -> bool:
+                        error_message: str = "Condition not met within timeout",
+                        notifier: Optional[threading.Condition] = None) -> bool:
         """
         Wait for a condition to be true within timeout
         
         Args:
             condition_func: Function that returns bool
             timeout: Maximum time to wait in seconds
-            interval: Check interval in seconds
+            interval: Check interval in seconds (only used without a notifier)
             error_message: Error message if timeout occurs
+            notifier: Condition notified whenever the checked state changes
+                (e.g. CryptoWebSocketClient.condition); re-checks on each
+                notification instead of polling
         """
+        if notifier is not None:
+            def safe_condition() -> bool:
+                try:
+                    return condition_func()
+                except Exception as e:
+                    logger.debug(f"Condition check failed: {e}")
+                    return False
+
+            with notifier:
+                if notifier.wait_for(safe_condition, timeout):
+                    return True
+            logger.error(f"{error_message} (timeout: {timeout}s)")
+            return False
+
         start_time = time.time()
         
         while time.time() - start_time < timeout:
@@ -122,20 +144,30 @@ class CandlestickHelpers:
             return {'change': 0, 'change_percent': 0, 'is_bullish': False, 'is_bearish': False}
     
     @staticmethod
-    def validate_chronological_order(candlesticks: List[Dict]) -> bool:
+    def validate_chronological_order(candlesticks: List[Union[Candle, Dict]]) -> bool:
         """Validate that candlesticks are in chronological order"""
         if len(candlesticks) < 2:
             return True
         
-        for i in range(1, len(candlesticks)):
-            if candlesticks[i]['t'] <= candlesticks[i-1]['t']:
+        candles = as_candles(candlesticks)
+        for i in range(1, len(candles)):
+            if candles[i].timestamp <= candles[i-1].timestamp:
                 return False
         return True
     
     @staticmethod
     def get_timeframe_duration_ms(timeframe: str) -> int:
-        """Get timeframe duration in milliseconds"""
+        """Get timeframe duration in milliseconds (exchange names like M5 or legacy names like 5m)"""
         timeframe_map = {
+            'M1': 60 * 1000,
+            'M5': 5 * 60 * 1000,
+            'M15': 15 * 60 * 1000,
+            'M30': 30 * 60 * 1000,
+            'H1': 60 * 60 * 1000,
+            'H2': 2 * 60 * 60 * 1000,
+            'H4': 4 * 60 * 60 * 1000,
+            'H12': 12 * 60 * 60 * 1000,
+            'D1': 24 * 60 * 60 * 1000,
             '1m': 60 * 1000,
             '5m': 5 * 60 * 1000,
             '15m': 15 * 60 * 1000,
@@ -155,36 +187,45 @@ class BookHelpers:
     """Helpers specific to order book testing"""
     
     @staticmethod
-    def validate_price_levels(levels: List[List], ascending: bool = True) -> bool:
+    def levels_to_array(levels: List[Union[BookLevel, List]]) -> np.ndarray:
+        """
+        Parse BookLevels or raw [price, quantity, count] levels in one pass into an (n, 3) float64 array
+
+        Raises ValueError for a raw level with fewer than three fields.
+        """
+        if levels and isinstance(levels[0], BookLevel):
+            values = (value for level in as_levels(levels) for value in (level.price, level.quantity, level.count))
+        else:
+            values = (float(value) for level in map(BookHelpers._check_raw_level, levels) for value in level[:3])
+        return np.fromiter(values, dtype=np.float64, count=3 * len(levels)).reshape(len(levels), 3)
+    
+    @staticmethod
+    def _check_raw_level(level: List) -> List:
+        if len(level) < 3:
+            raise ValueError(f"Book level {level!r} is not [price, quantity, count]")
+        return level
+
+    @staticmethod
+    def validate_price_levels(levels: List[Union[BookLevel, List]], ascending: bool = True) -> bool:
         """Validate price level ordering"""
         if len(levels) < 2:
             return True
         
-        for i in range(1, len(levels)):
-            try:
-                current_price = float(levels[i][0])
-                previous_price = float(levels[i-1][0])
-                
-                if ascending:
-                    if current_price <= previous_price:
-                        return False
-                else:
-                    if current_price >= previous_price:
-                        return False
-            except (ValueError, IndexError):
-                return False
-        
-        return True
+        try:
+            steps = np.diff(BookHelpers.levels_to_array(levels)[:, 0])
+        except (ValueError, IndexError, TypeError):
+            return False
+        return bool((steps > 0).all() if ascending else (steps < 0).all())
     
     @staticmethod
-    def calculate_spread(bids: List[List], asks: List[List]) -> Dict[str, float]:
+    def calculate_spread(bids: List[Union[BookLevel, List]], asks: List[Union[BookLevel, List]]) -> Dict[str, float]:
         """Calculate bid-ask spread metrics"""
         try:
             if not bids or not asks:
                 return {'spread': 0, 'spread_percent': 0, 'mid_price': 0}
             
-            best_bid = float(bids[0][0])
-            best_ask = float(asks[0][0])
+            best_bid = as_levels(bids[:1])[0].price
+            best_ask = as_levels(asks[:1])[0].price
             
             spread = best_ask - best_bid
             mid_price = (best_bid + best_ask) / 2
@@ -201,42 +242,60 @@ class BookHelpers:
             return {'spread': 0, 'spread_percent': 0, 'mid_price': 0}
     
     @staticmethod
-    def validate_level_format(level: List) -> bool:
+    def validate_level_format(level: Union[BookLevel, List]) -> bool:
         """Validate individual price level format [price, quantity, count]"""
         try:
-            if not isinstance(level, list) or len(level) != 3:
-                return False
-            
-            price = float(level[0])
-            quantity = float(level[1])
-            count = int(level[2])
+            if not isinstance(level, BookLevel):
+                if not isinstance(level, list) or len(level) != 3:
+                    return False
+                level = BookLevel.from_raw(level)
             
-            return price > 0 and quantity > 0 and count > 0
+            return level.price > 0 and level.quantity > 0 and level.count > 0
         except (ValueError, TypeError, IndexError):
             return False
     
     @staticmethod
-    def get_total_volume(levels: List[List]) -> float:
-        """Calculate total volume from price levels"""
-        try:
-            return sum(float(level[1]) for level in levels)
-        except (ValueError, IndexError):
-            return 0.0
+    def get_total_volume(levels: List[Union[BookLevel, List]]) -> float:
+        """Calculate total volume from price levels; malformed levels raise instead of counting as zero"""
+        return float(BookHelpers.levels_to_array(levels)[:, 1].sum())
 
 class WebSocketHelpers:
     """Helpers for WebSocket testing"""
     
     @staticmethod
-    def wait_for_websocket_message(messages: List[Dict],
+    def wait_for_websocket_message(messages: Iterable[Dict],
                                 condition: Callable[[Dict], bool],
-                                timeout: int = 10) -> Optional[Dict]:
-        """Wait for a specific WebSocket message matching condition"""
+                                timeout: int = 10,
+                                notifier: Optional[threading.Condition] = None) -> Optional[Dict]:
+        """
+        Wait for a specific WebSocket message matching condition
+
+        Args:
+            messages: Live message collection, e.g. CryptoWebSocketClient.received_messages
+            condition: Predicate the wanted message satisfies
+            timeout: Maximum time to wait in seconds
+            notifier: Condition notified on each new message (e.g. CryptoWebSocketClient.condition);
+                without it the collection is polled every 100ms
+        """
+        found: List[Dict] = []
+
+        def find_message() -> bool:
+            for message in reversed(list(messages)):  # Check newest first
+                if condition(message):
+                    found.append(message)
+                    return True
+            return False
+
+        if notifier is not None:
+            with notifier:
+                notifier.wait_for(find_message, timeout)
+            return found[0] if found else None
+
         start_time = time.time()
         
         while time.time() - start_time < timeout:
-            for message in reversed(messages):  # Check newest first
-                if condition(message):
-                    return message
+            if find_message():
+                return found[0]
             time.sleep(0.1)
         
         return None
@@ -269,9 +328,19 @@ class APITestHelpers:
     
     @staticmethod
     def make_request_with_retry(method: str, url: str, **kwargs) -> requests.Response:
-        """Make HTTP request with retry logic"""
+        """Make HTTP request with rate limiting, retrying errors and 429s (honoring Retry-After)"""
+        rate_limiter = get_rate_limiter()
+        group = group_for_endpoint(url)
+
         def make_request():
-            return requests.request(method, url, timeout=config.rest_timeout, **kwargs)
+            rate_limiter.acquire(group)
+            response = requests.request(method, url, timeout=config.rest_timeout, **kwargs)
+            if response.status_code == 429:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None:
+                    rate_limiter.penalize(group, retry_after)
+                response.raise_for_status()
+            return response
         
         return TestHelpers.retry_operation(
             make_request,
@@ -352,9 +421,10 @@ class DataGenerators:
         ]
 
 # Export commonly used helpers
-def wait_for_condition(condition_func: Callable[[], bool], timeout: int = 10) -> bool:
+def wait_for_condition(condition_func: Callable[[], bool], timeout: int = 10,
+                       notifier: Optional[threading.Condition] = None) -> bool:
     """Convenience function for waiting for conditions"""
-    return TestHelpers.wait_for_condition(condition_func, timeout)
+    return TestHelpers.wait_for_condition(condition_func, timeout, notifier=notifier)
 
 def validate_ohlc(open_price: float, high: float, low: float, close_price: float) -> bool:
     """Convenience function for OHLC validation"""
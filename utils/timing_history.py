@@ -0,0 +1,67 @@
+import os
+import statistics
+import tempfile
+import logging
+from typing import Dict, Iterable, Optional
+from config.settings import config
+from utils.file_lock import locked_json_file
+
+logger = logging.getLogger(__name__)
+
+# Weight of the latest run in the moving average of a scenario's duration
+SMOOTHING = 0.3
+
+# Estimate for scenarios that have never run and no history to take a median from
+DEFAULT_DURATION = 1.0
+
+
+def default_history_path() -> str:
+    """Timings file shared by every run on this machine, unless TIMING_HISTORY_PATH is set"""
+    if config.timing_history_path:
+        return config.timing_history_path
+    return os.path.join(tempfile.gettempdir(), "crypto_tasks_scenario_timings.json")
+
+
+def scenario_key(feature_path: str, scenario_name: str) -> str:
+    """History key of a scenario (all rows of an outline share one key)"""
+    return f"{feature_path.replace(os.sep, '/')}::{scenario_name}"
+
+
+class TimingHistory:
+    """
+    Per-scenario durations persisted across runs
+
+    Each scenario keeps an exponential moving average of its duration in a
+    JSON file, updated under locked_json_file so concurrent runs can record
+    into the same history.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_history_path()
+        self.durations: Dict[str, float] = {}
+        self.load()
+
+    def load(self) -> None:
+        with locked_json_file(self.path) as state:
+            self.durations = {key: entry['mean'] for key, entry in state.items()}
+
+    def estimate(self, keys: Iterable[str]) -> float:
+        """Expected seconds to run these scenarios; unknown ones count as the median known scenario"""
+        fallback = statistics.median(self.durations.values()) if self.durations else DEFAULT_DURATION
+        return sum(self.durations.get(key, fallback) for key in keys)
+
+    def record(self, durations: Dict[str, float]) -> None:
+        """Fold one run's scenario durations (seconds) into the history"""
+        if not durations:
+            return
+        with locked_json_file(self.path) as state:
+            for key, seconds in durations.items():
+                entry = state.get(key)
+                if entry is None:
+                    state[key] = {'mean': seconds, 'last': seconds, 'runs': 1}
+                else:
+                    entry['mean'] = (1 - SMOOTHING) * entry['mean'] + SMOOTHING * seconds
+                    entry['last'] = seconds
+                    entry['runs'] += 1
+            self.durations = {key: entry['mean'] for key, entry in state.items()}
+        logger.info(f"Recorded {len(durations)} scenario timings in {self.path}")
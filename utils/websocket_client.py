@@ -1,28 +1,206 @@
 import websocket
 import json
+import itertools
+import random
 import threading
 import time
 import logging
-from typing import Optional, Dict, Any, List, Union
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Callable, Iterable, List, Set, Tuple, Union
 from config.settings import config
+from utils.rate_limiter import RateLimiter, get_rate_limiter, WEBSOCKET_GROUP
+from utils.latency import LatencyRecorder, latency_recorder
+from utils.ring_buffer import ChannelMessageBuffer, RingBuffer
+from utils import json_codec
 
 logger = logging.getLogger(__name__)
 
+HEARTBEAT = "public/heartbeat"
+RESPOND_HEARTBEAT = "public/respond-heartbeat"
+
+# Acks of finished requests kept for wait_for_ack / wait_for_response
+RECENT_ACKS = 256
+
+
+def message_channel(message: Dict[str, Any]) -> Optional[str]:
+    """Full channel name of a pushed message, e.g. book.BTCUSD-PERP.10"""
+    result = message.get('result')
+    if isinstance(result, dict):
+        return result.get('subscription') or result.get('channel')
+    params = message.get('params')
+    if isinstance(params, dict):
+        return params.get('channel')
+    return None
+
+
+@dataclass
+class RequestAck:
+    """Outcome of a request, matched to its response by id"""
+    request_id: int
+    method: str
+    channels: List[str]
+    code: Optional[int]  # None if no response arrived (timeout or connection lost)
+    message: Optional[str] = None
+    latency_ms: Optional[float] = None
+    response: Optional[Dict[str, Any]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.code == 0
+
+
+@dataclass
+class PendingRequest:
+    """
+    A sent request awaiting its response
+
+    The future resolves on the first response. A (un)subscribe request stays
+    open until every channel in `remaining` has been answered, since the
+    exchange may answer once per channel.
+    """
+    request_id: int
+    method: str
+    channels: List[str]
+    sent_ns: int
+    deadline: float
+    future: Future = field(default_factory=Future)
+    remaining: Set[str] = field(default_factory=set)
+
+
+def book_channels(instruments: Iterable[str], depth: int) -> List[str]:
+    """Order book channel names for many instruments, e.g. book.BTCUSD-PERP.10"""
+    return [f"book.{instrument}.{depth}" for instrument in instruments]
+
+
+def group_by_params(channel_params: Dict[str, Dict[str, Any]]) -> List[Tuple[List[str], Dict[str, Any]]]:
+    """Group channels that were subscribed with the same extra params, so each group is one subscribe call"""
+    groups: Dict[Tuple, Tuple[List[str], Dict[str, Any]]] = {}
+    for channel, params in channel_params.items():
+        key = tuple(sorted((name, repr(value)) for name, value in params.items()))
+        groups.setdefault(key, ([], params))[0].append(channel)
+    return list(groups.values())
+
+
+def chunk_channels(channels: List[str], max_channels: int, max_bytes: int) -> List[List[str]]:
+    """Split channels into request-sized groups under a channel count and encoded size limit"""
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for channel in channels:
+        # json-encoded list entry: quotes plus separator
+        entry = len(channel.encode('utf-8')) + 4
+        if current and (len(current) >= max_channels or size + entry > max_bytes):
+            chunks.append(current)
+            current, size = [], 0
+        current.append(channel)
+        size += entry
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class BulkSubscription:
+    """Tracks per-channel acks for a subscription split across many requests"""
+
+    def __init__(self, client: "CryptoWebSocketClient", channels: List[str]):
+        self.client = client
+        self.channels = channels
+        self.futures: List[Future] = []
+        self.send_errors: Dict[str, str] = {}
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every channel is acked, rejected or timed out; True if none is still pending"""
+        with self.client.condition:
+            return self.client.condition.wait_for(lambda: not self.pending(), timeout)
+
+    def acks(self) -> Dict[str, Optional[RequestAck]]:
+        """Latest ack per channel from this bulk request (None if not answered yet)"""
+        request_ids = {future.result().request_id for future in self.futures if future.done()}
+        result: Dict[str, Optional[RequestAck]] = {}
+        for channel in self.channels:
+            ack = self.client.channel_acks.get(channel)
+            result[channel] = ack if ack is not None and ack.request_id in request_ids else None
+        return result
+
+    def succeeded(self) -> List[str]:
+        return [channel for channel, ack in self.acks().items() if ack is not None and ack.ok]
+
+    def failed(self) -> Dict[str, str]:
+        """Channels that were rejected, timed out or could not be sent, with the reason"""
+        failures = dict(self.send_errors)
+        for channel, ack in self.acks().items():
+            if ack is not None and not ack.ok:
+                failures[channel] = ack.message or f"code {ack.code}"
+        return failures
+
+    def pending(self) -> List[str]:
+        return [channel for channel, ack in self.acks().items()
+                if ack is None and channel not in self.send_errors]
+
+    def ack_latencies_ms(self) -> Dict[str, float]:
+        return {channel: ack.latency_ms for channel, ack in self.acks().items()
+                if ack is not None and ack.latency_ms is not None}
+
+
 class CryptoWebSocketClient:
     
-    def __init__(self):
+    def __init__(self, rate_limiter: Optional[RateLimiter] = None,
+                 recorder: Optional[LatencyRecorder] = None,
+                 auto_reconnect: Optional[bool] = None):
+        """
+        Args:
+            rate_limiter: Limiter consulted before each request; defaults to the shared one
+            recorder: Latency recorder for connect, ack and reconnect times; defaults to the process-wide one
+            auto_reconnect: Reconnect and re-subscribe after an unexpected close; defaults to
+                config.ws_reconnect_enabled
+        """
         self.ws_url: str = config.websocket_url
+        self.rate_limiter: RateLimiter = rate_limiter or get_rate_limiter()
+        self.recorder: LatencyRecorder = recorder or latency_recorder
         self.ws: Optional[websocket.WebSocketApp] = None
         self.connected: bool = False
         self.connection_error: Optional[str] = None
         self.ws_thread: Optional[threading.Thread] = None
-        self.message_handlers: Dict[str, Any] = {}
-        self.received_messages: List[Dict[str, Any]] = []
+        # name -> handler(message, channel), called on the socket thread for every message
+        self.message_handlers: Dict[str, Callable[[Dict[str, Any], Optional[str]], None]] = {}
+        # name -> handler(client), called when the connection closes for good (no reconnect follows)
+        self.close_handlers: Dict[str, Callable[["CryptoWebSocketClient"], None]] = {}
+        # name -> handler(client), called after a reconnect, before subscriptions are replayed
+        self.reconnect_handlers: Dict[str, Callable[["CryptoWebSocketClient"], None]] = {}
+        # channel -> extra subscribe params of every channel we want to stay subscribed to
+        self.subscriptions: Dict[str, Dict[str, Any]] = {}
+        self.auto_reconnect: bool = config.ws_reconnect_enabled if auto_reconnect is None else auto_reconnect
+        self.reconnecting: bool = False
+        self.reconnects: int = 0
+        self.reconnect_failures: int = 0
+        self.heartbeats: int = 0
+        self._closing: bool = False
+        self.received_messages: ChannelMessageBuffer = ChannelMessageBuffer(
+            config.ws_buffer_size, config.ws_channel_buffer_size
+        )
         self.subscription_confirmations: Dict[str, bool] = {}
+        self.last_request_id: Optional[int] = None
+        # Request/response correlation: every request gets a unique id whose
+        # future resolves with a RequestAck when the matching response arrives
+        self._request_ids = itertools.count(1)
+        self._requests_lock = threading.Lock()
+        self._requests: Dict[int, PendingRequest] = {}
+        self._recent_acks: "OrderedDict[int, RequestAck]" = OrderedDict()
+        self.channel_acks: Dict[str, RequestAck] = {}
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_wakeup = threading.Event()
+        # Notified on connect, disconnect, error and every received message
+        self.condition: threading.Condition = threading.Condition()
         
     def connect(self) -> bool:
-        """Connect to WebSocket server"""
+        """Connect to WebSocket server; a healthy open connection is reused as is"""
+        if self.is_healthy():
+            return True
+        self._closing = False
         try:
+            start_ns = time.perf_counter_ns()
             websocket.enableTrace(True)
             
             self.ws = websocket.WebSocketApp(
@@ -43,19 +221,15 @@ class CryptoWebSocketClient:
             self.ws_thread.start()
             
             # Wait for connection with timeout
-            timeout = 10
-            start_time = time.time()
-            
-            while not self.connected and not self.connection_error:
-                if time.time() - start_time > timeout:
-                    logger.error("WebSocket connection timeout")
-                    return False
-                time.sleep(0.1)
+            if not self.wait_until_connected(timeout=config.websocket_timeout) and not self.connection_error:
+                logger.error("WebSocket connection timeout")
+                return False
             
             if self.connection_error:
                 logger.error(f"WebSocket connection failed: {self.connection_error}")
                 return False
                 
+            self.recorder.record("ws.connect", time.perf_counter_ns() - start_ns)
             logger.info("WebSocket connected successfully")
             return True
             
@@ -73,6 +247,213 @@ class CryptoWebSocketClient:
                 )
         except Exception as e:
             self.connection_error = str(e)
+            self._notify()
+
+    def _notify(self) -> None:
+        """Wake every thread waiting on the client's condition"""
+        with self.condition:
+            self.condition.notify_all()
+
+    def _send(self, message: Dict[str, Any]) -> None:
+        """Send a JSON request once the WebSocket rate limit allows it"""
+        if self.ws is None:
+            raise ConnectionError("WebSocket not connected")
+        self.rate_limiter.acquire(WEBSOCKET_GROUP)
+        start_ns = time.perf_counter_ns()
+        self.ws.send(json_codec.dumps(message))
+        self.recorder.record(f"ws.send.{message.get('method')}", time.perf_counter_ns() - start_ns)
+
+    def next_request_id(self) -> int:
+        """Unique, increasing id for the next request on this client"""
+        with self._requests_lock:
+            return next(self._request_ids)
+
+    def send_request(self, method: str, params: Optional[Dict[str, Any]] = None,
+                     timeout: Optional[float] = None) -> "Future[RequestAck]":
+        """
+        Send a request and return a future resolved by its response
+
+        The future's RequestAck carries the response code and round-trip latency.
+        If no response arrives within `timeout` (default config.ws_request_timeout)
+        or the connection closes first, it resolves with code None.
+        Raises if the request could not be sent.
+        """
+        if not self.connected or self.ws is None:
+            raise ConnectionError("WebSocket not connected")
+
+        request_id = self.next_request_id()
+        message: Dict[str, Any] = {"id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+
+        request = PendingRequest(
+            request_id=request_id,
+            method=method,
+            channels=list((params or {}).get('channels', [])),
+            sent_ns=time.perf_counter_ns(),
+            deadline=time.monotonic() + (timeout if timeout is not None else config.ws_request_timeout)
+        )
+        if method in ('subscribe', 'unsubscribe'):
+            request.remaining = set(request.channels)
+        # Register before sending: the response can arrive before send() returns
+        with self._requests_lock:
+            self._requests[request_id] = request
+        self._ensure_reaper()
+
+        try:
+            self._send(message)
+        except Exception:
+            with self._requests_lock:
+                self._requests.pop(request_id, None)
+            raise
+
+        self.last_request_id = request_id
+        return request.future
+
+    def subscribe(self, channels: List[str], **params: Any) -> "Future[RequestAck]":
+        """
+        Subscribe to channels in one request; extra params are sent alongside the channels
+
+        The channels and params are remembered and replayed after a reconnect
+        until they are unsubscribed or the exchange rejects them.
+        """
+        future = self.send_request("subscribe", {"channels": list(channels), **params})
+        for channel in channels:
+            self.subscriptions[channel] = params
+        return future
+
+    def subscribe_many(self, channels: List[str], max_channels_per_request: Optional[int] = None,
+                       pace_interval: float = 0.0, **params: Any) -> BulkSubscription:
+        """
+        Subscribe to many channels in as few requests as the exchange limits allow
+
+        Args:
+            channels: Channel names, e.g. from book_channels(instruments, 10)
+            max_channels_per_request: Channels per request (default config.ws_max_channels_per_request)
+            pace_interval: Extra delay in seconds between requests, on top of the rate limiter
+            params: Extra subscribe params sent with every request
+        """
+        bulk = BulkSubscription(self, list(dict.fromkeys(channels)))
+        chunks = chunk_channels(
+            bulk.channels,
+            max_channels_per_request or config.ws_max_channels_per_request,
+            config.ws_max_request_bytes
+        )
+        logger.info(f"Subscribing to {len(bulk.channels)} channels in {len(chunks)} requests")
+
+        for index, chunk in enumerate(chunks):
+            if index and pace_interval:
+                time.sleep(pace_interval)
+            try:
+                bulk.futures.append(self.subscribe(chunk, **params))
+            except Exception as e:
+                logger.error(f"Failed to send subscription for {len(chunk)} channels: {e}")
+                bulk.send_errors.update({channel: str(e) for channel in chunk})
+        return bulk
+
+    def unsubscribe(self, channels: List[str]) -> "Future[RequestAck]":
+        """Unsubscribe from channels in one request"""
+        for channel in channels:
+            self.subscriptions.pop(channel, None)
+        return self.send_request("unsubscribe", {"channels": list(channels)})
+
+    def get_request(self, request_id: int) -> Optional[PendingRequest]:
+        with self._requests_lock:
+            return self._requests.get(request_id)
+
+    def pending_requests(self) -> List[PendingRequest]:
+        """Requests still waiting for a response (or, for (un)subscribe, for some of their channels)"""
+        with self._requests_lock:
+            return list(self._requests.values())
+
+    def _finish(self, request: PendingRequest, ack: RequestAck, done: bool) -> None:
+        """Resolve the request's future with its first ack and forget the request once `done`"""
+        with self._requests_lock:
+            if done:
+                self._requests.pop(request.request_id, None)
+            if request.request_id not in self._recent_acks:
+                self._recent_acks[request.request_id] = ack
+                while len(self._recent_acks) > RECENT_ACKS:
+                    self._recent_acks.popitem(last=False)
+        if not request.future.done():
+            request.future.set_result(ack)
+
+    def _resolve_request(self, data: Dict[str, Any], channel: Optional[str]) -> None:
+        """Match a response to its request, resolve the future and record ack latency"""
+        request = self.get_request(data['id'])
+        if request is None:
+            return
+
+        code = data.get('code', 0)
+        ack = RequestAck(
+            request_id=request.request_id,
+            method=request.method,
+            channels=request.channels,
+            code=code,
+            message=data.get('message'),
+            latency_ms=(time.perf_counter_ns() - request.sent_ns) / 1e6,
+            response=data
+        )
+
+        if request.method in ('subscribe', 'unsubscribe'):
+            # The exchange may answer once per channel; record each channel separately
+            acked = [channel] if channel and code == 0 and channel in request.channels else request.channels
+            for name in acked:
+                self.channel_acks[name] = ack
+            request.remaining.difference_update(acked)
+            if request.method == 'subscribe' and code != 0:
+                # Rejected channels are not replayed after a reconnect
+                for name in acked:
+                    self.subscriptions.pop(name, None)
+
+        if not request.future.done():
+            self.recorder.record(f"ws.ack.{request.method}", time.perf_counter_ns() - request.sent_ns)
+        self._finish(request, ack, done=not request.remaining)
+
+    def _fail_pending(self, reason: str, expired_only: bool = False) -> None:
+        """
+        Resolve outstanding requests with code None (all of them, or only expired ones)
+
+        Unanswered channels get the failed ack. Timed-out subscribe channels are
+        also forgotten so they are not replayed; channels of requests failed by a
+        closed connection are kept for the replay after a reconnect.
+        """
+        now = time.monotonic()
+        for request in self.pending_requests():
+            if expired_only and request.deadline > now:
+                continue
+            unanswered = [name for name in request.channels if name in request.remaining]
+            ack = RequestAck(request.request_id, request.method, unanswered or request.channels,
+                             code=None, message=reason)
+            for name in unanswered:
+                self.channel_acks[name] = ack
+                if expired_only and request.method == 'subscribe':
+                    self.subscriptions.pop(name, None)
+            logger.warning(f"Request {request.request_id} ({request.method} {unanswered or request.channels}): {reason}")
+            self._finish(request, ack, done=True)
+        self._notify()
+
+    def _ensure_reaper(self) -> None:
+        """Start the thread that times out unanswered requests, if not running"""
+        with self._requests_lock:
+            if self._reaper is not None:
+                self._reaper_wakeup.set()
+                return
+            self._reaper = threading.Thread(target=self._reap_requests, daemon=True)
+            self._reaper.start()
+
+    def _reap_requests(self) -> None:
+        while True:
+            with self._requests_lock:
+                pending = list(self._requests.values())
+                if not pending:
+                    # Exit under the lock so _ensure_reaper never signals a finished thread
+                    self._reaper = None
+                    return
+            next_deadline = min(request.deadline for request in pending)
+            self._reaper_wakeup.wait(max(0.0, next_deadline - time.monotonic()))
+            self._reaper_wakeup.clear()
+            self._fail_pending("no response before timeout", expired_only=True)
 
     def subscribe_to_book(self, instrument_name: str, depth: int) -> bool:
         """
@@ -88,16 +469,8 @@ class CryptoWebSocketClient:
             
         channel = f"book.{instrument_name}.{depth}"
         
-        subscription_message = {
-            "id": int(time.time()),
-            "method": "subscribe",
-            "params": {
-                "channels": [channel]
-            }
-        }
-        
         try:
-            self.ws.send(json.dumps(subscription_message))
+            self.subscribe([channel])
             logger.info(f"Subscribed to {channel}")
             return True
         except Exception as e:
@@ -117,17 +490,12 @@ class CryptoWebSocketClient:
             logger.error("WebSocket not connected")
             return False
         
-        subscription_message = {
-            "id": int(time.time()),
-            "method": "subscribe",
-            "params": {
-                "channels": [channels],
-                "book_subscription_type": [book_subscription_type],
-                "book_update_frequency": [book_update_frequency]  
-            }
-        }
         try:
-            self.ws.send(json.dumps(subscription_message))
+            self.subscribe(
+                [channels],
+                book_subscription_type=[book_subscription_type],
+                book_update_frequency=[book_update_frequency]
+            )
             logger.info(f"Subscribed to {channels} with type {book_subscription_type} and frequency {book_update_frequency}")
             return True
         except Exception as e:
@@ -142,82 +510,308 @@ class CryptoWebSocketClient:
             
         channel = f"book.{instrument_name}.{depth}"
         
-        unsubscribe_message = {
-            "id": int(time.time()),
-            "method": "unsubscribe",
-            "params": {
-                "channels": [channel]
-            }
-        }
-        
         try:
-            self.ws.send(json.dumps(unsubscribe_message))
+            self.unsubscribe([channel])
             logger.info(f"Unsubscribed from {channel}")
             return True
         except Exception as e:
             logger.error(f"Failed to unsubscribe from {channel}: {e}")
             return False
 
+    def is_healthy(self) -> bool:
+        """Connected, with the socket thread still running"""
+        return self.connected and self.ws_thread is not None and self.ws_thread.is_alive()
+
+    def subscribed_channels(self) -> List[str]:
+        """Channels with a successful subscribe ack or confirmation"""
+        channels = {name for name, ack in self.channel_acks.items() if ack.method == 'subscribe' and ack.ok}
+        channels.update(name for name, confirmed in self.subscription_confirmations.items() if confirmed)
+        return sorted(channels)
+
+    def reset(self, unsubscribe_timeout: float = 2.0) -> None:
+        """
+        Return the client to a clean state without closing the connection
+
+        Unsubscribes from every subscribed channel (waiting up to
+        `unsubscribe_timeout` for the ack so their pushes stop), then clears
+        message buffers, acks, handlers and finished requests.
+        """
+        channels = self.subscribed_channels()
+        if channels and self.is_healthy():
+            try:
+                self.unsubscribe(channels).result(timeout=unsubscribe_timeout)
+            except Exception as e:
+                logger.warning(f"Unsubscribe of {len(channels)} channels during reset failed: {e}")
+
+        self.message_handlers.clear()
+        self.close_handlers.clear()
+        self.reconnect_handlers.clear()
+        self.subscriptions.clear()
+        self.subscription_confirmations.clear()
+        self.channel_acks.clear()
+        self.last_request_id = None
+        with self._requests_lock:
+            self._recent_acks.clear()
+        self.received_messages.clear()
+        logger.info(f"WebSocket client reset ({len(channels)} channels unsubscribed)")
+
     def disconnect(self) -> None:
-        """Disconnect from WebSocket server"""
+        """Disconnect from WebSocket server; no reconnect is attempted"""
+        self._closing = True
         if self.ws is not None:  # Type guard
             self.ws.close()
         self.connected = False
+        self._notify()
 
     def get_received_messages(self, message_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Get received messages, optionally filtered by type"""
+        """Get retained messages (the most recent ws_buffer_size), optionally filtered by type"""
         if message_type:
             return [msg for msg in self.received_messages if msg.get('method') == message_type]
-        return self.received_messages.copy()
+        return self.received_messages.snapshot()
+
+    def get_channel_messages(self, channel: str) -> RingBuffer:
+        """Retained messages for one channel, e.g. book.BTCUSD-PERP.10"""
+        return self.received_messages.channel(channel)
+
+    @property
+    def message_count(self) -> int:
+        """Total messages received, including ones evicted from the buffer"""
+        return self.received_messages.total
+
+    @property
+    def dropped_message_count(self) -> int:
+        """Messages evicted from the buffer to stay within its capacity"""
+        return self.received_messages.dropped
 
     def clear_received_messages(self) -> None:
         """Clear the received messages buffer"""
         self.received_messages.clear()
 
+    def add_message_handler(self, name: str,
+                            handler: Callable[[Dict[str, Any], Optional[str]], None]) -> None:
+        """Register a callback for every received message; keep it fast, it runs on the socket thread"""
+        self.message_handlers[name] = handler
+
+    def remove_message_handler(self, name: str) -> None:
+        self.message_handlers.pop(name, None)
+
+    def add_close_handler(self, name: str, handler: Callable[["CryptoWebSocketClient"], None]) -> None:
+        """Register a callback for when the connection closes"""
+        self.close_handlers[name] = handler
+
+    def remove_close_handler(self, name: str) -> None:
+        self.close_handlers.pop(name, None)
+
+    def add_reconnect_handler(self, name: str, handler: Callable[["CryptoWebSocketClient"], None]) -> None:
+        """
+        Register a callback for when a reconnect succeeds, e.g. to resync state built from the old stream
+
+        It runs on the new connection before subscriptions are replayed, so no
+        message from the replayed channels has arrived yet.
+        """
+        self.reconnect_handlers[name] = handler
+
+    def remove_reconnect_handler(self, name: str) -> None:
+        self.reconnect_handlers.pop(name, None)
+
     def _on_open(self, ws: websocket.WebSocket) -> None:
         """Called when WebSocket connection is opened"""
         self.connected = True
+        self._notify()
         logger.info("WebSocket connection opened")
 
     def _on_message(self, ws: websocket.WebSocket, message: str) -> None:
         """Called when message is received"""
         try:
-            data = json.loads(message)
-            self.received_messages.append(data)
+            data = json_codec.loads(message)
+            if data.get('method') == HEARTBEAT:
+                # The exchange closes the connection if this goes unanswered
+                self._respond_heartbeat(ws, data.get('id'))
+                return
+            channel = message_channel(data)
+            self.received_messages.append(data, channel)
+            
+            # Responses to our requests carry their id; pushed data uses -1
+            request_id = data.get('id')
+            if isinstance(request_id, int) and request_id >= 0:
+                self._resolve_request(data, channel)
             
             # Handle subscription confirmations
-            if data.get('method') == 'subscribe':
+            if data.get('method') == 'subscribe' and data.get('code', 0) == 0:
                 channels = data.get('params', {}).get('channels', [])
                 if channels:
                     self.subscription_confirmations[channels[0]] = True
+                elif channel:
+                    self.subscription_confirmations[channel] = True
             
+            for name, handler in list(self.message_handlers.items()):
+                try:
+                    handler(data, channel)
+                except Exception as e:
+                    logger.error(f"Message handler '{name}' failed: {e}")
+            
+            self._notify()
             logger.debug(f"Received message: {data}")
             
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse message: {e}")
 
+    def _respond_heartbeat(self, ws: websocket.WebSocketApp, heartbeat_id: Any) -> None:
+        """
+        Answer a heartbeat with the same id
+
+        Sent directly rather than through send_request: waiting on the rate
+        limiter could miss the exchange's deadline, and no ack comes back.
+        """
+        try:
+            ws.send(json_codec.dumps({"id": heartbeat_id, "method": RESPOND_HEARTBEAT}))
+            self.heartbeats += 1
+            logger.debug(f"Answered heartbeat {heartbeat_id}")
+        except Exception as e:
+            logger.error(f"Failed to answer heartbeat {heartbeat_id}: {e}")
+
     def _on_error(self, ws: websocket.WebSocket, error: Union[str, Exception]) -> None:
         """Called when WebSocket error occurs"""
         self.connection_error = str(error)
+        self._notify()
         logger.error(f"WebSocket error: {error}")
 
     def _on_close(self, ws: websocket.WebSocket, close_status_code: Optional[int], close_msg: Optional[str]) -> None:
         """Called when WebSocket connection is closed"""
+        if ws is not self.ws:
+            # A late callback from a socket already replaced by a reconnect
+            return
+        was_connected = self.connected
         self.connected = False
+        self._fail_pending("connection closed before response")
+        self._notify()
         logger.info(f"WebSocket connection closed: {close_status_code} - {close_msg}")
 
+        if self.reconnecting:
+            return
+        if was_connected and self.auto_reconnect and not self._closing:
+            self.reconnecting = True
+            threading.Thread(target=self._reconnect, daemon=True).start()
+            return
+        self._call_close_handlers()
+
+    def _call_close_handlers(self) -> None:
+        for name, handler in list(self.close_handlers.items()):
+            try:
+                handler(self)
+            except Exception as e:
+                logger.error(f"Close handler '{name}' failed: {e}")
+
+    def _reconnect(self) -> None:
+        """
+        Reconnect after an unexpected close, then replay subscriptions
+
+        Attempts are spaced by exponential backoff with full jitter (a random
+        delay up to the current backoff), starting at ws_reconnect_initial_delay
+        and capped at ws_reconnect_max_delay. Time from the close to the replayed
+        subscriptions is recorded as ws.reconnect. After ws_reconnect_max_attempts
+        failures (0 retries forever) the close handlers run as for a normal close.
+        """
+        start_ns = time.perf_counter_ns()
+        backoff = config.ws_reconnect_initial_delay
+        attempt = 0
+        try:
+            while not self._closing:
+                attempt += 1
+                time.sleep(random.uniform(0, backoff))
+                if self._closing:
+                    break
+                if self.connect():
+                    self._call_reconnect_handlers()
+                    self._replay_subscriptions()
+                    self.reconnects += 1
+                    self.recorder.record("ws.reconnect", time.perf_counter_ns() - start_ns)
+                    logger.info(f"WebSocket reconnected after {attempt} attempts "
+                                f"in {(time.perf_counter_ns() - start_ns) / 1e6:.0f}ms")
+                    break
+                self.reconnect_failures += 1
+                if config.ws_reconnect_max_attempts and attempt >= config.ws_reconnect_max_attempts:
+                    logger.error(f"WebSocket reconnect failed after {attempt} attempts, giving up")
+                    break
+                backoff = min(config.ws_reconnect_max_delay, backoff * 2)
+        finally:
+            self.reconnecting = False
+            self._notify()
+
+        if not self.connected:
+            self._call_close_handlers()
+
+    def _call_reconnect_handlers(self) -> None:
+        for name, handler in list(self.reconnect_handlers.items()):
+            try:
+                handler(self)
+            except Exception as e:
+                logger.error(f"Reconnect handler '{name}' failed: {e}")
+
+    def _replay_subscriptions(self) -> None:
+        """Re-subscribe every remembered channel with its original params"""
+        self.subscription_confirmations.clear()
+        groups = group_by_params(dict(self.subscriptions))
+        for channels, params in groups:
+            self.subscribe_many(channels, **params)
+        logger.info(f"Replayed {len(self.subscriptions)} subscriptions in {len(groups)} groups")
+
     def is_subscribed(self, channel: str) -> bool:
         """Check if subscribed to a specific channel"""
         return self.subscription_confirmations.get(channel, False)
 
-    def wait_for_messages(self, timeout: int = 5) -> bool:
-        """Wait for messages to be received"""
-        start_time = time.time()
-        initial_count = len(self.received_messages)
-        
-        while time.time() - start_time < timeout:
-            if len(self.received_messages) > initial_count:
-                return True
-            time.sleep(0.1)
-        
-        return False
+    def wait_until_connected(self, timeout: float = 10) -> bool:
+        """Block until the connection opens or fails; True only if connected"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.connected or self.connection_error is not None, timeout)
+        return self.connected
+
+    def wait_for_reconnect(self, reconnects: int, timeout: float = 10) -> bool:
+        """Block until more than `reconnects` reconnects have completed"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.reconnects > reconnects and self.connected, timeout)
+
+    def wait_until_disconnected(self, timeout: float = 10) -> bool:
+        """Block until the connection is closed"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.connected, timeout)
+
+    def wait_for_messages(self, timeout: float = 5, count: int = 1, channel: Optional[str] = None) -> bool:
+        """
+        Wait for new messages to be received
+
+        Args:
+            timeout: Maximum time to wait in seconds
+            count: Number of messages to wait for, counted from the time of the call
+            channel: Only count messages on this channel (e.g. book.BTCUSD-PERP.10)
+        """
+        buffer = self.received_messages.channel(channel) if channel else self.received_messages.all
+        target = buffer.total + count
+        with self.condition:
+            return self.condition.wait_for(lambda: buffer.total >= target, timeout)
+
+    def wait_for_ack(self, request_id: Optional[int] = None, timeout: float = 10) -> Optional[RequestAck]:
+        """Wait for a request (default: the last one sent) to be resolved; None on timeout"""
+        if request_id is None:
+            request_id = self.last_request_id
+        if request_id is None:
+            return None
+        request = self.get_request(request_id)
+        if request is None:
+            # Finished requests are only remembered by their ack
+            with self._requests_lock:
+                return self._recent_acks.get(request_id)
+        try:
+            return request.future.result(timeout)
+        except FutureTimeoutError:
+            return None
+
+    def wait_for_response(self, request_id: Optional[int] = None, timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """Wait for the response to a request (default: the last one sent); None on timeout"""
+        ack = self.wait_for_ack(request_id, timeout)
+        return ack.response if ack is not None else None
+
+    def wait_for_subscription(self, channel: str, timeout: float = 10) -> bool:
+        """Wait until a subscription to the channel has been confirmed"""
+        with self.condition:
+            return self.condition.wait_for(lambda: self.is_subscribed(channel), timeout)
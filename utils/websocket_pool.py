@@ -0,0 +1,171 @@
+import queue
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from config.settings import config
+from utils.websocket_client import BulkSubscription, CryptoWebSocketClient, group_by_params
+
+logger = logging.getLogger(__name__)
+
+# (channel, message) as delivered on the merged consumer queue
+PoolMessage = Tuple[Optional[str], Dict[str, Any]]
+
+
+class WebSocketConnectionPool:
+    """
+    Shards channel subscriptions across several WebSocket connections
+
+    Channels go to the least-loaded live connection with spare capacity, and
+    new connections are opened on demand up to `max_connections`. Messages from
+    every connection are merged into one bounded consumer queue. A dropped
+    connection first reconnects and replays its own subscriptions; only when
+    it gives up (or has auto_reconnect off) are its channels re-subscribed on
+    the remaining (or a fresh) connection.
+    """
+
+    def __init__(self, max_connections: Optional[int] = None,
+                 max_channels_per_connection: Optional[int] = None,
+                 queue_size: Optional[int] = None,
+                 client_factory: Callable[[], CryptoWebSocketClient] = CryptoWebSocketClient):
+        self.max_connections = max_connections or config.ws_pool_max_connections
+        self.max_channels_per_connection = max_channels_per_connection or config.ws_pool_max_channels_per_connection
+        self.client_factory = client_factory
+        self.messages: "queue.Queue[PoolMessage]" = queue.Queue(maxsize=queue_size or config.ws_pool_queue_size)
+        self.dropped_messages: int = 0
+        self.rebalances: int = 0
+
+        self._lock = threading.RLock()
+        self._clients: List[CryptoWebSocketClient] = []
+        self._assignments: Dict[str, CryptoWebSocketClient] = {}
+        self._channel_params: Dict[str, Dict[str, Any]] = {}
+        self._closing = False
+
+    @property
+    def clients(self) -> List[CryptoWebSocketClient]:
+        with self._lock:
+            return list(self._clients)
+
+    def channels_for(self, client: CryptoWebSocketClient) -> List[str]:
+        with self._lock:
+            return [channel for channel, owner in self._assignments.items() if owner is client]
+
+    def assignments(self) -> Dict[str, int]:
+        """Channel -> index of the connection currently carrying it"""
+        with self._lock:
+            return {channel: self._clients.index(owner) for channel, owner in self._assignments.items()}
+
+    def _open_client(self) -> CryptoWebSocketClient:
+        client = self.client_factory()
+        client.add_message_handler('pool', self._enqueue)
+        client.add_close_handler('pool', self._on_client_closed)
+        if not client.connect():
+            raise ConnectionError(f"Pool failed to open connection: {client.connection_error}")
+        self._clients.append(client)
+        logger.info(f"Pool opened connection {len(self._clients)} of max {self.max_connections}")
+        return client
+
+    def _enqueue(self, message: Dict[str, Any], channel: Optional[str]) -> None:
+        try:
+            self.messages.put_nowait((channel, message))
+        except queue.Full:
+            self.dropped_messages += 1
+
+    def _plan(self, channels: List[str]) -> Dict[CryptoWebSocketClient, List[str]]:
+        """Assign channels to least-loaded live connections, opening new ones as needed"""
+        load = {client: 0 for client in self._clients if client.connected}
+        for owner in self._assignments.values():
+            if owner in load:
+                load[owner] += 1
+
+        plan: Dict[CryptoWebSocketClient, List[str]] = {}
+        for channel in channels:
+            candidates = [client for client, count in load.items() if count < self.max_channels_per_connection]
+            if not candidates:
+                if len(self._clients) >= self.max_connections:
+                    raise RuntimeError(
+                        f"Pool capacity exhausted: {self.max_connections} connections x "
+                        f"{self.max_channels_per_connection} channels"
+                    )
+                candidates = [self._open_client()]
+                load[candidates[0]] = 0
+            client = min(candidates, key=lambda c: load[c])
+            load[client] += 1
+            plan.setdefault(client, []).append(channel)
+        return plan
+
+    def subscribe(self, channels: List[str], **params: Any) -> List[BulkSubscription]:
+        """Subscribe to channels spread over the pool; params are sent with every request"""
+        with self._lock:
+            new_channels = [channel for channel in dict.fromkeys(channels) if channel not in self._assignments]
+            plan = self._plan(new_channels)
+            subscriptions = []
+            for client, assigned in plan.items():
+                for channel in assigned:
+                    self._assignments[channel] = client
+                    self._channel_params[channel] = params
+                subscriptions.append(client.subscribe_many(assigned, **params))
+        logger.info(f"Pool subscribed {len(new_channels)} channels over {len(plan)} connections")
+        return subscriptions
+
+    def unsubscribe(self, channels: List[str]) -> None:
+        with self._lock:
+            by_client: Dict[CryptoWebSocketClient, List[str]] = {}
+            for channel in channels:
+                client = self._assignments.pop(channel, None)
+                self._channel_params.pop(channel, None)
+                if client is not None:
+                    by_client.setdefault(client, []).append(channel)
+        for client, assigned in by_client.items():
+            if client.connected:
+                client.unsubscribe(assigned)
+
+    def _on_client_closed(self, client: CryptoWebSocketClient) -> None:
+        if self._closing:
+            return
+        # Rebalancing may open a connection, so keep it off the closing socket's thread
+        threading.Thread(target=self._rebalance, args=(client,), daemon=True).start()
+
+    def _rebalance(self, closed: CryptoWebSocketClient) -> None:
+        with self._lock:
+            if self._closing or closed not in self._clients:
+                return
+            orphaned = self.channels_for(closed)
+            self._clients.remove(closed)
+            for channel in orphaned:
+                self._assignments.pop(channel, None)
+            logger.warning(f"Pool connection closed, moving {len(orphaned)} channels")
+
+            try:
+                for group, params in group_by_params({channel: self._channel_params.get(channel, {})
+                                                      for channel in orphaned}):
+                    self.subscribe(group, **params)
+                self.rebalances += 1
+            except (ConnectionError, RuntimeError) as e:
+                logger.error(f"Pool rebalance failed, {len(orphaned)} channels unsubscribed: {e}")
+
+    def get(self, timeout: Optional[float] = None) -> Optional[PoolMessage]:
+        """Next (channel, message) from any connection, or None on timeout"""
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def iter_messages(self, timeout: float = 1.0) -> Iterator[PoolMessage]:
+        """Yield merged messages until none arrives within `timeout` seconds"""
+        while True:
+            item = self.get(timeout)
+            if item is None:
+                return
+            yield item
+
+    def close(self) -> None:
+        """Disconnect every connection without rebalancing"""
+        with self._lock:
+            self._closing = True
+            clients = list(self._clients)
+            self._clients.clear()
+            self._assignments.clear()
+            self._channel_params.clear()
+        for client in clients:
+            client.remove_close_handler('pool')
+            client.disconnect()